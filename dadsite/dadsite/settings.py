@@ -24,8 +24,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'pages.middleware.RequestTimingMiddleware',  # Latency samples for /health/status/
+    'pages.middleware.ProfilingMiddleware',  # Staff-only ?_profile=<signed token>
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'pages.middleware.CompressionMiddleware',  # Brotli/gzip for dynamic responses (below WhiteNoise)
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -37,11 +40,30 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'dadsite.urls'
 
+# Templates
+# `python manage.py build_templates` (run by entrypoint.sh) writes copies of the
+# templates with their inline <style>/<script> blocks moved to static files;
+# outside DEBUG the copies in BUILD_DIR take precedence over pages/templates.
+# MINIFY_TEMPLATES strips indentation and comments once, when a template is loaded.
+BUILD_DIR = BASE_DIR / 'build'
+USE_BUILT_TEMPLATES = not DEBUG and (BUILD_DIR / 'templates').is_dir()
+MINIFY_TEMPLATES = os.getenv('MINIFY_TEMPLATES', str(not DEBUG)) == 'True'
+
+if MINIFY_TEMPLATES:
+    TEMPLATE_LOADERS = [
+        'pages.template_loaders.MinifyingFilesystemLoader',
+        'pages.template_loaders.MinifyingAppDirectoriesLoader',
+    ]
+else:
+    TEMPLATE_LOADERS = [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': [],
-        'APP_DIRS': True,
+        'DIRS': [BUILD_DIR / 'templates'] if USE_BUILT_TEMPLATES else [],
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -49,6 +71,7 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            'loaders': [('django.template.loaders.cached.Loader', TEMPLATE_LOADERS)],
         },
     },
 ]
@@ -81,6 +104,9 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_DIRS = [BASE_DIR / 'static']
+if (BUILD_DIR / 'static').is_dir():
+    # Assets extracted from templates by build_templates
+    STATICFILES_DIRS.append(BUILD_DIR / 'static')
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 # Media files
@@ -109,6 +135,78 @@ EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'noreply@example.com')
 CONTACT_EMAIL = os.getenv('CONTACT_EMAIL', 'contact@example.com')
 
+# Pending leads older than this are escalated by `manage.py escalate_stale_leads`
+# (the contact page promises a reply within 24 hours)
+STALE_LEAD_HOURS = int(os.getenv('STALE_LEAD_HOURS', '24'))
+
+# The home page caches its announcements until the next scheduled publish or
+# expiry, but no longer than this: the default cache is per process, so an edit
+# only clears it in the process that saved it. 0 = no limit (shared cache only).
+HOME_PAGE_CACHE_MAX_SECONDS = int(os.getenv('HOME_PAGE_CACHE_MAX_SECONDS', '900') or 0) or None
+
+# `manage.py archive_inquiries` moves denied leads and inactive clients not
+# updated for this many days into the ArchivedInquiry table
+ARCHIVE_DENIED_AFTER_DAYS = int(os.getenv('ARCHIVE_DENIED_AFTER_DAYS', '90'))
+ARCHIVE_INACTIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_INACTIVE_AFTER_DAYS', '365'))
+
+# `manage.py snapshot` copies the live database with SQLite's backup API,
+# SNAPSHOT_PAGES_PER_STEP pages at a time with SNAPSHOT_STEP_SLEEP seconds
+# between steps, and keeps the newest SNAPSHOT_KEEP snapshots in SNAPSHOT_DIR
+SNAPSHOT_DIR = Path(os.getenv('SNAPSHOT_DIR', BASE_DIR / 'db' / 'snapshots'))
+SNAPSHOT_KEEP = int(os.getenv('SNAPSHOT_KEEP', '14'))
+SNAPSHOT_PAGES_PER_STEP = int(os.getenv('SNAPSHOT_PAGES_PER_STEP', '256'))
+SNAPSHOT_STEP_SLEEP = float(os.getenv('SNAPSHOT_STEP_SLEEP', '0.05'))
+
+# On-demand request profiling for staff (see pages/profiling.py). Links from
+# /manage/profiles/?path=... are valid for PROFILE_TOKEN_MAX_AGE seconds; the
+# newest PROFILE_MAX_COUNT .prof/.collapsed pairs are kept in PROFILE_DIR.
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'True') == 'True'
+PROFILE_DIR = Path(os.getenv('PROFILE_DIR', BASE_DIR / 'logs' / 'profiles'))
+PROFILE_MAX_COUNT = int(os.getenv('PROFILE_MAX_COUNT', '50'))
+PROFILE_TOKEN_MAX_AGE = int(os.getenv('PROFILE_TOKEN_MAX_AGE', '900'))
+PROFILE_SAMPLE_INTERVAL = float(os.getenv('PROFILE_SAMPLE_INTERVAL', '0.001'))
+
+# Health checks
+# Probe results are cached so load balancer traffic has a bounded cost
+HEALTH_CHECK_CACHE_SECONDS = int(os.getenv('HEALTH_CHECK_CACHE_SECONDS', '5'))
+HEALTH_CHECK_DB_TIMEOUT = float(os.getenv('HEALTH_CHECK_DB_TIMEOUT', '2'))
+HEALTH_DISK_MIN_FREE_MB = int(os.getenv('HEALTH_DISK_MIN_FREE_MB', '100'))
+
+# Response compression for dynamic pages (static files are precompressed by WhiteNoise)
+# Brotli is used when the `brotli` package is installed, gzip otherwise
+COMPRESS_RESPONSES = os.getenv('COMPRESS_RESPONSES', 'True') == 'True'
+COMPRESS_MIN_BYTES = int(os.getenv('COMPRESS_MIN_BYTES', '1024'))
+COMPRESS_BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', '5'))
+
+# Live updates for the management pages (Server-Sent Events on /manage/live/)
+# Served by the ASGI `live` service; each worker process polls the event log once
+# per interval for all of its connections. Streams end after LIVE_UPDATES_MAX_SECONDS
+# and the browser reconnects, so a logged-out session stops receiving updates.
+LIVE_UPDATES_POLL_SECONDS = float(os.getenv('LIVE_UPDATES_POLL_SECONDS', '2'))
+LIVE_UPDATES_HEARTBEAT_SECONDS = int(os.getenv('LIVE_UPDATES_HEARTBEAT_SECONDS', '15'))
+LIVE_UPDATES_MAX_SECONDS = int(os.getenv('LIVE_UPDATES_MAX_SECONDS', '300'))
+
+# PT Distinction client portal embed
+# 'facade' shows a placeholder and loads portal.js on click or when scrolled into
+# view; 'eager' restores the original synchronous script tag
+PTD_PORTAL_LOAD = os.getenv('PTD_PORTAL_LOAD', 'facade')
+PTD_PORTAL_ORIGIN = os.getenv('PTD_PORTAL_ORIGIN', 'https://v3portal.ptdistinction.com')
+PTD_PORTAL_TIMEOUT_SECONDS = int(os.getenv('PTD_PORTAL_TIMEOUT_SECONDS', '10'))
+
+# Sessions
+# SESSION_MODE=split keeps public traffic session-free: anonymous visitors get
+# signed-cookie message storage and never create a django_session row. Staff
+# sessions stay on the db backend: without a shared cache, cached_db would keep
+# a copy per process, and a logout in one worker would leave the session alive
+# in the others. SESSION_MODE=db restores Django's defaults. Expired rows are
+# removed by the prune_sessions command.
+SESSION_MODE = os.getenv('SESSION_MODE', 'split')
+if SESSION_MODE == 'split':
+    MESSAGE_STORAGE = 'pages.sessions.AnonymousCookieMessageStorage'
+
+# Warm caches in wsgi.py before gunicorn (--preload) forks workers
+WARMUP_ON_START = os.getenv('WARMUP_ON_START', 'True') == 'True'
+
 # Security settings for production
 if not DEBUG:
     SECURE_SSL_REDIRECT = False  # Handled by Caddy
@@ -119,6 +217,17 @@ if not DEBUG:
     X_FRAME_OPTIONS = 'DENY'
 
 # Logging configuration
+# LOG_MODE=queue hands records to a background thread (QueueHandler/QueueListener)
+# so file writes and rotations never block a request. LOG_FORMAT=json emits
+# structured lines with request IDs; LOG_REQUESTS logs one line per request
+# with its timing, sampled by LOG_INFO_SAMPLE_RATE.
+LOG_MODE = os.getenv('LOG_MODE', 'sync')
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')
+LOG_REQUESTS = os.getenv('LOG_REQUESTS', 'False') == 'True'
+LOG_INFO_SAMPLE_RATE = float(os.getenv('LOG_INFO_SAMPLE_RATE', '1.0'))
+LOG_QUEUE_SIZE = 10000
+
+LOGGING_CONFIG = 'pages.logging_handlers.configure_logging'
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -127,6 +236,18 @@ LOGGING = {
             'format': '{levelname} {asctime} {module} {message}',
             'style': '{',
         },
+        'json': {
+            '()': 'pages.logging_handlers.JSONFormatter',
+        },
+    },
+    'filters': {
+        'request_context': {
+            '()': 'pages.logging_handlers.RequestContextFilter',
+        },
+        'sample_info': {
+            '()': 'pages.logging_handlers.SamplingFilter',
+            'rate': LOG_INFO_SAMPLE_RATE,
+        },
     },
     'handlers': {
         'file': {
@@ -135,12 +256,14 @@ LOGGING = {
             'filename': BASE_DIR / 'logs' / 'django.log',
             'maxBytes': 1024 * 1024 * 10,  # 10 MB
             'backupCount': 5,
-            'formatter': 'verbose',
+            'formatter': 'json' if LOG_FORMAT == 'json' else 'verbose',
+            'filters': ['request_context'],
         },
         'console': {
             'level': 'INFO',
             'class': 'logging.StreamHandler',
-            'formatter': 'verbose',
+            'formatter': 'json' if LOG_FORMAT == 'json' else 'verbose',
+            'filters': ['request_context'],
         },
     },
     'root': {
@@ -153,5 +276,10 @@ LOGGING = {
             'level': 'INFO',
             'propagate': False,
         },
+        # Per-request timing lines (LOG_REQUESTS); high volume, so sampled
+        'pages.requests': {
+            'level': 'INFO',
+            'filters': ['sample_info'],
+        },
     },
 }
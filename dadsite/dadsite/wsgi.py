@@ -3,3 +3,11 @@ from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dadsite.settings')
 application = get_wsgi_application()
+
+# Warm caches before gunicorn (--preload) forks its workers
+from django.conf import settings  # noqa: E402
+
+if settings.WARMUP_ON_START:
+    from pages.warmup import warm_caches  # noqa: E402
+
+    warm_caches()
@@ -5,6 +5,18 @@ set -e
 echo "Running database migrations..."
 python manage.py migrate --noinput
 
+echo "Rendering content Markdown..."
+python manage.py render_content --verbosity 0
+
+echo "Building dashboard stats..."
+python manage.py update_stats --verbosity 0
+
+echo "Syncing URL permissions..."
+python manage.py populate_url_permissions --verbosity 0
+
+echo "Extracting inline template assets..."
+python manage.py build_templates --verbosity 0
+
 echo "Collecting static files..."
 python manage.py collectstatic --noinput --clear
 
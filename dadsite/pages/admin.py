@@ -1,5 +1,35 @@
-from django.contrib import admin
-from .models import ContentBlock, Announcement, ClientInquiry, EmailRecipient, AlertType, AlertSubscription, URLPermission
+import json
+
+from django.contrib import admin, messages
+from django.contrib.admin.views.main import ChangeList
+from django.db.models import Count, Q
+from django.utils.html import format_html
+from .announcements import clear_home_page_cache
+from .events import record_event
+from .models import (
+    ContentBlock, Announcement, ClientInquiry, ArchivedInquiry, InquiryEvent, EventWatermark, DailyInquiryStats, EmailRecipient, AlertType,
+    AlertSubscription, PendingAlert, APIToken, URLPermission,
+)
+
+
+class CappedCountChangeList(ChangeList):
+    """
+    ChangeList that only shows the unfiltered total ("X results (Y total)")
+    while the table is small. The total is counted over at most
+    `full_result_count_limit` + 1 primary keys, so its cost stays bounded
+    however large the table grows.
+    """
+
+    def get_results(self, request):
+        super().get_results(request)
+        limit = getattr(self.model_admin, 'full_result_count_limit', None)
+        if not limit:
+            return
+        capped_count = self.root_queryset.order_by().values('pk')[:limit + 1].count()
+        if capped_count <= limit:
+            self.full_result_count = capped_count
+            self.show_full_result_count = True
+            self.show_admin_actions = bool(capped_count)
 
 
 @admin.register(ContentBlock)
@@ -27,11 +57,16 @@ class ContentBlockAdmin(admin.ModelAdmin):
         }),
     )
 
+    def delete_queryset(self, request, queryset):
+        # Bulk deletes skip ContentBlock.delete(), which clears the home page cache
+        super().delete_queryset(request, queryset)
+        clear_home_page_cache()
+
 
 @admin.register(Announcement)
 class AnnouncementAdmin(admin.ModelAdmin):
-    list_display = ['title', 'published_date', 'is_active', 'updated_at']
-    list_filter = ['is_active', 'published_date']
+    list_display = ['title', 'published_date', 'expires_at', 'status', 'is_active', 'updated_at']
+    list_filter = ['is_active', 'published_date', 'expires_at']
     search_fields = ['title', 'content']
     list_editable = ['is_active']
     ordering = ['-published_date']
@@ -40,7 +75,11 @@ class AnnouncementAdmin(admin.ModelAdmin):
 
     fieldsets = (
         ('Announcement Information', {
-            'fields': ('title', 'content', 'published_date')
+            'fields': ('title', 'content')
+        }),
+        ('Schedule', {
+            'fields': ('published_date', 'expires_at'),
+            'description': 'The home page shows the announcement between these times.',
         }),
         ('Display Settings', {
             'fields': ('is_active',)
@@ -51,6 +90,11 @@ class AnnouncementAdmin(admin.ModelAdmin):
         }),
     )
 
+    def delete_queryset(self, request, queryset):
+        # Bulk deletes skip Announcement.delete(), which clears the home page cache
+        super().delete_queryset(request, queryset)
+        clear_home_page_cache()
+
 
 @admin.register(ClientInquiry)
 class ClientInquiryAdmin(admin.ModelAdmin):
@@ -60,7 +104,27 @@ class ClientInquiryAdmin(admin.ModelAdmin):
     list_editable = ['group']
     ordering = ['-submitted_at']
     readonly_fields = ['submitted_at', 'updated_at', 'reviewed_at', 'approved_at']
-    date_hierarchy = 'submitted_at'
+    date_hierarchy = 'submitted_at'  # Backed by the submitted_at index
+    # The stock full count is an unbounded COUNT(*) on every page view
+    show_full_result_count = False
+    full_result_count_limit = 10000
+
+    def get_changelist(self, request, **kwargs):
+        return CappedCountChangeList
+
+    def save_model(self, request, obj, form, change):
+        """Record new inquiries and status edits in the event log (the admin saves inside a transaction)"""
+        # The stored row, not form.initial: list_editable forms only carry the editable fields
+        old = None
+        if change:
+            old = ClientInquiry.objects.filter(pk=obj.pk).values('group', 'lead_status', 'client_status').first()
+        super().save_model(request, obj, form, change)
+        if not change:
+            record_event(obj, 'submitted', actor=request.user.username)
+        elif old:
+            old_state = ClientInquiry.format_state(old['group'], old['lead_status'], old['client_status'])
+            if old_state != obj.state:
+                record_event(obj, 'edited', old_state, request.user.username)
 
     def get_goals_display(self, obj):
         """Display fitness goals in a readable format"""
@@ -109,6 +173,83 @@ class ClientInquiryAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(ArchivedInquiry)
+class ArchivedInquiryAdmin(admin.ModelAdmin):
+    list_display = ['name', 'email', 'reason', 'get_status_display', 'submitted_at', 'archived_at']
+    list_filter = ['reason', 'group']
+    search_fields = ['name', 'email', 'phone', '=original_id']
+    ordering = ['-submitted_at']
+    date_hierarchy = 'submitted_at'  # Backed by the submitted_at index
+    show_full_result_count = False
+    full_result_count_limit = 10000
+    fields = [
+        'original_id', 'name', 'email', 'phone', 'group', 'lead_status', 'client_status',
+        'submitted_at', 'reviewed_at', 'approved_at', 'updated_at', 'reason', 'archived_at', 'record_display',
+    ]
+    readonly_fields = fields
+
+    def get_changelist(self, request, **kwargs):
+        return CappedCountChangeList
+
+    def has_add_permission(self, request):
+        # Rows are moved here by python manage.py archive_inquiries
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_status_display(self, obj):
+        if obj.group == 'lead':
+            return f"Lead: {obj.get_lead_status_display()}"
+        return f"Client: {obj.get_client_status_display() if obj.client_status else 'Unknown'}"
+    get_status_display.short_description = 'Status'
+
+    def record_display(self, obj):
+        """The complete original inquiry, decompressed only on the detail page"""
+        return format_html('<pre style="white-space: pre-wrap">{}</pre>', json.dumps(obj.record, indent=2, ensure_ascii=False))
+    record_display.short_description = 'Original record'
+
+
+@admin.register(InquiryEvent)
+class InquiryEventAdmin(admin.ModelAdmin):
+    list_display = ['id', 'inquiry_id', 'event_type', 'from_state', 'to_state', 'actor', 'created_at']
+    list_filter = ['event_type', 'created_at']
+    search_fields = ['=inquiry__id', 'actor']
+    ordering = ['-id']
+    show_full_result_count = False
+    readonly_fields = ['inquiry', 'event_type', 'from_state', 'to_state', 'actor', 'created_at']
+
+    def has_add_permission(self, request):
+        # Events are appended by the views, never by hand
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(EventWatermark)
+class EventWatermarkAdmin(admin.ModelAdmin):
+    list_display = ['name', 'last_event_id', 'updated_at']
+    readonly_fields = ['updated_at']
+
+
+@admin.register(DailyInquiryStats)
+class DailyInquiryStatsAdmin(admin.ModelAdmin):
+    list_display = ['date', 'submitted', 'approved', 'denied', 'activated', 'deactivated', 'updated_at']
+    date_hierarchy = 'date'
+    ordering = ['-date']
+
+    def has_add_permission(self, request):
+        # Maintained from the event log (python manage.py update_stats --rebuild to recompute)
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(EmailRecipient)
 class EmailRecipientAdmin(admin.ModelAdmin):
     list_display = ['name', 'email', 'is_active', 'alert_count', 'updated_at']
@@ -118,11 +259,17 @@ class EmailRecipientAdmin(admin.ModelAdmin):
     ordering = ['name']
     readonly_fields = ['created_at', 'updated_at']
 
+    def get_queryset(self, request):
+        # Count subscriptions in the changelist query instead of once per row
+        return super().get_queryset(request).annotate(
+            subscribed_alert_count=Count('alertsubscription', filter=Q(alertsubscription__is_subscribed=True)),
+        )
+
     def alert_count(self, obj):
         """Show how many alerts this recipient is subscribed to"""
-        count = obj.alertsubscription_set.filter(is_subscribed=True).count()
-        return f"{count} alerts"
+        return f"{obj.subscribed_alert_count} alerts"
     alert_count.short_description = 'Subscriptions'
+    alert_count.admin_order_field = 'subscribed_alert_count'
 
     fieldsets = (
         ('Recipient Information', {
@@ -138,7 +285,7 @@ class EmailRecipientAdmin(admin.ModelAdmin):
 class AlertSubscriptionInline(admin.TabularInline):
     model = AlertSubscription
     extra = 1
-    fields = ['recipient', 'is_subscribed']
+    fields = ['recipient', 'is_subscribed', 'delivery_mode']
     autocomplete_fields = ['recipient']
 
 
@@ -152,11 +299,20 @@ class AlertTypeAdmin(admin.ModelAdmin):
     readonly_fields = ['alert_type', 'created_at', 'updated_at']
     inlines = [AlertSubscriptionInline]
 
+    def get_queryset(self, request):
+        # Count recipients in the changelist query instead of once per row
+        return super().get_queryset(request).annotate(
+            active_recipient_count=Count(
+                'alertsubscription',
+                filter=Q(alertsubscription__is_subscribed=True, alertsubscription__recipient__is_active=True),
+            ),
+        )
+
     def recipient_count(self, obj):
         """Show how many recipients are subscribed to this alert"""
-        count = obj.alertsubscription_set.filter(is_subscribed=True, recipient__is_active=True).count()
-        return f"{count} recipients"
+        return f"{obj.active_recipient_count} recipients"
     recipient_count.short_description = 'Active Recipients'
+    recipient_count.admin_order_field = 'active_recipient_count'
 
     fieldsets = (
         ('Alert Configuration', {
@@ -171,16 +327,17 @@ class AlertTypeAdmin(admin.ModelAdmin):
 
 @admin.register(AlertSubscription)
 class AlertSubscriptionAdmin(admin.ModelAdmin):
-    list_display = ['recipient', 'alert_type', 'is_subscribed', 'created_at']
-    list_filter = ['is_subscribed', 'alert_type']
+    list_display = ['recipient', 'alert_type', 'is_subscribed', 'delivery_mode', 'created_at']
+    list_filter = ['is_subscribed', 'delivery_mode', 'alert_type']
     search_fields = ['recipient__name', 'recipient__email', 'alert_type__name']
-    list_editable = ['is_subscribed']
+    list_editable = ['is_subscribed', 'delivery_mode']
+    list_select_related = ['recipient', 'alert_type']
     ordering = ['alert_type', 'recipient']
     autocomplete_fields = ['recipient']
 
     fieldsets = (
         ('Subscription', {
-            'fields': ('alert_type', 'recipient', 'is_subscribed')
+            'fields': ('alert_type', 'recipient', 'is_subscribed', 'delivery_mode')
         }),
         ('Metadata', {
             'fields': ('created_at',),
@@ -189,6 +346,36 @@ class AlertSubscriptionAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(PendingAlert)
+class PendingAlertAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'recipient', 'alert_type', 'delivery_mode', 'created_at']
+    list_filter = ['delivery_mode', 'alert_type']
+    search_fields = ['subject', 'recipient__email']
+    list_select_related = ['recipient', 'alert_type']
+    ordering = ['-created_at']
+    readonly_fields = ['recipient', 'alert_type', 'delivery_mode', 'subject', 'message', 'created_at']
+
+    def has_add_permission(self, request):
+        # Pending alerts are created by the alert system, not by hand
+        return False
+
+
+@admin.register(APIToken)
+class APITokenAdmin(admin.ModelAdmin):
+    list_display = ['name', 'prefix', 'user', 'is_active', 'created_at', 'last_used_at']
+    list_filter = ['is_active']
+    list_select_related = ['user']
+    fields = ['name', 'user', 'is_active', 'prefix', 'created_at', 'last_used_at']
+    readonly_fields = ['prefix', 'created_at', 'last_used_at']
+
+    def save_model(self, request, obj, form, change):
+        key = obj.generate_key() if not change else None
+        super().save_model(request, obj, form, change)
+        if key:
+            # Only the hash is stored, so this is the one chance to copy the key
+            messages.warning(request, f"API key for \"{obj.name}\": {key} (copy it now, it will not be shown again)")
+
+
 @admin.register(URLPermission)
 class URLPermissionAdmin(admin.ModelAdmin):
     list_display = ['url_pattern', 'visibility', 'description', 'is_active', 'order', 'updated_at']
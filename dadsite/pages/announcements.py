@@ -0,0 +1,90 @@
+"""
+Scheduled announcements and the home page cache
+
+An announcement is live from its published_date until its expires_at (if
+any), so what the home page shows only changes at those moments or when
+someone edits an announcement or a home content block (their save() and
+delete() drop the cache entry). get_home_page_data() caches the page's
+content until the next scheduled publish or expiry, so a visitor never sees
+an announcement early or after it expired, and between transitions the page
+costs no queries.
+"""
+import math
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Announcement, ContentBlock
+
+HOME_PAGE_CACHE_KEY = 'home_page_cache'
+HOME_ANNOUNCEMENTS = 3
+
+
+def clear_home_page_cache():
+    """
+    Drop the cached home page once the current transaction commits (at once
+    outside one). Clearing it earlier lets a concurrent request cache the old
+    rows again before the write is visible.
+    """
+    transaction.on_commit(lambda: cache.delete(HOME_PAGE_CACHE_KEY))
+
+
+def live_announcements(now):
+    """Active announcements published at or before `now` and not yet expired, newest first"""
+    return (
+        Announcement.objects.filter(is_active=True, published_date__lte=now)
+        .filter(Q(expires_at__isnull=True) | Q(expires_at__gt=now))
+        .order_by('-published_date')
+    )
+
+
+def next_transition(now, shown):
+    """
+    The next moment the home page's announcements change on their own: the
+    next scheduled publish, or the expiry of one of the `shown` announcements
+    (one further down expiring changes nothing). None if nothing is scheduled.
+    """
+    next_publish = (
+        Announcement.objects.filter(is_active=True, published_date__gt=now)
+        .order_by('published_date').values_list('published_date', flat=True).first()
+    )
+    candidates = [announcement.expires_at for announcement in shown if announcement.expires_at]
+    if next_publish:
+        candidates.append(next_publish)
+    return min(candidates, default=None)
+
+
+def cache_timeout(now, until):
+    """
+    Seconds to cache content that changes at `until`, capped at
+    HOME_PAGE_CACHE_MAX_SECONDS (None: no cap) because an edit only clears
+    the cache of the process that saved it unless the cache is shared
+    """
+    limit = settings.HOME_PAGE_CACHE_MAX_SECONDS
+    if until is None:
+        return limit
+    # Rounded up so the entry never expires just before the transition
+    seconds = max(math.ceil((until - now).total_seconds()), 1)
+    return seconds if limit is None else min(seconds, limit)
+
+
+def get_home_page_data():
+    """
+    Content blocks and announcements for the home page.
+
+    Returns:
+        dict: 'content_blocks' and 'announcements' (lists)
+    """
+    data = cache.get(HOME_PAGE_CACHE_KEY)
+    if data is None:
+        now = timezone.now()
+        announcements = list(live_announcements(now)[:HOME_ANNOUNCEMENTS])
+        data = {
+            'content_blocks': list(ContentBlock.objects.filter(page='home', is_active=True)),
+            'announcements': announcements,
+        }
+        cache.set(HOME_PAGE_CACHE_KEY, data, cache_timeout(now, next_transition(now, announcements)))
+    return data
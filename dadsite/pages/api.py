@@ -0,0 +1,215 @@
+"""
+Read-only JSON API for sync scripts (e.g. the CRM)
+
+Authenticate with `Authorization: Bearer <key>`; keys are API Tokens created
+in the admin and belong to a staff user.
+
+    GET /api/v1/inquiries/?fields=id,email,client_status&group=client&since=2026-01-01T00:00:00Z
+    GET /api/v1/inquiries/?cursor=<next_cursor from the previous page>
+    GET /api/v1/inquiries/<id>/?fields=...
+    GET /api/v1/stats/
+
+Lists are ordered by (updated_at, id) and paged by cursor, so a sync client
+stores the last `next_cursor` and asks only for records changed since then.
+Every response carries an ETag; repeating a request with If-None-Match gets
+a bodiless 304 when nothing changed.
+"""
+import base64
+import binascii
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.http import require_http_methods
+
+from .models import APIToken, ClientInquiry
+from .stats import get_dashboard_stats, get_inquiry_counters
+
+# Fields a client may request with ?fields=; `id` is always included
+INQUIRY_FIELDS = [
+    'id', 'name', 'email', 'phone', 'age', 'fitness_level', 'fitness_goals', 'additional_goals',
+    'current_frequency', 'injuries_limitations', 'message', 'referral_source', 'group', 'lead_status',
+    'client_status', 'notes', 'reviewed_at', 'reviewed_by', 'approved_at', 'submitted_at', 'updated_at',
+]
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+# Rows saved in the last moments may belong to a transaction that hasn't
+# committed yet; leaving them for the next sync means a cursor never moves past
+# a row that later appears with an earlier updated_at
+SETTLE_SECONDS = 2
+
+# last_used_at is written at most this often per token (SQLite has a single writer)
+LAST_USED_RESOLUTION = timedelta(minutes=5)
+
+
+class BadRequest(ValueError):
+    """Invalid query parameter; the message is returned to the client"""
+
+
+def authenticate_token(request):
+    """The active APIToken named in the Authorization header, if its user is still staff"""
+    scheme, _, key = request.headers.get('Authorization', '').partition(' ')
+    if scheme.lower() != 'bearer' or not key.strip():
+        return None
+    token = (
+        APIToken.objects.select_related('user')
+        .filter(key_hash=APIToken.hash_key(key.strip()), is_active=True)
+        .first()
+    )
+    if token is None or not token.user.is_active or not (token.user.is_staff or token.user.is_superuser):
+        return None
+
+    now = timezone.now()
+    if token.last_used_at is None or now - token.last_used_at > LAST_USED_RESOLUTION:
+        APIToken.objects.filter(pk=token.pk).update(last_used_at=now)
+    return token
+
+
+def token_required(view):
+    """Reject requests without a valid staff API token with 401"""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        token = authenticate_token(request)
+        if token is None:
+            response = JsonResponse({'error': 'A valid API token is required'}, status=401)
+            response['WWW-Authenticate'] = 'Bearer'
+            return response
+        request.api_token = token
+        try:
+            return view(request, *args, **kwargs)
+        except BadRequest as e:
+            return JsonResponse({'error': str(e)}, status=400)
+    return wrapper
+
+
+def api_response(request, data):
+    """
+    JSON response with an ETag of its body, or 304 Not Modified when the
+    client's If-None-Match already has it
+    """
+    body = json.dumps(data, cls=DjangoJSONEncoder, separators=(',', ':'))
+    etag = f'"{hashlib.sha256(body.encode()).hexdigest()[:32]}"'
+    response = HttpResponse(body, content_type='application/json')
+    response['ETag'] = etag
+    # Responses depend on the token; proxies must not share them or serve them stale
+    response['Cache-Control'] = 'private, no-cache'
+    patch_vary_headers(response, ['Authorization'])
+    return get_conditional_response(request, etag=etag, response=response)
+
+
+def parse_fields(request):
+    """?fields=a,b -> list of model fields, id first"""
+    raw = request.GET.get('fields', '')
+    if not raw:
+        return list(INQUIRY_FIELDS)
+    fields = [field.strip() for field in raw.split(',') if field.strip()]
+    unknown = sorted(set(fields) - set(INQUIRY_FIELDS))
+    if unknown:
+        raise BadRequest(f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(INQUIRY_FIELDS)}")
+    return ['id'] + [field for field in dict.fromkeys(fields) if field != 'id']
+
+
+def parse_limit(request):
+    try:
+        limit = int(request.GET.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        raise BadRequest("'limit' must be an integer")
+    return min(max(limit, 1), MAX_LIMIT)
+
+
+def parse_since(request):
+    raw = request.GET.get('since')
+    if not raw:
+        return None
+    since = parse_datetime(raw)
+    if since is None:
+        raise BadRequest("'since' must be an ISO 8601 datetime, e.g. 2026-01-31T00:00:00Z")
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+def encode_cursor(updated_at, pk):
+    return base64.urlsafe_b64encode(f'{updated_at.isoformat()}|{pk}'.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Cursor -> (updated_at, id)"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        updated_at, pk = raw.rsplit('|', 1)
+        updated_at = parse_datetime(updated_at)
+        if updated_at is None:
+            raise ValueError
+        return updated_at, int(pk)
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        raise BadRequest("Invalid 'cursor'; pass back a next_cursor value unchanged")
+
+
+@require_http_methods(["GET"])
+@token_required
+def inquiry_list(request):
+    """
+    Inquiries changed since a point, oldest change first.
+    GET ?fields=&group=&lead_status=&client_status=&since=<datetime>&cursor=<next_cursor>&limit=<n>
+    """
+    fields = parse_fields(request)
+    limit = parse_limit(request)
+
+    inquiries = ClientInquiry.objects.filter(updated_at__lt=timezone.now() - timedelta(seconds=SETTLE_SECONDS))
+    for param in ('group', 'lead_status', 'client_status'):
+        if request.GET.get(param):
+            inquiries = inquiries.filter(**{param: request.GET[param]})
+
+    since = parse_since(request)
+    if since:
+        inquiries = inquiries.filter(updated_at__gte=since)
+
+    cursor = request.GET.get('cursor')
+    if cursor:
+        updated_at, pk = decode_cursor(cursor)
+        # (updated_at, id) > cursor, written so SQLite can range-scan pages_inquiry_updated_idx
+        inquiries = inquiries.filter(updated_at__gte=updated_at).exclude(updated_at=updated_at, id__lte=pk)
+
+    # updated_at is always read for the cursor but only returned if requested
+    rows = list(
+        inquiries.order_by('updated_at', 'id').values(*dict.fromkeys(fields + ['updated_at']))[:limit + 1]
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = encode_cursor(rows[-1]['updated_at'], rows[-1]['id']) if rows else cursor
+    return api_response(request, {
+        'results': [{field: row[field] for field in fields} for row in rows],
+        # Store this and pass it back as ?cursor= for the next page or the next sync
+        'next_cursor': next_cursor,
+        'has_more': has_more,
+    })
+
+
+@require_http_methods(["GET"])
+@token_required
+def inquiry_detail(request, inquiry_id):
+    """One inquiry. GET ?fields="""
+    fields = parse_fields(request)
+    row = ClientInquiry.objects.filter(id=inquiry_id).values(*fields).first()
+    if row is None:
+        return JsonResponse({'error': 'Not found'}, status=404)
+    return api_response(request, row)
+
+
+@require_http_methods(["GET"])
+@token_required
+def stats(request):
+    """Current lead/client counters plus the dashboard's funnel and weekly/daily series"""
+    return api_response(request, {
+        'counters': get_inquiry_counters(),
+        **get_dashboard_stats(),
+    })
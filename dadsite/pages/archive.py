@@ -0,0 +1,155 @@
+"""
+Archival of old inquiries
+
+Denied leads and long-inactive clients are rarely looked at again but are
+scanned by every changelist, count and index on ClientInquiry.
+archive_inquiries() moves those past their retention period into
+ArchivedInquiry in small batches: each batch copies the rows (full row
+compressed, searchable columns in clear) and deletes them from the live
+table in one short transaction. Inquiry events are left alone; they refer to
+inquiries by id, which ArchivedInquiry keeps as original_id, and the
+dashboard history counts archived inquiries too.
+
+On SQLite, compact() afterwards refreshes the planner statistics and, when
+the database uses incremental auto-vacuum, returns the freed pages to the
+file system a chunk at a time.
+"""
+import json
+import logging
+import time
+import zlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ArchivedInquiry, ClientInquiry
+
+logger = logging.getLogger(__name__)
+
+# reason -> rows it applies to (all are further limited to updated_at < cutoff)
+RULES = {
+    'denied': Q(group='lead', lead_status='denied'),
+    'inactive': Q(group='client', client_status='inactive'),
+}
+
+# Columns copied in clear for searching and for rebuild_daily_stats()
+ARCHIVED_COLUMNS = [
+    'name', 'email', 'phone', 'group', 'lead_status', 'client_status',
+    'submitted_at', 'reviewed_at', 'approved_at', 'updated_at',
+]
+
+# Pages freed per PRAGMA incremental_vacuum, i.e. per write-lock hold
+VACUUM_CHUNK_PAGES = 2000
+
+
+def retention_cutoffs(now=None, denied_days=None, inactive_days=None):
+    """reason -> datetime; rows last changed before it are archived"""
+    now = now or timezone.now()
+    return {
+        'denied': now - timedelta(days=settings.ARCHIVE_DENIED_AFTER_DAYS if denied_days is None else denied_days),
+        'inactive': now - timedelta(days=settings.ARCHIVE_INACTIVE_AFTER_DAYS if inactive_days is None else inactive_days),
+    }
+
+
+def candidates(reason, cutoff):
+    """Inquiries due for archiving under one rule, in (updated_at, id) order"""
+    return ClientInquiry.objects.filter(RULES[reason], updated_at__lt=cutoff).order_by('updated_at', 'id')
+
+
+def compress_row(row):
+    return zlib.compress(json.dumps(row, cls=DjangoJSONEncoder, separators=(',', ':')).encode(), 9)
+
+
+def archived_copy(row, reason):
+    """An unsaved ArchivedInquiry for a ClientInquiry `.values()` row"""
+    return ArchivedInquiry(
+        original_id=row['id'],
+        reason=reason,
+        data=compress_row(row),
+        **{column: row[column] for column in ARCHIVED_COLUMNS},
+    )
+
+
+def archive_batch(reason, cutoff, after=None, batch_size=500):
+    """
+    Move up to `batch_size` due inquiries, after the (updated_at, id)
+    position `after`, into the archive.
+
+    Returns:
+        tuple: (number moved, position of the last row or None when done,
+        uncompressed bytes, compressed bytes)
+    """
+    rows = candidates(reason, cutoff)
+    if after:
+        # (updated_at, id) > after, written so SQLite range-scans pages_inquiry_updated_idx
+        rows = rows.filter(updated_at__gte=after[0]).exclude(updated_at=after[0], id__lte=after[1])
+
+    with transaction.atomic():
+        batch = list(rows.values()[:batch_size])
+        if not batch:
+            return 0, None, 0, 0
+        archived = [archived_copy(row, reason) for row in batch]
+        ArchivedInquiry.objects.bulk_create(archived)
+        ClientInquiry.objects.filter(id__in=[row['id'] for row in batch]).delete()
+
+    last = batch[-1]
+    raw_bytes = sum(len(json.dumps(row, cls=DjangoJSONEncoder, separators=(',', ':'))) for row in batch)
+    return len(batch), (last['updated_at'], last['id']), raw_bytes, sum(len(item.data) for item in archived)
+
+
+def sqlite_pragma(name):
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+
+def compact(pause=0.05):
+    """
+    SQLite only: ANALYZE the two inquiry tables, then free pages with
+    incremental vacuum if the database is in that auto_vacuum mode.
+
+    Returns:
+        dict: 'analyzed' (bool), 'auto_vacuum' (mode name), 'freed_pages',
+        'free_pages' (left in the file), 'page_size'
+    """
+    if connection.vendor != 'sqlite':
+        return {'analyzed': False}
+
+    with connection.cursor() as cursor:
+        for model in (ClientInquiry, ArchivedInquiry):
+            cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
+
+    mode = {0: 'none', 1: 'full', 2: 'incremental'}.get(sqlite_pragma('auto_vacuum'), 'unknown')
+    freed = 0
+    if mode == 'incremental':
+        while (free := sqlite_pragma('freelist_count')) > 0:
+            with connection.cursor() as cursor:
+                cursor.execute(f'PRAGMA incremental_vacuum({min(free, VACUUM_CHUNK_PAGES)})')
+                cursor.fetchall()
+            freed += min(free, VACUUM_CHUNK_PAGES)
+            if pause:
+                time.sleep(pause)
+
+    return {
+        'analyzed': True,
+        'auto_vacuum': mode,
+        'freed_pages': freed,
+        'free_pages': sqlite_pragma('freelist_count'),
+        'page_size': sqlite_pragma('page_size'),
+    }
+
+
+def enable_incremental_vacuum():
+    """
+    Switch the SQLite file to auto_vacuum=INCREMENTAL. This needs a full
+    VACUUM, which rewrites the whole file under an exclusive lock (and needs
+    that much free disk space), so it is a one-off step for a quiet moment.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        cursor.execute('VACUUM')
+    logger.info("Switched SQLite to incremental auto-vacuum")
@@ -1,9 +1,11 @@
 """Email alert system for sending notifications to distribution lists"""
 
 import logging
-from django.core.mail import send_mail
+from contextlib import suppress
+from django.core.mail import EmailMessage, get_connection, send_mail
 from django.conf import settings
-from .models import AlertType
+from django.utils import timezone
+from .models import AlertSubscription, AlertType, PendingAlert
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +14,10 @@ def send_alert_email(alert_type_key, subject, message, fail_silently=True):
     """
     Send an email alert to all subscribed recipients for a given alert type.
 
+    Recipients whose subscription uses an hourly/daily digest don't get an
+    email now; the alert is stored as a PendingAlert and included in their
+    next digest (see send_alert_digests).
+
     Args:
         alert_type_key: The alert_type field value (e.g., 'new_inquiry')
         subject: Email subject line
@@ -22,40 +28,166 @@ def send_alert_email(alert_type_key, subject, message, fail_silently=True):
         tuple: (success: bool, recipients: list, error: str or None)
     """
     try:
-        # Get the alert type
-        alert = AlertType.objects.filter(alert_type=alert_type_key, is_active=True).first()
+        # Get the alert type and its active recipients
+        alert = get_alert_recipients_map().get(alert_type_key)
 
         if not alert:
-            logger.warning(f"Alert type '{alert_type_key}' not found or not active. Email not sent.")
+            logger.warning("Alert type '%s' not found or not active. Email not sent.", alert_type_key)
             return (False, [], f"Alert type '{alert_type_key}' not configured or disabled")
 
-        # Get active recipients
-        recipients = alert.get_active_recipients()
+        subscriptions = alert['subscriptions']
+        recipients = [sub['email'] for sub in subscriptions]
 
         if not recipients:
-            logger.warning(f"No active recipients for alert '{alert_type_key}'. Email not sent.")
+            logger.warning("No active recipients for alert '%s'. Email not sent.", alert_type_key)
             return (False, [], "No active recipients configured for this alert")
 
-        # Send the email
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            recipients,
-            fail_silently=fail_silently,
-        )
+        immediate = [sub['email'] for sub in subscriptions if sub['delivery_mode'] == 'immediate']
+        digest = [sub for sub in subscriptions if sub['delivery_mode'] != 'immediate']
+
+        if digest:
+            PendingAlert.objects.bulk_create([
+                PendingAlert(
+                    recipient_id=sub['recipient_id'],
+                    alert_type_id=alert['id'],
+                    delivery_mode=sub['delivery_mode'],
+                    subject=subject[:255],
+                    message=message,
+                )
+                for sub in digest
+            ])
+            logger.info("Alert '%s' queued for %d digest recipients", alert_type_key, len(digest))
+
+        if immediate:
+            # Send the email
+            send_mail(
+                subject,
+                message,
+                settings.DEFAULT_FROM_EMAIL,
+                immediate,
+                fail_silently=fail_silently,
+            )
+            logger.info("Alert '%s' sent to %d recipients: %s", alert_type_key, len(immediate), ', '.join(immediate))
 
-        logger.info(f"Alert '{alert_type_key}' sent to {len(recipients)} recipients: {', '.join(recipients)}")
         return (True, recipients, None)
 
     except Exception as e:
-        logger.error(f"Error sending alert '{alert_type_key}': {str(e)}")
+        logger.error("Error sending alert '%s': %s", alert_type_key, e)
         if fail_silently:
             return (False, [], str(e))
         else:
             raise
 
 
+def send_alert_digests(delivery_mode, fail_silently=True):
+    """
+    Send one combined email per recipient for all pending alerts of a
+    digest mode ('hourly' or 'daily'), over a single mail connection.
+
+    Each recipient is handled on its own: their alerts are removed once
+    their digest has been handed to the mail backend. If their email fails,
+    the error is logged and collected, their alerts stay queued for the next
+    run, and the other recipients still get their digests.
+
+    Args:
+        delivery_mode: 'hourly' or 'daily'
+        fail_silently: Whether to carry on after a failed email (False raises the first error)
+
+    Returns:
+        tuple: (digests_sent: int, alerts_sent: int, errors: list of (email, error) tuples)
+    """
+    pending = PendingAlert.objects.filter(delivery_mode=delivery_mode).select_related('recipient', 'alert_type').order_by('recipient_id', 'created_at')
+
+    by_recipient = {}
+    for alert in pending:
+        by_recipient.setdefault(alert.recipient, []).append(alert)
+
+    if not by_recipient:
+        return (0, 0, [])
+
+    digests_sent = 0
+    alerts_sent = 0
+    errors = []
+    label = 'Hourly' if delivery_mode == 'hourly' else 'Daily'
+
+    connection = get_connection()
+    try:
+        for recipient, alerts in by_recipient.items():
+            email = EmailMessage(
+                f"{label} alert digest: {len(alerts)} update{'s' if len(alerts) != 1 else ''}",
+                render_digest(recipient, alerts),
+                settings.DEFAULT_FROM_EMAIL,
+                [recipient.email],
+                connection=connection,
+            )
+            try:
+                # No-op while the connection is up; reconnects after a failed send
+                connection.open()
+                email.send()
+            except Exception as e:
+                logger.error("Error sending %s digest to %s: %s", delivery_mode, recipient.email, e)
+                if not fail_silently:
+                    raise
+                errors.append((recipient.email, str(e)))
+                # Drop a possibly broken SMTP session so the next recipient gets a fresh one
+                with suppress(Exception):
+                    connection.close()
+                continue
+
+            PendingAlert.objects.filter(id__in=[alert.id for alert in alerts]).delete()
+            digests_sent += 1
+            alerts_sent += len(alerts)
+    finally:
+        with suppress(Exception):
+            connection.close()
+
+    logger.info("Sent %d %s digests covering %d alerts, %d failed", digests_sent, delivery_mode, alerts_sent, len(errors))
+    return (digests_sent, alerts_sent, errors)
+
+
+def render_digest(recipient, alerts):
+    """Render the plain-text body of a digest email"""
+    lines = [f"Hi {recipient.name},", "", f"{len(alerts)} alert{'s' if len(alerts) != 1 else ''} since your last digest:", ""]
+
+    for alert in alerts:
+        lines.append('=' * 60)
+        lines.append(f"{timezone.localtime(alert.created_at).strftime('%Y-%m-%d %H:%M')} - {alert.subject}")
+        lines.append('=' * 60)
+        lines.append(alert.message.strip())
+        lines.append('')
+
+    lines.append('---')
+    lines.append('Change how you receive these alerts in the admin panel under Alert Subscriptions.')
+    return '\n'.join(lines)
+
+
+def get_alert_recipients_map():
+    """
+    Get active recipients for every enabled alert type from the database
+    (two small queries). Not cached: a per-process cache went stale in every
+    worker but the one that saved a change, and it is cheap next to sending mail.
+
+    Returns:
+        dict: {alert_type_key: {'id': int, 'subscriptions': [{'recipient_id', 'email', 'delivery_mode'}]}}
+    """
+    recipients_map = {
+        alert_type_key: {'id': alert_id, 'subscriptions': []}
+        for alert_id, alert_type_key in AlertType.objects.filter(is_active=True).values_list('id', 'alert_type')
+    }
+    subscriptions = AlertSubscription.objects.filter(
+        alert_type__is_active=True,
+        is_subscribed=True,
+        recipient__is_active=True,
+    ).values_list('alert_type__alert_type', 'recipient_id', 'recipient__email', 'delivery_mode').order_by('recipient__name')
+    for alert_type_key, recipient_id, email, delivery_mode in subscriptions:
+        recipients_map[alert_type_key]['subscriptions'].append({
+            'recipient_id': recipient_id,
+            'email': email,
+            'delivery_mode': delivery_mode,
+        })
+    return recipients_map
+
+
 def get_alert_recipients(alert_type_key):
     """
     Get list of active recipients for a given alert type.
@@ -67,10 +199,10 @@ def get_alert_recipients(alert_type_key):
         list: Email addresses of active recipients
     """
     try:
-        alert = AlertType.objects.filter(alert_type=alert_type_key, is_active=True).first()
+        alert = get_alert_recipients_map().get(alert_type_key)
         if alert:
-            return alert.get_active_recipients()
+            return [sub['email'] for sub in alert['subscriptions']]
         return []
     except Exception as e:
-        logger.error(f"Error getting recipients for alert '{alert_type_key}': {str(e)}")
+        logger.error("Error getting recipients for alert '%s': %s", alert_type_key, e)
         return []
@@ -0,0 +1,128 @@
+"""
+Escalation of leads nobody has reviewed within STALE_LEAD_HOURS
+
+The contact page promises a reply within 24 hours. escalate_stale_leads()
+(run hourly by the escalate_stale_leads command) tails the inquiry event log
+like any other consumer: it reads the events after its stored watermark by id
+(a primary key range scan) up to the first one that is not yet overdue, looks
+up which of those submissions are still pending, and sends all of them in a
+single 'stale_lead' alert. The watermark then moves past them, so every lead
+is escalated at most once and a run only ever reads the events of the last
+day or so, however long the history is.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .email_alerts import get_alert_recipients_map, send_alert_email
+from .events import get_watermark
+from .models import ClientInquiry, EventWatermark, InquiryEvent
+
+logger = logging.getLogger(__name__)
+
+STALE_LEADS_CONSUMER = 'stale_leads'
+STALE_LEAD_ALERT = 'stale_lead'
+
+# Leads listed in full in the alert; the rest are counted
+MAX_LISTED = 50
+
+
+def find_stale_leads(watermark, cutoff, batch_size=1000):
+    """
+    Still-pending inquiries submitted at or before `cutoff`, from the events
+    after `watermark`.
+
+    Returns:
+        tuple: (id of the last event at or before the cutoff, or `watermark`
+        if there is none; number of events read; list of ClientInquiry oldest first)
+    """
+    last_id = watermark
+    scanned = 0
+    submitted = []
+    reached_cutoff = False
+    while not reached_cutoff:
+        # Filtering on id alone keeps this a rowid range scan; created_at and
+        # event_type are checked here rather than letting SQLite pick the
+        # (event_type, created_at) index and walk the whole history
+        batch = list(
+            InquiryEvent.objects.filter(id__gt=last_id).order_by('id')
+            .values_list('id', 'inquiry_id', 'event_type', 'created_at')[:batch_size]
+        )
+        for event_id, inquiry_id, event_type, created_at in batch:
+            if created_at > cutoff:
+                reached_cutoff = True
+                break
+            last_id = event_id
+            scanned += 1
+            if event_type == 'submitted':
+                submitted.append(inquiry_id)
+        if len(batch) < batch_size:
+            break
+
+    stale = ClientInquiry.objects.filter(id__in=submitted, group='lead', lead_status='pending')
+    return last_id, scanned, sorted(stale, key=lambda inquiry: inquiry.submitted_at)
+
+
+def format_stale_lead_alert(inquiries, now):
+    """(subject, message) for one escalation listing `inquiries`"""
+    count = len(inquiries)
+    subject = f"⏰ {count} lead{'s' if count != 1 else ''} waiting more than {settings.STALE_LEAD_HOURS} hours"
+
+    lines = [
+        f"These inquiries have not been reviewed within {settings.STALE_LEAD_HOURS} hours "
+        f"(the contact page promises a reply within 24 hours):",
+        '',
+    ]
+    for inquiry in inquiries[:MAX_LISTED]:
+        waiting = int((now - inquiry.submitted_at).total_seconds() // 3600)
+        lines.append(
+            f"- {inquiry.name} <{inquiry.email}>, {inquiry.phone or 'no phone'}: "
+            f"submitted {timezone.localtime(inquiry.submitted_at).strftime('%Y-%m-%d %H:%M')} ({waiting}h ago)"
+        )
+    if count > MAX_LISTED:
+        lines.append(f"... and {count - MAX_LISTED} more")
+    lines += ['', 'Review them at /manage/inquiries/pending/']
+    return subject, '\n'.join(lines)
+
+
+def escalate_stale_leads(now=None, dry_run=False):
+    """
+    Send one alert for every lead that became overdue since the last run.
+
+    The watermark only advances once the alert has been sent, so a failed
+    send is retried on the next run (leads reviewed in the meantime drop
+    out). With no active recipients there is nobody to retry for: the leads
+    are logged and skipped.
+
+    Returns:
+        dict: 'scanned' (events read past the watermark), 'stale' (list of
+        inquiries), 'sent' (bool), 'error' (str or None)
+    """
+    now = now or timezone.now()
+    cutoff = now - timedelta(hours=settings.STALE_LEAD_HOURS)
+    watermark = get_watermark(STALE_LEADS_CONSUMER)
+    last_id, scanned, stale = find_stale_leads(watermark, cutoff)
+    result = {'scanned': scanned, 'stale': stale, 'sent': False, 'error': None}
+
+    if dry_run:
+        return result
+
+    alert = get_alert_recipients_map().get(STALE_LEAD_ALERT)
+    if stale and not (alert and alert['subscriptions']):
+        result['error'] = f"Alert type '{STALE_LEAD_ALERT}' is disabled or has no active recipients"
+        logger.warning("%d stale leads not escalated: %s", len(stale), result['error'])
+    elif stale:
+        subject, message = format_stale_lead_alert(stale, now)
+        success, recipients, error = send_alert_email(STALE_LEAD_ALERT, subject, message, fail_silently=True)
+        if not success:
+            logger.warning("Stale lead alert for %d leads not sent: %s", len(stale), error)
+            result['error'] = error
+            return result
+        result['sent'] = True
+        logger.info("Escalated %d stale leads to %d recipients", len(stale), len(recipients))
+
+    if last_id != watermark:
+        EventWatermark.objects.update_or_create(name=STALE_LEADS_CONSUMER, defaults={'last_event_id': last_id})
+    return result
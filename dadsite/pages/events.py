@@ -0,0 +1,105 @@
+"""
+Inquiry event log
+
+Every inquiry state transition appends one InquiryEvent row in the same
+transaction as the change. Downstream jobs (stats, digests, exports) tail the
+log by id instead of re-scanning the inquiry table:
+
+    batch = events_after(watermark)            # stateless: caller keeps the watermark
+    consume_events('daily_stats', handler)     # stateful: watermark stored in EventWatermark
+
+SQLite allows one writer at a time and Django creates the id column with
+AUTOINCREMENT, so ids are committed in increasing order and never reused;
+reading `id > watermark` never skips an event.
+"""
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import EventWatermark, InquiryEvent
+
+logger = logging.getLogger(__name__)
+
+
+def record_event(inquiry, event_type, from_state='', actor=''):
+    """
+    Append an event for `inquiry`'s current state. Call it inside the
+    transaction that saved the change so both commit (or roll back) together;
+    the daily stats rollups are updated after that transaction commits.
+    """
+    event = InquiryEvent.objects.create(
+        inquiry=inquiry,
+        event_type=event_type,
+        from_state=from_state,
+        to_state=inquiry.state,
+        actor=actor,
+    )
+
+    # Fold the event into the dashboard rollups once the transition commits
+    from .stats import refresh_daily_stats
+    transaction.on_commit(refresh_daily_stats)
+    return event
+
+
+def events_after(watermark=0, limit=500, event_types=None):
+    """
+    Events with id greater than `watermark`, oldest first. Pass the last
+    event's id back in as the next watermark.
+
+    Args:
+        watermark: Last event id already processed (0 = from the beginning)
+        limit: Maximum number of events to return
+        event_types: Optional list of event_type values to include
+
+    Returns:
+        list: InquiryEvent objects
+    """
+    events = InquiryEvent.objects.filter(id__gt=watermark).order_by('id')
+    if event_types:
+        events = events.filter(event_type__in=event_types)
+    return list(events[:limit])
+
+
+def latest_event_id():
+    """Id of the newest event (0 if there are none), i.e. a watermark that skips all history"""
+    return InquiryEvent.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+
+def get_watermark(consumer):
+    """Stored watermark for a named consumer (0 if it has never run)"""
+    return EventWatermark.objects.filter(name=consumer).values_list('last_event_id', flat=True).first() or 0
+
+
+def consume_events(consumer, handler, batch_size=500):
+    """
+    Pass new events to `handler(events)` in batches and advance the
+    consumer's stored watermark. Each batch is handled in one transaction
+    with the watermark update, so a failing handler leaves the watermark
+    where it was and the batch is retried on the next run.
+
+    Returns:
+        int: Number of events processed
+    """
+    EventWatermark.objects.get_or_create(name=consumer)
+    processed = 0
+    while True:
+        with transaction.atomic():
+            # Write first so SQLite takes the write lock before the watermark
+            # is read; concurrent runs then queue up instead of both applying
+            # the same batch
+            EventWatermark.objects.filter(name=consumer).update(updated_at=timezone.now())
+            watermark = EventWatermark.objects.get(name=consumer)
+            batch = events_after(watermark.last_event_id, batch_size)
+            if not batch:
+                break
+            handler(batch)
+            watermark.last_event_id = batch[-1].id
+            watermark.save(update_fields=['last_event_id', 'updated_at'])
+        processed += len(batch)
+        if len(batch) < batch_size:
+            break
+
+    if processed:
+        logger.info("Event consumer '%s' processed %d events", consumer, processed)
+    return processed
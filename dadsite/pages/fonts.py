@@ -0,0 +1,77 @@
+"""
+Self-hosted Montserrat
+
+`python manage.py build_fonts` scans the templates for the Tailwind font-weight
+classes in use, subsets just those weights of Montserrat to Latin woff2 files in
+static/fonts/ and records them in static/fonts/fonts.json. The {% font_faces %}
+tag (pages.templatetags.fonts) turns that manifest into @font-face rules and
+preload hints, so pages need no request to Google Fonts.
+"""
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+
+FONT_FAMILY = 'Montserrat'
+FONT_DIR = 'fonts'
+FONT_MANIFEST = f'{FONT_DIR}/fonts.json'
+
+# Variable Montserrat from the Google Fonts repository (weights 100-900)
+FONT_SOURCE_URL = 'https://github.com/google/fonts/raw/main/ofl/montserrat/Montserrat%5Bwght%5D.ttf'
+
+# Google Fonts' "latin" subset, so output matches what the CSS API used to serve
+LATIN_UNICODE_RANGE = (
+    'U+0000-00FF, U+0131, U+0152-0153, U+02BB-02BC, U+02C6, U+02DA, U+02DC, U+0304, U+0308, U+0329, '
+    'U+2000-206F, U+20AC, U+2122, U+2191, U+2193, U+2212, U+2215, U+FEFF, U+FFFD'
+)
+
+TAILWIND_WEIGHTS = {
+    'thin': 100, 'extralight': 200, 'light': 300, 'normal': 400, 'medium': 500,
+    'semibold': 600, 'bold': 700, 'extrabold': 800, 'black': 900,
+}
+# Google Fonts static file names, for building from a directory of static TTFs
+WEIGHT_NAMES = {
+    100: 'Thin', 200: 'ExtraLight', 300: 'Light', 400: 'Regular', 500: 'Medium',
+    600: 'SemiBold', 700: 'Bold', 800: 'ExtraBold', 900: 'Black',
+}
+FONT_WEIGHT_RE = re.compile(r'\bfont-(' + '|'.join(TAILWIND_WEIGHTS) + r')\b')
+
+# Body text (400) and <strong>/<b> (700) are always needed
+DEFAULT_WEIGHTS = {400, 700}
+# Weights worth preloading: body text and the bold/black headings above the fold
+DEFAULT_PRELOAD = [400, 700, 900]
+
+
+@lru_cache(maxsize=1)
+def used_weights():
+    """
+    Font weights referenced by Tailwind classes in the templates and form
+    widgets. Cached: the Google Fonts fallback in {% font_faces %} calls this
+    on every page render.
+    """
+    app_dir = Path(__file__).resolve().parent
+    sources = list((app_dir / 'templates').rglob('*.html')) + list(app_dir.glob('*.py'))
+    weights = set(DEFAULT_WEIGHTS)
+    for path in sources:
+        weights.update(TAILWIND_WEIGHTS[name] for name in FONT_WEIGHT_RE.findall(path.read_text(encoding='utf-8')))
+    return sorted(weights)
+
+
+def font_filename(weight):
+    return f'{FONT_DIR}/{FONT_FAMILY.lower()}-latin-{weight}.woff2'
+
+
+@lru_cache(maxsize=1)
+def load_font_manifest():
+    """The manifest written by build_fonts, or None if fonts haven't been built"""
+    path = finders.find(FONT_MANIFEST)
+    if path is None and settings.STATIC_ROOT:
+        candidate = Path(settings.STATIC_ROOT) / FONT_MANIFEST
+        path = candidate if candidate.exists() else None
+    if path is None:
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
@@ -0,0 +1,200 @@
+"""Health probes for load balancers, container orchestration and staff monitoring"""
+
+import logging
+import os
+import shutil
+import sqlite3
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+# Recent request durations (seconds) for this worker process, recorded by
+# RequestTimingMiddleware and used for the p95 latency in the detailed status
+REQUEST_DURATIONS = deque(maxlen=1000)
+
+
+def record_request_duration(duration):
+    """Record how long a request took (in seconds)"""
+    REQUEST_DURATIONS.append(duration)
+
+
+def latency_percentiles():
+    """
+    Return p50/p95 latency in milliseconds over the recent request window.
+
+    Returns:
+        dict: {'samples': int, 'p50_ms': float or None, 'p95_ms': float or None}
+    """
+    samples = sorted(REQUEST_DURATIONS)
+    if not samples:
+        return {'samples': 0, 'p50_ms': None, 'p95_ms': None}
+
+    def percentile(p):
+        index = min(len(samples) - 1, int(round(p / 100 * (len(samples) - 1))))
+        return round(samples[index] * 1000, 2)
+
+    return {'samples': len(samples), 'p50_ms': percentile(50), 'p95_ms': percentile(95)}
+
+
+def cached_probe(cache_key, probe):
+    """
+    Run a probe at most once per HEALTH_CHECK_CACHE_SECONDS.
+
+    Probe traffic (load balancers hitting every second) then costs one real
+    check per TTL window instead of one per request.
+    """
+    result = cache.get(cache_key)
+    if result is None:
+        result = probe()
+        cache.set(cache_key, result, settings.HEALTH_CHECK_CACHE_SECONDS)
+    return result
+
+
+def check_database():
+    """
+    Readiness check for the database: SELECT 1, plus journal mode, WAL size
+    and write-lock availability on SQLite.
+
+    Returns:
+        dict: check results with an 'ok' boolean
+    """
+    result = {'ok': False}
+    started = time.perf_counter()
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+        result['ok'] = True
+    except Exception as e:
+        logger.error("Health check database query failed: %s", e)
+        result['error'] = str(e)
+        return result
+    finally:
+        result['query_ms'] = round((time.perf_counter() - started) * 1000, 2)
+
+    if connection.vendor == 'sqlite':
+        result.update(check_sqlite(settings.DATABASES['default']['NAME']))
+        result['ok'] = result['ok'] and not result.get('locked', False)
+
+    return result
+
+
+def check_sqlite(db_path):
+    """
+    SQLite specific checks using a short-lived connection with a bounded
+    busy timeout, so a stuck writer makes the probe fail fast instead of hang.
+    """
+    result = {}
+    db_path = str(db_path)
+    timeout = settings.HEALTH_CHECK_DB_TIMEOUT
+
+    try:
+        conn = sqlite3.connect(db_path, timeout=timeout, isolation_level=None)
+        try:
+            result['journal_mode'] = conn.execute('PRAGMA journal_mode').fetchone()[0]
+
+            # BEGIN IMMEDIATE takes (and immediately releases) the reserved
+            # write lock; it only fails if another writer holds it past the timeout
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                conn.execute('ROLLBACK')
+                result['locked'] = False
+            except sqlite3.OperationalError as e:
+                result['locked'] = True
+                result['error'] = str(e)
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        result['locked'] = True
+        result['error'] = str(e)
+
+    wal_path = db_path + '-wal'
+    result['wal_bytes'] = os.path.getsize(wal_path) if os.path.exists(wal_path) else 0
+
+    return result
+
+
+def check_cache():
+    """Round-trip a value through the default cache"""
+    started = time.perf_counter()
+    try:
+        token = str(time.time())
+        cache.set('health_check_cache_probe', token, 30)
+        ok = cache.get('health_check_cache_probe') == token
+        return {
+            'ok': ok,
+            'backend': settings.CACHES['default']['BACKEND'],
+            'round_trip_ms': round((time.perf_counter() - started) * 1000, 2),
+        }
+    except Exception as e:
+        return {'ok': False, 'error': str(e)}
+
+
+def check_disk():
+    """Free space for the directories the site writes to (db/ and logs/)"""
+    results = {}
+    min_free = settings.HEALTH_DISK_MIN_FREE_MB * 1024 * 1024
+
+    for name in ['db', 'logs']:
+        path = settings.BASE_DIR / name
+        try:
+            usage = shutil.disk_usage(path)
+            results[name] = {
+                'ok': usage.free >= min_free,
+                'free_mb': usage.free // (1024 * 1024),
+                'total_mb': usage.total // (1024 * 1024),
+            }
+        except OSError as e:
+            results[name] = {'ok': False, 'error': str(e)}
+
+    return results
+
+
+def check_email():
+    """Email backend configuration and number of alerts waiting for a digest"""
+    from .models import PendingAlert
+
+    try:
+        outbox_depth = PendingAlert.objects.count()
+    except Exception as e:
+        return {'ok': False, 'backend': settings.EMAIL_BACKEND, 'error': str(e)}
+
+    return {
+        'ok': True,
+        'backend': settings.EMAIL_BACKEND,
+        'outbox_depth': outbox_depth,
+    }
+
+
+def detailed_status():
+    """
+    Full status for staff: database, cache, disk, email and latency.
+
+    Returns:
+        dict: per-component results and an overall 'status'
+    """
+    components = {
+        'database': check_database(),
+        'cache': check_cache(),
+        'disk': check_disk(),
+        'email': check_email(),
+    }
+    healthy = (
+        components['database']['ok']
+        and components['cache']['ok']
+        and components['email']['ok']
+        and all(d['ok'] for d in components['disk'].values())
+    )
+    return {
+        'status': 'healthy' if healthy else 'degraded',
+        'checked_at': time.time(),
+        'pid': os.getpid(),
+        'latency': latency_percentiles(),
+        **components,
+    }
@@ -0,0 +1,126 @@
+"""
+Build step that moves inline <style> and <script> blocks out of templates
+
+Every template in pages/templates is copied to BUILD_DIR/templates with each
+static inline block replaced by a <link>/<script src> tag pointing at a file in
+BUILD_DIR/static/inline/. The copies shadow the originals (settings.TEMPLATES
+DIRS) and the extracted files are collected like any other static file, so
+CompressedManifestStaticFilesStorage gives them hashed names and browsers cache
+them instead of downloading them again with every page.
+
+Blocks that contain template syntax ({{ }}, {% %}, {# #}) depend on the request
+and stay inline. Identical blocks (e.g. the .angle-top rules repeated on several
+pages) share one file.
+"""
+import hashlib
+import re
+import shutil
+import textwrap
+from pathlib import Path
+
+TEMPLATE_DIR = Path(__file__).resolve().parent / 'templates'
+
+# Extracted files live under this prefix in STATICFILES_DIRS
+STATIC_PREFIX = 'inline'
+
+# Bare <style> and <script>/<script type="text/javascript"> blocks; anything
+# with other attributes (src, type="module", nonce, ...) is left alone
+INLINE_BLOCK_RE = re.compile(
+    r'(?P<indent>[ \t]*)<(?P<tag>style|script)(?P<attrs>(?:\s+type="text/(?:css|javascript)")?)\s*>'
+    r'(?P<body>.*?)</(?P=tag)>',
+    re.S | re.I,
+)
+TEMPLATE_SYNTAX_RE = re.compile(r'\{[{%#]')
+EXTENDS_RE = re.compile(r'\{%\s*extends\s+[^%]*%\}')
+LOAD_STATIC_RE = re.compile(r'\{%\s*load\s+(?:[\w.]+\s+)*static(?:\s+[\w.]+)*\s*%\}')
+
+EXTENSIONS = {'style': 'css', 'script': 'js'}
+
+
+def asset_name(tag, body):
+    """Static path for a block: its normalised content hash, so duplicates share a file"""
+    digest = hashlib.sha256(body.encode()).hexdigest()[:12]
+    return f"{STATIC_PREFIX}/{digest}.{EXTENSIONS[tag]}"
+
+
+def asset_tag(tag, path):
+    """The tag that replaces an inline block"""
+    if tag == 'style':
+        return f'<link rel="stylesheet" href="{{% static \'{path}\' %}}">'
+    return f'<script src="{{% static \'{path}\' %}}"></script>'
+
+
+def add_load_static(source):
+    """Make sure {% static %} is available: after {% extends %}, or first thing in the file"""
+    if LOAD_STATIC_RE.search(source):
+        return source
+    extends = EXTENDS_RE.search(source)
+    if extends:
+        return source[:extends.end()] + '\n{% load static %}' + source[extends.end():]
+    return '{% load static %}' + source
+
+
+def extract_blocks(source):
+    """
+    Replace the static inline blocks in one template's source.
+
+    Returns:
+        tuple: (new source, {static path: file contents}, number of blocks left inline)
+    """
+    assets = {}
+    kept = 0
+
+    def replace(match):
+        nonlocal kept
+        body = textwrap.dedent(match.group('body')).strip('\n')
+        if not body.strip() or TEMPLATE_SYNTAX_RE.search(body):
+            kept += 1
+            return match.group(0)
+        tag = match.group('tag').lower()
+        path = asset_name(tag, body)
+        assets[path] = body + '\n'
+        return match.group('indent') + asset_tag(tag, path)
+
+    new_source = INLINE_BLOCK_RE.sub(replace, source)
+    if assets:
+        new_source = add_load_static(new_source)
+    return new_source, assets, kept
+
+
+def build_templates(build_dir, template_dir=TEMPLATE_DIR):
+    """
+    Rebuild BUILD_DIR/templates and BUILD_DIR/static/inline from template_dir.
+    Only templates that had something extracted are written; the rest are
+    still loaded from the app directory.
+
+    Returns:
+        list: dicts with template name, extracted paths, blocks kept inline and bytes saved
+    """
+    build_dir = Path(build_dir)
+    templates_out = build_dir / 'templates'
+    static_out = build_dir / 'static' / STATIC_PREFIX
+    for path in (templates_out, static_out):
+        if path.exists():
+            shutil.rmtree(path)
+        path.mkdir(parents=True)
+
+    report = []
+    for path in sorted(template_dir.rglob('*.html')):
+        name = path.relative_to(template_dir).as_posix()
+        source = path.read_text(encoding='utf-8')
+        new_source, assets, kept = extract_blocks(source)
+
+        if assets:
+            target = templates_out / name
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(new_source, encoding='utf-8')
+            for asset_path, contents in assets.items():
+                (build_dir / 'static' / asset_path).write_text(contents, encoding='utf-8')
+
+        report.append({
+            'template': name,
+            'extracted': sorted(assets),
+            'kept_inline': kept,
+            'bytes_saved': len(source.encode()) - len(new_source.encode()),
+        })
+    return report
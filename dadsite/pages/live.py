@@ -0,0 +1,222 @@
+"""
+Live updates for the management pages over Server-Sent Events
+
+/manage/ and /manage/inquiries/pending/ keep one EventSource connection open to
+/manage/live/, which pushes inquiry events and refreshed counters so the pages
+patch themselves instead of being reloaded.
+
+The view is async. Under an ASGI server (the `live` service in
+docker-compose.yml) an idle connection is a coroutine waiting on a queue, so
+any number of open tabs share one event loop without holding a worker thread
+each. One EventBroadcaster per event loop polls the event log (an indexed
+`id > watermark` range query) every LIVE_UPDATES_POLL_SECONDS and, only when
+something happened, computes the counters once and fans both out to every
+connection: the database cost is the same for one open tab or fifty.
+
+Under WSGI (runserver, gunicorn) a response can't stay open without tying up a
+worker, so the view answers with whatever is new and asks the browser to
+reconnect after FALLBACK_RETRY_MS; the same page script then simply polls.
+"""
+import asyncio
+import json
+import logging
+import weakref
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection
+
+from .events import events_after, latest_event_id
+from .stats import get_inquiry_counters
+
+logger = logging.getLogger(__name__)
+
+# Events replayed to a reconnecting browser; further behind than this it reloads
+REPLAY_LIMIT = 100
+# Messages buffered per connection before a slow browser is told to reload
+QUEUE_SIZE = 200
+# EventSource reconnect delay after a dropped stream, and between WSGI polls
+RETRY_MS = 3000
+FALLBACK_RETRY_MS = 15000
+
+KEEPALIVE = b': keepalive\n\n'
+
+
+def format_message(event=None, data=None, event_id=None, retry=None):
+    """Encode one SSE message"""
+    lines = []
+    if retry is not None:
+        lines.append(f'retry: {retry}')
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    if event:
+        lines.append(f'event: {event}')
+    if data is not None:
+        lines.append(f'data: {json.dumps(data, default=str)}')
+    return ('\n'.join(lines) + '\n\n').encode()
+
+
+def event_message(event):
+    return format_message('inquiry', {
+        'id': event.id,
+        'inquiry_id': event.inquiry_id,
+        'event_type': event.event_type,
+        'from_state': event.from_state,
+        'to_state': event.to_state,
+        'created_at': event.created_at.isoformat(),
+    }, event_id=event.id)
+
+
+def reload_message():
+    return format_message('reload', {})
+
+
+def fetch_updates(after, limit):
+    """
+    Events after `after` and, if there were any, the current counters.
+    Runs in a worker thread that never sees request_finished, so its
+    database connection is closed here.
+    """
+    try:
+        events = events_after(after, limit)
+        return events, get_inquiry_counters() if events else None
+    finally:
+        connection.close()
+
+
+def fetch_latest_event_id():
+    try:
+        return latest_event_id()
+    finally:
+        connection.close()
+
+
+class Subscription:
+    """One connected browser"""
+
+    def __init__(self):
+        self.queue = asyncio.Queue(QUEUE_SIZE)
+        self.overflowed = False
+
+
+class EventBroadcaster:
+    """Polls the event log for one event loop while anyone is subscribed"""
+
+    def __init__(self):
+        self.subscriptions = set()
+        self.watermark = 0
+        self.task = None
+        self.lock = asyncio.Lock()
+
+    async def subscribe(self):
+        subscription = Subscription()
+        async with self.lock:
+            if self.task is None or self.task.done():
+                # Start from "now"; each connection replays its own backlog
+                self.watermark = await sync_to_async(fetch_latest_event_id, thread_sensitive=False)()
+                self.task = asyncio.create_task(self.run())
+            self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self.subscriptions.discard(subscription)
+
+    async def run(self):
+        while self.subscriptions:
+            await asyncio.sleep(settings.LIVE_UPDATES_POLL_SECONDS)
+            try:
+                events, counters = await sync_to_async(fetch_updates, thread_sensitive=False)(
+                    self.watermark, QUEUE_SIZE,
+                )
+            except Exception:
+                logger.exception('Live updates poll failed')
+                continue
+            if not events:
+                continue
+
+            self.watermark = events[-1].id
+            messages = [(event.id, event_message(event)) for event in events]
+            messages.append((None, format_message('counters', counters)))
+            for subscription in list(self.subscriptions):
+                try:
+                    for message in messages:
+                        subscription.queue.put_nowait(message)
+                except asyncio.QueueFull:
+                    subscription.overflowed = True
+                    self.subscriptions.discard(subscription)
+
+
+# One broadcaster per event loop: a single loop under an ASGI server, one per
+# request when async views run under WSGI
+_broadcasters = weakref.WeakKeyDictionary()
+
+
+def get_broadcaster():
+    loop = asyncio.get_running_loop()
+    if loop not in _broadcasters:
+        _broadcasters[loop] = EventBroadcaster()
+    return _broadcasters[loop]
+
+
+async def replay(after):
+    """
+    Messages for everything after `after` (a page's or Last-Event-ID's
+    watermark), or a reload request if that is more than REPLAY_LIMIT events.
+
+    Returns:
+        tuple: (list of messages, id of the last event included or None after a reload request)
+    """
+    events, counters = await sync_to_async(fetch_updates, thread_sensitive=False)(after, REPLAY_LIMIT + 1)
+    if len(events) > REPLAY_LIMIT:
+        return [reload_message()], None
+    # Tell the browser where it is even if nothing happened, so a reconnect resumes here
+    messages = [format_message('ready', {}, event_id=after, retry=RETRY_MS)]
+    messages += [event_message(event) for event in events]
+    if counters:
+        messages.append(format_message('counters', counters))
+    return messages, events[-1].id if events else after
+
+
+async def poll_once(after):
+    """WSGI fallback: the replay alone, with a longer reconnect delay"""
+    messages, _ = await replay(after)
+    return b''.join(messages) + format_message(retry=FALLBACK_RETRY_MS)
+
+
+async def stream(after):
+    """
+    Async iterator of SSE messages for one connection. Ends after
+    LIVE_UPDATES_MAX_SECONDS so the browser reconnects and its session is
+    checked again.
+    """
+    broadcaster = get_broadcaster()
+    # Subscribe before replaying so nothing falls between the two
+    subscription = await broadcaster.subscribe()
+    try:
+        messages, last_sent = await replay(after)
+        for message in messages:
+            yield message
+        if last_sent is None:
+            return
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.LIVE_UPDATES_MAX_SECONDS
+        while (remaining := deadline - loop.time()) > 0:
+            if subscription.overflowed and subscription.queue.empty():
+                yield reload_message()
+                return
+            try:
+                event_id, message = await asyncio.wait_for(
+                    subscription.queue.get(), min(settings.LIVE_UPDATES_HEARTBEAT_SECONDS, remaining),
+                )
+            except asyncio.TimeoutError:
+                # Keeps proxies from closing an idle connection
+                yield KEEPALIVE
+                continue
+            if event_id is not None:
+                if event_id <= last_sent:
+                    continue  # Already sent by the replay
+                last_sent = event_id
+            yield message
+    finally:
+        broadcaster.unsubscribe(subscription)
@@ -0,0 +1,176 @@
+"""
+Non-blocking, structured logging
+
+- configure_logging(): LOGGING_CONFIG entry point that applies settings.LOGGING and,
+  in LOG_MODE=queue, moves every handler behind a QueueHandler/QueueListener pair
+  so request threads only enqueue records and a background thread does the I/O
+- JSONFormatter: one JSON object per line with request IDs and extra fields
+- RequestContextFilter: stamps records with the current request ID
+- SamplingFilter: keeps only a fraction of high-volume INFO lines
+"""
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import logging.config
+import os
+import queue
+import random
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+# Set by RequestTimingMiddleware for the duration of each request
+request_id_var = contextvars.ContextVar('request_id', default=None)
+
+# Attributes every LogRecord has; anything else was passed through `extra=`
+RESERVED_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'request_id'}
+
+
+class RequestContextFilter(logging.Filter):
+    """Add the current request ID to every record (None outside a request)"""
+
+    def filter(self, record):
+        if not hasattr(record, 'request_id'):
+            record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep a random `rate` fraction of INFO (and lower) records.
+    Warnings and errors always pass.
+    """
+
+    def __init__(self, rate=1.0):
+        super().__init__()
+        self.rate = float(rate)
+
+    def filter(self, record):
+        if record.levelno > logging.INFO or self.rate >= 1.0:
+            return True
+        return random.random() < self.rate
+
+
+class JSONFormatter(logging.Formatter):
+    """Format records as single-line JSON objects"""
+
+    def format(self, record):
+        data = {
+            'time': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', None),
+        }
+
+        # Structured fields passed with extra={...} (e.g. duration_ms, status)
+        for key, value in record.__dict__.items():
+            if key not in RESERVED_ATTRS and not key.startswith('_'):
+                data[key] = value
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data['exception'] = record.exc_text
+
+        return json.dumps(data, default=str)
+
+
+class BackgroundQueueHandler(QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread.
+
+    The stock QueueHandler.prepare() runs the full formatter in the calling
+    thread; here only the message is merged with its args (so mutable args
+    can't change later) and exceptions are rendered to text.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Never block a request on logging; drop the record instead
+            pass
+
+
+_listener = None
+
+
+def configure_logging(logging_settings):
+    """
+    LOGGING_CONFIG callable. Applies the dictConfig and, when LOG_MODE is
+    'queue', replaces the handlers on the root and 'django' loggers with one
+    shared BackgroundQueueHandler whose listener thread owns the real handlers.
+    """
+    global _listener
+    from django.conf import settings
+
+    if not logging_settings:
+        return
+
+    logging.config.dictConfig(logging_settings)
+
+    if getattr(settings, 'LOG_MODE', 'sync') != 'queue':
+        return
+
+    loggers = [logging.getLogger()] + [logging.getLogger(name) for name in logging_settings.get('loggers', {})]
+
+    targets = []
+    for logger in loggers:
+        for handler in logger.handlers:
+            if handler not in targets:
+                targets.append(handler)
+    if not targets:
+        return
+
+    queue_handler = BackgroundQueueHandler(queue.Queue(getattr(settings, 'LOG_QUEUE_SIZE', 10000)))
+    # The request ID lives in a contextvar, so it must be read on the calling thread
+    queue_handler.addFilter(RequestContextFilter())
+
+    for logger in loggers:
+        if logger.handlers:
+            for handler in list(logger.handlers):
+                logger.removeHandler(handler)
+            logger.addHandler(queue_handler)
+
+    if _listener is not None:
+        _listener.stop()
+    _listener = QueueListener(queue_handler.queue, *targets, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_listener)
+
+    # Threads don't survive fork (e.g. gunicorn --preload), so give each
+    # child process its own queue and listener thread
+    os.register_at_fork(after_in_child=restart_listener_after_fork)
+
+
+def restart_listener_after_fork():
+    """Start a fresh listener thread (and queue) in a forked child process"""
+    global _listener
+    if _listener is None:
+        return
+    fresh_queue = queue.Queue(_listener.queue.maxsize)
+    for logger in [logging.getLogger()] + list(logging.Logger.manager.loggerDict.values()):
+        for handler in getattr(logger, 'handlers', []):
+            if isinstance(handler, BackgroundQueueHandler):
+                handler.queue = fresh_queue
+    _listener = QueueListener(fresh_queue, *_listener.handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_listener():
+    """Flush queued records and stop the background thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
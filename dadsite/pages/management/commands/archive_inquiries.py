@@ -0,0 +1,121 @@
+"""
+Management command to move old denied leads and inactive clients into the archive table (run weekly from cron)
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from pages.archive import RULES, archive_batch, candidates, compact, enable_incremental_vacuum, retention_cutoffs
+
+
+class Command(BaseCommand):
+    help = (
+        f'Archive denied leads untouched for {settings.ARCHIVE_DENIED_AFTER_DAYS} days and inactive clients '
+        f'untouched for {settings.ARCHIVE_INACTIVE_AFTER_DAYS} days, in batches, then ANALYZE/vacuum SQLite'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Count the inquiries that would be archived without moving anything',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Inquiries moved per transaction (default: 500)',
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0.05,
+            help='Seconds to sleep between batches so requests can take the write lock (default: 0.05)',
+        )
+        parser.add_argument(
+            '--denied-days',
+            type=int,
+            help=f'Override ARCHIVE_DENIED_AFTER_DAYS ({settings.ARCHIVE_DENIED_AFTER_DAYS})',
+        )
+        parser.add_argument(
+            '--inactive-days',
+            type=int,
+            help=f'Override ARCHIVE_INACTIVE_AFTER_DAYS ({settings.ARCHIVE_INACTIVE_AFTER_DAYS})',
+        )
+        parser.add_argument(
+            '--no-vacuum',
+            action='store_true',
+            help='Skip ANALYZE and incremental vacuum afterwards',
+        )
+        parser.add_argument(
+            '--enable-incremental-vacuum',
+            action='store_true',
+            help='One-off: switch SQLite to auto_vacuum=INCREMENTAL with a full VACUUM (locks the database while it runs)',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+        for option in ('denied_days', 'inactive_days'):
+            if options[option] is not None and options[option] < 1:
+                raise CommandError(f"--{option.replace('_', '-')} must be at least 1")
+        if options['enable_incremental_vacuum'] and connection.vendor != 'sqlite':
+            raise CommandError('--enable-incremental-vacuum only applies to SQLite')
+
+        started = time.perf_counter()
+        cutoffs = retention_cutoffs(denied_days=options['denied_days'], inactive_days=options['inactive_days'])
+
+        if options['dry_run']:
+            for reason in RULES:
+                count = candidates(reason, cutoffs[reason]).count()
+                self.stdout.write(f"  🗄️  {reason}: {count} inquiries last updated before {cutoffs[reason]:%Y-%m-%d}")
+            self.stdout.write(self.style.HTTP_INFO('  (dry run - nothing archived)'))
+            return
+
+        moved = raw_bytes = compressed_bytes = 0
+        for reason in RULES:
+            count, after = 0, None
+            while True:
+                batch, after, raw, compressed = archive_batch(reason, cutoffs[reason], after, options['batch_size'])
+                count += batch
+                raw_bytes += raw
+                compressed_bytes += compressed
+                if batch < options['batch_size']:
+                    break
+                if options['pause']:
+                    time.sleep(options['pause'])
+            moved += count
+            style = self.style.SUCCESS if count else self.style.HTTP_INFO
+            self.stdout.write(style(f"🗄️  {reason}: archived {count} (last updated before {cutoffs[reason]:%Y-%m-%d})"))
+
+        if options['enable_incremental_vacuum']:
+            self.stdout.write(self.style.WARNING('🧹 Switching to incremental auto-vacuum (full VACUUM)...'))
+            enable_incremental_vacuum()
+
+        maintenance = {'analyzed': False} if options['no_vacuum'] else compact(options['pause'])
+        if maintenance['analyzed']:
+            page_size = maintenance['page_size']
+            self.stdout.write(self.style.SUCCESS('📈 ANALYZE refreshed inquiry table statistics'))
+            if maintenance['auto_vacuum'] == 'incremental':
+                self.stdout.write(self.style.SUCCESS(
+                    f"🧹 Incremental vacuum freed {maintenance['freed_pages']} pages "
+                    f"({maintenance['freed_pages'] * page_size / 1024 / 1024:.1f} MB)"
+                ))
+            elif maintenance['free_pages']:
+                self.stdout.write(self.style.WARNING(
+                    f"⚠️  {maintenance['free_pages']} free pages "
+                    f"({maintenance['free_pages'] * page_size / 1024 / 1024:.1f} MB) stay in the file: "
+                    f"auto_vacuum is {maintenance['auto_vacuum']}; run once with --enable-incremental-vacuum"
+                ))
+
+        self.stdout.write(self.style.SUCCESS('=' * 60))
+        if moved:
+            ratio = f', compressed to {100 * compressed_bytes / raw_bytes:.0f}%' if raw_bytes else ''
+            self.stdout.write(self.style.SUCCESS(
+                f"📊 Archived {moved} inquiries ({raw_bytes / 1024:.0f} KB of rows{ratio}) "
+                f"in {time.perf_counter() - started:.1f}s"
+            ))
+        else:
+            self.stdout.write(self.style.HTTP_INFO('⏭️  Nothing due for archiving'))
+        self.stdout.write(self.style.SUCCESS('=' * 60))
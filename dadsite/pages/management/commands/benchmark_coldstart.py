@@ -0,0 +1,78 @@
+"""
+Management command to measure time-to-first-byte of the first request after boot
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter: boot the WSGI app (with or without warm-up),
+# then time the first and second request to the same page
+PROBE_SCRIPT = '''
+import json, os, sys, time
+started = time.perf_counter()
+import dadsite.wsgi
+booted = time.perf_counter()
+from django.test import Client
+from pages.warmup import local_host
+client = Client(HTTP_HOST=local_host())
+timings = []
+for _ in range(2):
+    t = time.perf_counter()
+    response = client.get(sys.argv[1])
+    timings.append(time.perf_counter() - t)
+print(json.dumps({"boot": booted - started, "first": timings[0], "second": timings[1], "status": response.status_code}))
+'''
+
+
+class Command(BaseCommand):
+    help = 'Compare time-to-first-byte of the first request after boot with and without cache warm-up'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default='/',
+            help='Page to request (default: /)',
+        )
+        parser.add_argument(
+            '--runs',
+            type=int,
+            default=5,
+            help='Fresh processes per mode (default: 5)',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS(f"⏱️  Booting {options['runs']} fresh processes per mode, requesting {options['path']}..."))
+
+        results = {}
+        for label, warmup in [('cold', 'False'), ('warmed', 'True')]:
+            runs = [self.probe(options['path'], warmup) for _ in range(options['runs'])]
+            results[label] = {key: statistics.median(run[key] for run in runs) * 1000 for key in ['boot', 'first', 'second']}
+
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS('=' * 60))
+        self.stdout.write(self.style.SUCCESS('📊 Median over runs (ms):'))
+        for label, stats in results.items():
+            self.stdout.write(self.style.SUCCESS(
+                f"  {label:<7} boot {stats['boot']:8.1f}   first request {stats['first']:8.1f}   second request {stats['second']:8.1f}"
+            ))
+        cold, warmed = results['cold']['first'], results['warmed']['first']
+        self.stdout.write(self.style.SUCCESS(f'  Warm-up cuts first-request latency by {cold - warmed:.1f}ms ({cold / warmed:.1f}x)'))
+        self.stdout.write(self.style.SUCCESS('=' * 60))
+
+    def probe(self, path, warmup):
+        env = {**os.environ, 'WARMUP_ON_START': warmup, 'DJANGO_SETTINGS_MODULE': 'dadsite.settings'}
+        completed = subprocess.run(
+            [sys.executable, '-c', PROBE_SCRIPT, path],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if completed.returncode != 0:
+            raise CommandError(f'Probe process failed:\n{completed.stderr}')
+        return json.loads(completed.stdout.strip().splitlines()[-1])
@@ -0,0 +1,88 @@
+"""
+Management command to measure bytes on the wire with and without response compression
+"""
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from pages import middleware
+from pages.warmup import WARMUP_PATHS, local_host
+
+STAFF_PATHS = ['/manage/', '/manage/inquiries/pending/', '/manage/clients/active/', '/manage/events/']
+
+ENCODINGS = [
+    ('identity', 'identity'),
+    ('gzip', 'gzip'),
+    ('br', 'br, gzip'),
+]
+
+
+class Command(BaseCommand):
+    help = 'Compare response sizes and server time for identity, gzip and Brotli on the main pages'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=20,
+            help='Requests per page and encoding for the timing figures (default: 20)',
+        )
+
+    def handle(self, *args, **options):
+        if middleware.brotli is None:
+            self.stdout.write(self.style.WARNING('⚠️  brotli is not installed: the br column falls back to gzip'))
+
+        self.stdout.write(self.style.SUCCESS(f"⏱️  Requesting each page {options['iterations']}x per encoding..."))
+
+        user = get_user_model().objects.create_user(
+            'benchmark-compression', 'benchmark-compression@example.invalid', None, is_staff=True,
+        )
+        try:
+            public = Client(HTTP_HOST=local_host())
+            staff = Client(HTTP_HOST=local_host())
+            staff.force_login(user)
+            rows = [self.measure(public, path, options['iterations']) for path in WARMUP_PATHS]
+            rows += [self.measure(staff, path, options['iterations']) for path in STAFF_PATHS]
+        finally:
+            user.delete()
+
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS('=' * 78))
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Page':<28}" + ''.join(f'{name:>16}' for name, _ in ENCODINGS)
+        ))
+        for path, results in rows:
+            self.stdout.write(f'{path:<28}' + ''.join(
+                f"{results[name]['bytes']:>7,} B {results[name]['ms']:5.1f}ms" for name, _ in ENCODINGS
+            ))
+
+        totals = {name: sum(results[name]['bytes'] for _, results in rows) for name, _ in ENCODINGS}
+        self.stdout.write(self.style.SUCCESS('=' * 78))
+        self.stdout.write(self.style.SUCCESS(f"📊 Total bytes: {' / '.join(f'{name} {totals[name]:,}' for name, _ in ENCODINGS)}"))
+        for name, _ in ENCODINGS[1:]:
+            if totals['identity']:
+                self.stdout.write(self.style.SUCCESS(
+                    f"  {name}: {100 * (1 - totals[name] / totals['identity']):.0f}% fewer bytes than uncompressed"
+                ))
+        self.stdout.write(self.style.SUCCESS(
+            '  Pages with a CSRF token use padded gzip even when Brotli is accepted (BREACH mitigation)'
+        ))
+        self.stdout.write(self.style.SUCCESS('=' * 78))
+
+    def measure(self, client, path, iterations):
+        results = {}
+        for name, accept_encoding in ENCODINGS:
+            timings = []
+            size = encoding = None
+            with override_settings(COMPRESS_RESPONSES=name != 'identity'):
+                for _ in range(iterations):
+                    started = time.perf_counter()
+                    response = client.get(path, HTTP_ACCEPT_ENCODING=accept_encoding)
+                    body = b''.join(response.streaming_content) if response.streaming else response.content
+                    timings.append((time.perf_counter() - started) * 1000)
+                    size = len(body)
+                    encoding = response.get('Content-Encoding', 'identity')
+            results[name] = {'bytes': size, 'ms': statistics.median(timings), 'encoding': encoding}
+        return path, results
@@ -0,0 +1,116 @@
+"""
+Management command to measure how much latency logging adds to the request path
+"""
+import logging
+import queue
+import statistics
+import tempfile
+import time
+from logging.handlers import QueueListener, RotatingFileHandler
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from pages.logging_handlers import BackgroundQueueHandler, JSONFormatter, RequestContextFilter, request_id_var
+
+
+class Command(BaseCommand):
+    help = 'Benchmark synchronous file logging against queued (background thread) JSON logging'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=20000,
+            help='Log calls per scenario (default: 20000)',
+        )
+        parser.add_argument(
+            '--max-bytes',
+            type=int,
+            default=256 * 1024,
+            help='Rotate the log file at this size, to include rotation stalls (default: 256 KB)',
+        )
+        parser.add_argument(
+            '--pause-us',
+            type=int,
+            default=200,
+            help='Simulated I/O wait between log calls, as in a real request (default: 200µs, 0 for a tight loop)',
+        )
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+
+        self.stdout.write(self.style.SUCCESS(f'⏱️  Timing {iterations} log calls per scenario...'))
+        self.stdout.write('')
+
+        results = []
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, setup in [
+                ('sync text (RotatingFileHandler)', self.setup_sync),
+                ('queue json (QueueListener)', self.setup_queue),
+            ]:
+                log_dir = Path(tmp) / name.split()[0]
+                log_dir.mkdir()
+                results.append((name, self.run_scenario(setup, log_dir, iterations, options['max_bytes'], options['pause_us'])))
+
+        self.stdout.write(self.style.SUCCESS('=' * 60))
+        self.stdout.write(self.style.SUCCESS('📊 Latency per logger.info() call on the calling thread (µs):'))
+        for name, stats in results:
+            self.stdout.write(self.style.SUCCESS(
+                f"  {name:<34} mean {stats['mean']:7.1f}  p50 {stats['p50']:7.1f}  "
+                f"p99 {stats['p99']:7.1f}  max {stats['max']:9.1f}  (rotations: {stats['rotations']})"
+            ))
+        baseline, queued = results[0][1], results[1][1]
+        if queued['mean']:
+            self.stdout.write(self.style.SUCCESS(
+                f"  Queued logging is {baseline['mean'] / queued['mean']:.1f}x faster on average, "
+                f"worst call {baseline['max'] / queued['max']:.1f}x faster"
+            ))
+        self.stdout.write(self.style.SUCCESS('=' * 60))
+
+    def setup_sync(self, log_dir, max_bytes):
+        """The default configuration: formatting and file writes on the calling thread"""
+        handler = RotatingFileHandler(log_dir / 'django.log', maxBytes=max_bytes, backupCount=5)
+        handler.setFormatter(logging.Formatter('{levelname} {asctime} {module} {message}', style='{'))
+        return handler, None
+
+    def setup_queue(self, log_dir, max_bytes):
+        """LOG_MODE=queue with LOG_FORMAT=json: the calling thread only enqueues"""
+        target = RotatingFileHandler(log_dir / 'django.log', maxBytes=max_bytes, backupCount=5)
+        target.setFormatter(JSONFormatter())
+        handler = BackgroundQueueHandler(queue.Queue(-1))
+        handler.addFilter(RequestContextFilter())
+        listener = QueueListener(handler.queue, target, respect_handler_level=True)
+        listener.start()
+        return handler, listener
+
+    def run_scenario(self, setup, log_dir, iterations, max_bytes, pause_us):
+        logger = logging.getLogger('pages.benchmark')
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        handler, listener = setup(log_dir, max_bytes)
+        logger.addHandler(handler)
+
+        timings = []
+        token = request_id_var.set('benchmark')
+        try:
+            for i in range(iterations):
+                started = time.perf_counter_ns()
+                logger.info('Client %s status updated to %s by %s', i, 'active', 'benchmark')
+                timings.append((time.perf_counter_ns() - started) / 1000)
+                if pause_us:
+                    time.sleep(pause_us / 1_000_000)
+        finally:
+            request_id_var.reset(token)
+            logger.removeHandler(handler)
+            if listener is not None:
+                listener.stop()
+            handler.close()
+
+        timings.sort()
+        return {
+            'mean': statistics.fmean(timings),
+            'p50': timings[len(timings) // 2],
+            'p99': timings[int(len(timings) * 0.99)],
+            'max': timings[-1],
+            'rotations': len(list(log_dir.glob('django.log.*'))),
+        }
@@ -0,0 +1,147 @@
+"""
+Management command to measure how the PT Distinction embed affects page load, against a local stub
+"""
+import threading
+import time
+import urllib.request
+from html.parser import HTMLParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from pages.warmup import local_host
+
+# What the stub serves as portal.js: inject an iframe like the real script does
+STUB_PORTAL_JS = b"""(function () {
+    var target = document.getElementById('ptd_portal');
+    var frame = document.createElement('iframe');
+    frame.src = window.ptd_param.domain + '/portal';
+    target.appendChild(frame);
+})();
+"""
+
+
+class BlockingResourceParser(HTMLParser):
+    """Collect resources that block parsing/rendering: classic <script src> and stylesheets"""
+
+    def __init__(self):
+        super().__init__()
+        self.blocking = []
+        self.portal_fallback = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'script' and attrs.get('src'):
+            if 'async' not in attrs and 'defer' not in attrs and attrs.get('type') != 'module':
+                self.blocking.append(attrs['src'])
+        elif tag == 'link' and attrs.get('rel') == 'stylesheet' and attrs.get('href'):
+            self.blocking.append(attrs['href'])
+        elif 'data-ptd-fallback' in attrs:
+            self.portal_fallback = True
+
+
+class Command(BaseCommand):
+    help = 'Load the client portal page with PT Distinction stubbed locally (slow origin) in eager and facade modes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--delay',
+            type=float,
+            default=2.0,
+            help='Seconds the stubbed origin waits before answering, like a slow third party (default: 2)',
+        )
+        parser.add_argument('--iterations', type=int, default=3, help='Page loads per mode (default: 3)')
+
+    def handle(self, *args, **options):
+        delay = options['delay']
+        server, requests = self.start_stub(delay)
+        origin = f'http://127.0.0.1:{server.server_address[1]}'
+        self.stdout.write(self.style.SUCCESS(f'🧪 Stubbed portal origin at {origin} (responds after {delay:g}s)'))
+
+        results = []
+        try:
+            for mode in ['eager', 'facade']:
+                with override_settings(PTD_PORTAL_LOAD=mode, PTD_PORTAL_ORIGIN=origin):
+                    results.append((mode, self.load_page(origin, requests, options['iterations'])))
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS('=' * 78))
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Mode':<8} {'HTML ms':>9} {'Blocking':>9} {'Stub requests':>14} {'Critical path ms':>17}  Fallback link"
+        ))
+        for mode, result in results:
+            self.stdout.write(
+                f"{mode:<8} {result['html_ms']:>9.1f} {result['blocking']:>9} {result['stub_requests']:>14} "
+                f"{result['critical_ms']:>17.1f}  {'yes' if result['fallback'] else 'no'}"
+            )
+        self.stdout.write(self.style.SUCCESS('=' * 78))
+        if results[1][1]['stub_requests']:
+            raise CommandError('Facade mode requested portal.js during page load')
+        self.stdout.write(self.style.SUCCESS(
+            '  Critical path = HTML plus every parser-blocking script/stylesheet on this server or the stub,\n'
+            '  fetched in order (other third-party origins are skipped).\n'
+            '  In facade mode portal.js is only requested after a click or scroll, so the slow origin is off the path.'
+        ))
+        if results[1][1]['skipped']:
+            self.stdout.write(self.style.WARNING(f"  Not fetched (other origins): {', '.join(sorted(results[1][1]['skipped']))}"))
+        self.stdout.write(self.style.SUCCESS('=' * 78))
+
+    def start_stub(self, delay):
+        requests = []
+
+        class StubHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                requests.append(self.path)
+                time.sleep(delay)
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/javascript')
+                self.send_header('Content-Length', str(len(STUB_PORTAL_JS)))
+                self.end_headers()
+                self.wfile.write(STUB_PORTAL_JS)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server, requests
+
+    def load_page(self, origin, requests, iterations):
+        client = Client(HTTP_HOST=local_host())
+        html_ms, critical_ms = [], []
+        for _ in range(iterations):
+            requests.clear()
+            started = time.perf_counter()
+            response = client.get('/client-portal/')
+            if response.status_code != 200:
+                raise CommandError(f'/client-portal/ returned {response.status_code}')
+            html_ms.append((time.perf_counter() - started) * 1000)
+
+            parser = BlockingResourceParser()
+            parser.feed(response.content.decode())
+
+            # A browser fetches these before it can finish parsing; emulate that in order
+            skipped = set()
+            for url in parser.blocking:
+                if url.startswith(origin):
+                    with urllib.request.urlopen(url, timeout=30) as stub_response:
+                        stub_response.read()
+                elif url.startswith(settings.STATIC_URL):
+                    client.get(url)
+                else:
+                    skipped.add(urlparse(url).netloc)
+            critical_ms.append((time.perf_counter() - started) * 1000)
+
+        return {
+            'html_ms': min(html_ms),
+            'critical_ms': min(critical_ms),
+            'blocking': len(parser.blocking),
+            'stub_requests': len(requests),
+            'fallback': parser.portal_fallback,
+            'skipped': skipped,
+        }
@@ -0,0 +1,127 @@
+"""
+Management command to measure render time and HTML size with inline asset
+extraction and template minification switched on one at a time
+"""
+import gzip
+import statistics
+import time
+from copy import deepcopy
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from pages.warmup import WARMUP_PATHS, local_host
+
+STAFF_PATHS = ['/manage/', '/manage/inquiries/pending/', '/manage/clients/active/']
+
+PLAIN_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+MINIFYING_LOADERS = [
+    'pages.template_loaders.MinifyingFilesystemLoader',
+    'pages.template_loaders.MinifyingAppDirectoriesLoader',
+]
+
+# (name, use BUILD_DIR templates, loaders)
+MODES = [
+    ('original', False, PLAIN_LOADERS),
+    ('extracted', True, PLAIN_LOADERS),
+    ('extracted+minified', True, MINIFYING_LOADERS),
+]
+
+
+def templates_setting(built, loaders):
+    """settings.TEMPLATES with the template directories and loaders replaced"""
+    templates = deepcopy(settings.TEMPLATES)
+    templates[0]['DIRS'] = [settings.BUILD_DIR / 'templates'] if built else []
+    templates[0]['OPTIONS']['loaders'] = [('django.template.loaders.cached.Loader', loaders)]
+    return templates
+
+
+class Command(BaseCommand):
+    help = 'Compare render time and HTML bytes for the original, extracted and minified templates'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=50,
+            help='Requests per page and mode, after one warm-up request (default: 50)',
+        )
+
+    def handle(self, *args, **options):
+        if not (settings.BUILD_DIR / 'templates').is_dir():
+            raise CommandError('No built templates: run build_templates and then collectstatic first')
+
+        iterations = options['iterations']
+        self.stdout.write(self.style.SUCCESS(f'⏱️  Requesting each page {iterations}x per mode...'))
+
+        user = get_user_model().objects.create_user(
+            'benchmark-templates', 'benchmark-templates@example.invalid', None, is_staff=True,
+        )
+        rows = []
+        try:
+            public = Client(HTTP_HOST=local_host())
+            staff = Client(HTTP_HOST=local_host())
+            staff.force_login(user)
+            pages = [(public, path) for path in WARMUP_PATHS] + [(staff, path) for path in STAFF_PATHS]
+            results = {}
+            for name, built, loaders in MODES:
+                with override_settings(TEMPLATES=templates_setting(built, loaders), COMPRESS_RESPONSES=False):
+                    results[name] = [self.measure(client, path, iterations) for client, path in pages]
+            for i, (_, path) in enumerate(pages):
+                rows.append((path, {name: results[name][i] for name, _, _ in MODES}))
+        finally:
+            user.delete()
+
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS('=' * 86))
+        self.stdout.write(self.style.SUCCESS(f"{'Page':<26}" + ''.join(f'{name:>20}' for name, _, _ in MODES)))
+        for path, results in rows:
+            self.stdout.write(f'{path:<26}' + ''.join(
+                f"{results[name]['bytes']:>8,} B {results[name]['ms']:6.2f}ms" for name, _, _ in MODES
+            ))
+
+        self.stdout.write(self.style.SUCCESS('=' * 86))
+        totals = {
+            name: {
+                'bytes': sum(results[name]['bytes'] for _, results in rows),
+                'gzip': sum(results[name]['gzip'] for _, results in rows),
+                'ms': sum(results[name]['ms'] for _, results in rows),
+            }
+            for name, _, _ in MODES
+        }
+        baseline = totals['original']
+        self.stdout.write(self.style.SUCCESS('📊 All pages, per request (median render time):'))
+        for name, _, _ in MODES:
+            total = totals[name]
+            self.stdout.write(self.style.SUCCESS(
+                f"  {name:<20} {total['bytes']:>9,} B  {total['gzip']:>8,} B gzipped  {total['ms']:7.2f}ms"
+                f"  ({100 * (1 - total['bytes'] / baseline['bytes']):.0f}% smaller,"
+                f" {100 * (1 - total['gzip'] / baseline['gzip']):.0f}% gzipped)"
+            ))
+        assets = sorted((settings.BUILD_DIR / 'static' / 'inline').glob('*'))
+        self.stdout.write(self.style.SUCCESS(
+            f"  Extracted assets: {len(assets)} files, {sum(path.stat().st_size for path in assets):,} B, "
+            f"downloaded once and cached"
+        ))
+        self.stdout.write(self.style.SUCCESS('=' * 86))
+
+    def measure(self, client, path, iterations):
+        # The first request compiles the templates into the cached loader
+        response = client.get(path)
+        if response.status_code != 200:
+            raise CommandError(f'{path} returned {response.status_code}')
+
+        timings = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            response = client.get(path)
+            timings.append((time.perf_counter() - started) * 1000)
+        return {
+            'bytes': len(response.content),
+            'gzip': len(gzip.compress(response.content)),
+            'ms': statistics.median(timings),
+        }
@@ -0,0 +1,125 @@
+"""
+Management command to build the self-hosted, subsetted Montserrat woff2 files
+"""
+import io
+import json
+import logging
+import urllib.request
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from pages.fonts import (
+    DEFAULT_PRELOAD, FONT_FAMILY, FONT_MANIFEST, FONT_SOURCE_URL, LATIN_UNICODE_RANGE, WEIGHT_NAMES, font_filename,
+    used_weights,
+)
+
+
+def parse_unicode_range(unicode_range):
+    """'U+0000-00FF, U+0131' -> list of code points"""
+    codepoints = []
+    for part in unicode_range.split(','):
+        start, _, end = part.strip()[2:].partition('-')
+        codepoints.extend(range(int(start, 16), int(end or start, 16) + 1))
+    return codepoints
+
+
+class Command(BaseCommand):
+    help = 'Subset Montserrat to Latin woff2 files for the font weights used in the templates'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source',
+            default=FONT_SOURCE_URL,
+            help='Variable Montserrat TTF (path or URL), or a directory of static Montserrat-<Weight>.ttf files '
+                 '(default: the Google Fonts repository)',
+        )
+        parser.add_argument(
+            '--output',
+            default=str(settings.BASE_DIR / 'static'),
+            help='Static directory to write fonts/ into (default: static/)',
+        )
+        parser.add_argument(
+            '--preload',
+            default=','.join(str(weight) for weight in DEFAULT_PRELOAD),
+            help=f"Comma-separated weights to preload (default: {','.join(str(w) for w in DEFAULT_PRELOAD)})",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            from fontTools import subset
+            from fontTools.ttLib import TTFont
+            from fontTools.varLib import instancer
+        except ImportError:
+            raise CommandError('build_fonts needs fontTools and brotli: pip install fonttools brotli')
+        # fontTools reports every pruned table at INFO
+        logging.getLogger('fontTools').setLevel(logging.WARNING)
+
+        weights = used_weights()
+        preload = [int(weight) for weight in options['preload'].split(',') if weight.strip()]
+        output = Path(options['output'])
+        (output / Path(FONT_MANIFEST).parent).mkdir(parents=True, exist_ok=True)
+
+        self.stdout.write(self.style.SUCCESS(f"🔤 Weights used in templates: {', '.join(str(w) for w in weights)}"))
+
+        source = options['source']
+        source_dir = Path(source) if Path(source).is_dir() else None
+        variable_font = None
+        if source_dir is None:
+            variable_font = self.load_font(source, TTFont)
+            if 'fvar' not in variable_font:
+                raise CommandError(f'{source} is not a variable font; pass a directory of static TTFs instead')
+
+        subset_options = subset.Options()
+        subset_options.flavor = 'woff2'
+        subset_options.layout_features = ['kern', 'liga', 'calt', 'ccmp', 'locl', 'mark', 'mkmk']
+        subset_options.name_IDs = [1, 2]  # Family and style names only
+        subset_options.hinting = False
+        codepoints = parse_unicode_range(LATIN_UNICODE_RANGE)
+
+        files = {}
+        total = 0
+        for weight in weights:
+            if variable_font is not None:
+                font = instancer.instantiateVariableFont(variable_font, {'wght': weight}, inplace=False)
+            else:
+                path = source_dir / f'{FONT_FAMILY}-{WEIGHT_NAMES[weight]}.ttf'
+                if not path.exists():
+                    raise CommandError(f'Missing {path}')
+                font = TTFont(path)
+
+            subsetter = subset.Subsetter(subset_options)
+            subsetter.populate(unicodes=codepoints)
+            subsetter.subset(font)
+
+            filename = font_filename(weight)
+            font.flavor = 'woff2'
+            font.save(output / filename)
+            size = (output / filename).stat().st_size
+            total += size
+            files[str(weight)] = filename
+            self.stdout.write(self.style.SUCCESS(f'  ✅ {filename:<36} {size / 1024:6.1f} KB'))
+
+        manifest = {
+            'family': FONT_FAMILY,
+            'files': files,
+            'preload': [weight for weight in preload if str(weight) in files],
+        }
+        (output / FONT_MANIFEST).write_text(json.dumps(manifest, indent=2) + '\n', encoding='utf-8')
+
+        self.stdout.write(self.style.SUCCESS('=' * 60))
+        self.stdout.write(self.style.SUCCESS(f'📦 {len(files)} weights, {total / 1024:.1f} KB total → {output / FONT_MANIFEST}'))
+        self.stdout.write(self.style.SUCCESS('   Run collectstatic to publish them with hashed, immutable URLs'))
+        self.stdout.write(self.style.SUCCESS('=' * 60))
+
+    def load_font(self, source, TTFont):
+        if source.startswith(('http://', 'https://')):
+            self.stdout.write(f'⬇️  Downloading {source}')
+            try:
+                with urllib.request.urlopen(source, timeout=60) as response:
+                    return TTFont(io.BytesIO(response.read()))
+            except OSError as e:
+                raise CommandError(f'Could not download {source}: {e}')
+        if not Path(source).exists():
+            raise CommandError(f'{source} does not exist')
+        return TTFont(source)
@@ -0,0 +1,41 @@
+"""
+Management command to move inline <style>/<script> blocks out of the templates
+"""
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from pages.inline_assets import build_templates
+
+
+class Command(BaseCommand):
+    help = 'Extract static inline styles and scripts from pages/templates into cacheable static files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            default=str(settings.BUILD_DIR),
+            help='Build directory to write templates/ and static/ into (default: build/)',
+        )
+
+    def handle(self, *args, **options):
+        output = Path(options['output'])
+        report = build_templates(output)
+
+        assets = set()
+        for entry in report:
+            assets.update(entry['extracted'])
+            if entry['extracted'] or entry['kept_inline']:
+                line = f"  {entry['template']:<34} {len(entry['extracted'])} extracted, {entry['kept_inline']} kept inline"
+                if entry['extracted']:
+                    line += f", {entry['bytes_saved']:,} bytes smaller"
+                self.stdout.write(line)
+
+        asset_bytes = sum((output / 'static' / path).stat().st_size for path in assets)
+        self.stdout.write(self.style.SUCCESS('=' * 60))
+        self.stdout.write(self.style.SUCCESS(
+            f"📦 {sum(1 for entry in report if entry['extracted'])} templates rewritten to {output / 'templates'}"
+        ))
+        self.stdout.write(self.style.SUCCESS(f"🗂️  {len(assets)} static files ({asset_bytes:,} bytes) in {output / 'static'}"))
+        self.stdout.write(self.style.SUCCESS('   Run collectstatic next so they get hashed names'))
+        self.stdout.write(self.style.SUCCESS('=' * 60))
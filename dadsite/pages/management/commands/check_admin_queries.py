@@ -0,0 +1,114 @@
+"""
+Management command to check that admin changelists run a constant number of queries
+"""
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from pages.models import (
+    AlertSubscription, AlertType, Announcement, ArchivedInquiry, ClientInquiry, ContentBlock, EmailRecipient, PendingAlert,
+    URLPermission,
+)
+from pages.archive import compress_row
+from pages.warmup import local_host
+
+HARNESS_PREFIX = 'admin-query-check'
+
+
+class Rollback(Exception):
+    """Raised to undo everything the check created"""
+
+
+class Command(BaseCommand):
+    help = 'Render every pages admin changelist at two data sizes and fail if the query count grows with the rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--small', type=int, default=3, help='Rows per model in the first pass (default: 3)')
+        parser.add_argument('--large', type=int, default=30, help='Rows per model in the second pass (default: 30)')
+
+    def handle(self, *args, **options):
+        if not 1 <= options['small'] < options['large']:
+            raise CommandError('--small must be at least 1 and less than --large')
+
+        self.stdout.write(self.style.SUCCESS(
+            f"🔍 Counting changelist queries with {options['small']} and {options['large']} extra rows per model..."
+        ))
+
+        results = {}
+        try:
+            # Everything (rows, staff user, sessions) is rolled back at the end
+            with transaction.atomic():
+                client = Client(HTTP_HOST=local_host())
+                client.force_login(get_user_model().objects.create_superuser(
+                    f'{HARNESS_PREFIX}-admin', f'{HARNESS_PREFIX}@example.invalid', None,
+                ))
+
+                urls = {
+                    model._meta.verbose_name_plural: reverse(f'admin:pages_{model._meta.model_name}_changelist')
+                    for model in admin.site._registry
+                    if model._meta.app_label == 'pages'
+                }
+
+                self.populate(0, options['small'])
+                # First pass warms sessions, content types and templates
+                self.measure(client, urls)
+                results['small'] = self.measure(client, urls)
+
+                self.populate(options['small'], options['large'])
+                results['large'] = self.measure(client, urls)
+                raise Rollback
+        except Rollback:
+            pass
+
+        failures = []
+        self.stdout.write(self.style.SUCCESS('=' * 60))
+        for name in sorted(results['small']):
+            small, large = results['small'][name], results['large'][name]
+            line = f'  {name:<24} {small:>4} → {large:>4} queries'
+            if small != large:
+                failures.append(name)
+                self.stdout.write(self.style.ERROR(f'❌{line}'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'✅{line}'))
+        self.stdout.write(self.style.SUCCESS('=' * 60))
+
+        if failures:
+            raise CommandError(f"Query count grows with row count for: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS('✨ All changelists run a constant number of queries'))
+
+    def measure(self, client, urls):
+        counts = {}
+        for name, url in urls.items():
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(url)
+            if response.status_code != 200:
+                raise CommandError(f'{url} returned {response.status_code}')
+            counts[name] = len(queries)
+        return counts
+
+    def populate(self, start, stop):
+        """Create rows start..stop-1 of every pages model, with related rows for the FK columns"""
+        now = timezone.now()
+        for i in range(start, stop):
+            tag = f'{HARNESS_PREFIX}-{i}'
+            recipient = EmailRecipient.objects.create(name=tag, email=f'{tag}@example.invalid')
+            alert_type = AlertType.objects.create(alert_type=tag, name=tag, description=tag)
+            AlertSubscription.objects.create(alert_type=alert_type, recipient=recipient, delivery_mode='daily')
+            PendingAlert.objects.create(
+                recipient=recipient, alert_type=alert_type, delivery_mode='daily', subject=tag, message=tag,
+            )
+            ContentBlock.objects.create(page='home', identifier=tag, title=tag, content=tag)
+            Announcement.objects.create(title=tag, content=tag, published_date=now)
+            URLPermission.objects.create(url_pattern=f'/{tag}/', description=tag)
+            ClientInquiry.objects.create(
+                name=tag, email=f'{tag}@example.invalid', fitness_level='beginner', fitness_goals='strength',
+                current_frequency='none',
+            )
+            ArchivedInquiry.objects.create(
+                original_id=-i - 1, name=tag, email=f'{tag}@example.invalid', group='lead', lead_status='denied',
+                submitted_at=now, updated_at=now, reason='denied', data=compress_row({'name': tag}),
+            )
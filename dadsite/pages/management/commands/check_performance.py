@@ -0,0 +1,424 @@
+"""
+Management command to check every pages view against query budgets and render-time baselines
+"""
+import json
+import tempfile
+import time
+from contextlib import contextmanager
+from io import StringIO
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext, override_settings, setup_test_environment, teardown_test_environment,
+)
+from django.urls import URLPattern, reverse
+from django.utils import timezone
+from pages import urls as pages_urls
+from pages.archive import archived_copy
+from pages.events import latest_event_id
+from pages.models import APIToken, ArchivedInquiry, ClientInquiry, InquiryEvent
+from pages.stats import rebuild_daily_stats
+
+BASELINE_PATH = Path(settings.BASE_DIR) / 'pages' / 'performance_baseline.json'
+
+# seed_scale arguments for each pass; the large one has 10x the rows
+SCALES = {
+    'small': {'inquiries': 200, 'announcements': 20, 'content_blocks': 3, 'recipients': 10},
+    'large': {'inquiries': 2000, 'announcements': 200, 'content_blocks': 30, 'recipients': 100},
+}
+
+CONTACT_FORM = {
+    'name': 'Performance Check',
+    'email': 'visitor@perf.invalid',
+    'fitness_level': 'beginner',
+    'fitness_goals': ['strength', 'flexibility'],
+    'current_frequency': '1-2',
+}
+
+# How to request every named route in pages.urls. `path` and `data` are
+# called with the command so they can create the rows a request acts on
+# (outside the measured window). A route missing here fails the check, so a
+# new view can't ship without a budget.
+ROUTE_REQUESTS = {
+    'home': {},
+    'about': {},
+    'services': {},
+    'contact': {},
+    'client_portal': {},
+    'health_check': {},
+    'health_live': {},
+    'health_ready': {},
+    'health_status': {'client': 'staff'},
+    'manage_dashboard': {'client': 'staff'},
+    'admin_pending_inquiries': {'client': 'staff'},
+    'admin_active_clients': {'client': 'staff'},
+    'approve_inquiry': {
+        'client': 'staff', 'method': 'POST',
+        'path': lambda check: reverse('approve_inquiry', args=[check.new_inquiry('lead')]),
+    },
+    'deny_inquiry': {
+        'client': 'staff', 'method': 'POST',
+        'path': lambda check: reverse('deny_inquiry', args=[check.new_inquiry('lead')]),
+    },
+    'update_client_status': {
+        'client': 'staff', 'method': 'POST', 'data': {'client_status': 'active'},
+        'path': lambda check: reverse('update_client_status', args=[check.new_inquiry('client')]),
+    },
+    'onboard_client': {
+        'client': 'staff', 'method': 'POST', 'data': {'client_status': 'active'},
+        'path': lambda check: reverse('onboard_client', args=[check.new_inquiry('client')]),
+    },
+    'pending_inquiry_card': {
+        'client': 'staff',
+        'path': lambda check: reverse('pending_inquiry_card', args=[check.new_inquiry('lead')]),
+    },
+    # Under the test client (WSGI) this is the single poll fallback; its queries
+    # run in a worker thread and are not counted
+    'live_updates': {
+        'client': 'staff',
+        'path': lambda check: f"{reverse('live_updates')}?after={max(latest_event_id() - 20, 0)}",
+    },
+    'inquiry_events': {'client': 'staff', 'path': lambda check: f"{reverse('inquiry_events')}?after=0&limit=500"},
+    'profiles': {'client': 'staff'},
+    'profile_download': {
+        'client': 'staff',
+        'path': lambda check: reverse('profile_download', args=['perf-check.collapsed']),
+    },
+    'api_inquiry_list': {'client': 'api', 'path': lambda check: f"{reverse('api_inquiry_list')}?limit=100"},
+    'api_inquiry_detail': {
+        'client': 'api',
+        'path': lambda check: reverse('api_inquiry_detail', args=[check.any_inquiry_id]),
+    },
+    'api_stats': {'client': 'api'},
+}
+
+# Extra scenarios beyond one request per route
+EXTRA_REQUESTS = {
+    'contact (POST)': {'route': 'contact', 'method': 'POST', 'data': CONTACT_FORM},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Request every view in pages.urls and the pages admin changelists at two data scales; fail if a '
+        'query count grows with the data or exceeds its budget; render times over their baseline are '
+        'warnings unless --strict-timing'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help='Measured requests per view and scale (default: 5)')
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.5,
+            help='Allowed render time increase over the baseline, as a fraction (default: 0.5 = +50%%)',
+        )
+        parser.add_argument(
+            '--slack-ms',
+            type=float,
+            default=5.0,
+            help='Extra milliseconds allowed on top of the tolerance, so sub-millisecond views are not flaky (default: 5)',
+        )
+        parser.add_argument(
+            '--strict-timing',
+            action='store_true',
+            help='Fail (not just warn) when a render time exceeds its baseline; only meaningful on the machine that recorded it',
+        )
+        parser.add_argument('--baseline', default=str(BASELINE_PATH), help=f'Baseline file (default: {BASELINE_PATH})')
+        parser.add_argument(
+            '--update-baseline',
+            action='store_true',
+            help='Write the measured query counts and render times as the new baseline instead of checking',
+        )
+        parser.add_argument('--views', help='Comma-separated view names to check (default: all)')
+        parser.add_argument('--json', dest='json_path', help="Write the report to this JSON file ('-' for stdout only)")
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat must be at least 1')
+        if options['tolerance'] < 0 or options['slack_ms'] < 0:
+            raise CommandError('--tolerance and --slack-ms cannot be negative')
+
+        scenarios = self.discover_scenarios(options['views'])
+        baseline = {} if options['update_baseline'] else self.load_baseline(options['baseline'])
+        quiet = options['json_path'] == '-'
+
+        if not quiet:
+            self.stdout.write(self.style.SUCCESS(
+                f"🔍 Measuring {len(scenarios)} views at {len(SCALES)} scales, {options['repeat']} requests each..."
+            ))
+
+        results = {}
+        with self.isolated_database():
+            self.setup_clients()
+            for scale, seed_options in SCALES.items():
+                started = time.perf_counter()
+                self.seed(seed_options)
+                if not quiet:
+                    self.stdout.write(self.style.HTTP_INFO(
+                        f"  🌱 {scale}: {ClientInquiry.objects.count():,} inquiries seeded in {time.perf_counter() - started:.1f}s"
+                    ))
+                results[scale] = {
+                    name: self.measure(name, scenario, options['repeat']) for name, scenario in scenarios.items()
+                }
+
+        report = self.build_report(results, baseline, options)
+
+        if options['json_path'] == '-':
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self.print_report(report)
+            if options['json_path']:
+                with open(options['json_path'], 'w') as f:
+                    json.dump(report, f, indent=2)
+                self.stdout.write(self.style.SUCCESS(f"📝 Report written to {options['json_path']}"))
+
+        if options['update_baseline']:
+            self.write_baseline(options['baseline'], report, merge=bool(options['views']))
+            return
+
+        failed = [name for name, view in report['views'].items() if view['failures']]
+        if failed:
+            raise CommandError(f"Performance regressions in: {', '.join(failed)}")
+
+    def discover_scenarios(self, only=None):
+        """One scenario per named route in pages.urls, the extras, and each pages admin changelist"""
+        scenarios = {}
+        missing = []
+        for pattern in pages_urls.urlpatterns:
+            if not isinstance(pattern, URLPattern) or not pattern.name:
+                continue
+            if pattern.name not in ROUTE_REQUESTS:
+                missing.append(pattern.name)
+                continue
+            scenarios[pattern.name] = {'route': pattern.name, **ROUTE_REQUESTS[pattern.name]}
+        if missing:
+            raise CommandError(
+                f"No request defined for route(s): {', '.join(missing)}. Add them to ROUTE_REQUESTS in {__file__}"
+            )
+        scenarios.update(EXTRA_REQUESTS)
+
+        for model in admin.site._registry:
+            if model._meta.app_label == 'pages':
+                url = reverse(f'admin:pages_{model._meta.model_name}_changelist')
+                scenarios[f'admin:{model._meta.model_name}'] = {'client': 'staff', 'path': lambda check, url=url: url}
+
+        if only:
+            wanted = set(only.split(','))
+            unknown = wanted - set(scenarios)
+            if unknown:
+                raise CommandError(f"Unknown view(s): {', '.join(sorted(unknown))}")
+            scenarios = {name: scenario for name, scenario in scenarios.items() if name in wanted}
+        return scenarios
+
+    @contextmanager
+    def isolated_database(self):
+        """
+        A freshly migrated throwaway SQLite file, so the check never touches
+        real data and the health probes see an unlocked database
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            old_name = connection.settings_dict['NAME']
+            connection.settings_dict['TEST']['NAME'] = str(Path(directory) / 'performance.sqlite3')
+            setup_test_environment()
+            try:
+                connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+                (Path(directory) / 'profiles').mkdir()
+                (Path(directory) / 'profiles' / 'perf-check.collapsed').write_text('main;view 1\n')
+                with override_settings(PROFILE_DIR=Path(directory) / 'profiles'):
+                    call_command('populate_url_permissions', verbosity=0, stdout=StringIO())
+                    yield
+            finally:
+                connections.close_all()
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+                teardown_test_environment()
+                cache.clear()
+
+    def setup_clients(self):
+        user = get_user_model().objects.create_superuser('perf-check', 'perf-check@example.invalid', None)
+        staff = Client()
+        staff.force_login(user)
+        token = APIToken(name='Performance check', user=user)
+        key = token.generate_key()
+        token.save()
+        self.clients = {
+            'anonymous': Client(),
+            'staff': staff,
+            'api': Client(headers={'Authorization': f'Bearer {key}'}),
+        }
+
+    def seed(self, seed_options):
+        """
+        Replace the seeded data with a `seed_scale` dataset, plus a submitted
+        event per inquiry and an archived copy of every denied lead
+        """
+        InquiryEvent.objects.all().delete()
+        ArchivedInquiry.objects.all().delete()
+        ClientInquiry.objects.filter(email__endswith='@perf.invalid').delete()
+        call_command('seed_scale', clear=True, stdout=StringIO(), **seed_options)
+        InquiryEvent.objects.bulk_create([
+            InquiryEvent(
+                inquiry_id=inquiry_id, event_type='submitted', to_state=ClientInquiry.format_state(*state),
+            )
+            for inquiry_id, *state in ClientInquiry.objects.values_list('id', 'group', 'lead_status', 'client_status')
+        ], batch_size=1000)
+        ArchivedInquiry.objects.bulk_create([
+            archived_copy(row, 'denied') for row in ClientInquiry.objects.filter(lead_status='denied').values()
+        ], batch_size=1000)
+        rebuild_daily_stats()
+        self.any_inquiry_id = ClientInquiry.objects.values_list('id', flat=True).first()
+
+    def new_inquiry(self, group):
+        """A fresh pending lead or contacted client for one transition request"""
+        return ClientInquiry.objects.create(
+            name='Performance Check',
+            email='transition@perf.invalid',
+            fitness_level='beginner',
+            fitness_goals='strength',
+            current_frequency='1-2',
+            group=group,
+            lead_status='pending' if group == 'lead' else 'approved',
+            client_status='contacted' if group == 'client' else None,
+        ).id
+
+    def measure(self, name, scenario, repeat):
+        """
+        One warm-up request, then `repeat` measured ones, each with an empty
+        cache so the budget covers the uncached path.
+
+        Returns:
+            dict: 'queries' (max over the measured requests), 'ms' (fastest, the
+            least affected by other load on the machine), 'status'
+        """
+        client = self.clients[scenario.get('client', 'anonymous')]
+        method = scenario.get('method', 'GET')
+        counts, durations = [], []
+        for attempt in range(repeat + 1):
+            path = scenario['path'](self) if 'path' in scenario else reverse(scenario['route'])
+            data = scenario.get('data')
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = client.post(path, data) if method == 'POST' else client.get(path)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+                duration = time.perf_counter() - started
+            response.close()
+            if response.status_code >= 400:
+                raise CommandError(f'{name}: {method} {path} returned {response.status_code}')
+            if attempt:
+                counts.append(len(queries))
+                durations.append(duration * 1000)
+        return {'queries': max(counts), 'ms': round(min(durations), 2), 'status': response.status_code}
+
+    def load_baseline(self, path):
+        try:
+            with open(path) as f:
+                return json.load(f)['views']
+        except FileNotFoundError:
+            raise CommandError(f'No baseline at {path}; create one with --update-baseline')
+        except (OSError, ValueError, KeyError) as e:
+            raise CommandError(f'Could not read {path}: {e}')
+
+    def build_report(self, results, baseline, options):
+        """
+        Per-view measurements, failures and warnings, plus the run's settings.
+        Query counts are exact, so they always fail; render times vary from
+        run to run and only fail with --strict-timing.
+        """
+        views = {}
+        for name in results['large']:
+            small, large = results['small'][name], results['large'][name]
+            expected = baseline.get(name)
+            failures, warnings = [], []
+            if small['queries'] != large['queries']:
+                failures.append(f"query count grows with data: {small['queries']} → {large['queries']}")
+            if not options['update_baseline']:
+                if expected is None:
+                    failures.append('no baseline; run with --update-baseline')
+                else:
+                    if large['queries'] > expected['max_queries']:
+                        failures.append(f"{large['queries']} queries exceeds budget of {expected['max_queries']}")
+                    limit = expected['ms'] * (1 + options['tolerance']) + options['slack_ms']
+                    if large['ms'] > limit:
+                        timing = failures if options['strict_timing'] else warnings
+                        timing.append(f"{large['ms']:.1f}ms exceeds {limit:.1f}ms (baseline {expected['ms']:.1f}ms)")
+            views[name] = {
+                'queries': {'small': small['queries'], 'large': large['queries'], 'budget': expected and expected['max_queries']},
+                'ms': {'small': small['ms'], 'large': large['ms'], 'baseline': expected and expected['ms']},
+                'status': large['status'],
+                'failures': failures,
+                'warnings': warnings,
+            }
+
+        return {
+            'run_at': timezone.now().isoformat(),
+            'scales': SCALES,
+            'repeat': options['repeat'],
+            'tolerance': options['tolerance'],
+            'slack_ms': options['slack_ms'],
+            'strict_timing': options['strict_timing'],
+            'passed': not any(view['failures'] for view in views.values()),
+            'views': views,
+        }
+
+    def print_report(self, report):
+        self.stdout.write(self.style.SUCCESS('=' * 100))
+        self.stdout.write(self.style.SUCCESS(
+            f"  {'View':<28}{'Queries':>16}{'Budget':>8}{'Small ms':>11}{'Large ms':>11}{'Baseline':>10}"
+        ))
+        for name, view in report['views'].items():
+            queries, ms = view['queries'], view['ms']
+            budget = '-' if queries['budget'] is None else queries['budget']
+            baseline = '-' if ms['baseline'] is None else f"{ms['baseline']:.1f}"
+            line = (
+                f"{name:<28}{queries['small']:>7} → {queries['large']:>5}{budget:>8}"
+                f"{ms['small']:>11.1f}{ms['large']:>11.1f}{baseline:>10}"
+            )
+            if view['failures']:
+                self.stdout.write(self.style.ERROR(f'❌{line}'))
+                for failure in view['failures']:
+                    self.stdout.write(self.style.ERROR(f'     {failure}'))
+            elif view['warnings']:
+                self.stdout.write(self.style.WARNING(f'⚠️{line}'))
+                for warning in view['warnings']:
+                    self.stdout.write(self.style.WARNING(f'     {warning}'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'✅{line}'))
+        self.stdout.write(self.style.SUCCESS('=' * 100))
+        slow = [name for name, view in report['views'].items() if view['warnings']]
+        if report['passed'] and slow:
+            self.stdout.write(self.style.WARNING(
+                f"✨ All views within their query budgets; {len(slow)} slower than their render-time baseline "
+                f"(warning only, --strict-timing fails on it)"
+            ))
+        elif report['passed']:
+            self.stdout.write(self.style.SUCCESS('✨ All views within their query budgets and render-time baselines'))
+
+    def write_baseline(self, path, report, merge=False):
+        """
+        Record the large-scale measurements; budgets are the measured query
+        counts. With `merge` (a --views run) other views keep their entries.
+        """
+        views = self.load_baseline(path) if merge and Path(path).exists() else {}
+        views.update({
+            name: {'max_queries': view['queries']['large'], 'ms': view['ms']['large']}
+            for name, view in report['views'].items()
+        })
+        with open(path, 'w') as f:
+            json.dump({
+                'generated_at': report['run_at'],
+                'scales': report['scales'],
+                'repeat': report['repeat'],
+                'views': views,
+            }, f, indent=2)
+            f.write('\n')
+        self.stdout.write(self.style.SUCCESS(f'📝 Baseline written to {path}'))
@@ -0,0 +1,43 @@
+"""
+Management command to escalate pending leads nobody has reviewed in time (run hourly from cron)
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from pages.escalations import STALE_LEADS_CONSUMER, escalate_stale_leads
+from pages.events import get_watermark
+
+
+class Command(BaseCommand):
+    help = f'Send one alert listing leads still pending {settings.STALE_LEAD_HOURS}h after submission'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='List the leads that would be escalated without sending or moving the watermark',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        result = escalate_stale_leads(dry_run=options['dry_run'])
+
+        for inquiry in result['stale']:
+            self.stdout.write(f"  ⏰ #{inquiry.id} {inquiry.name} <{inquiry.email}> submitted {inquiry.submitted_at:%Y-%m-%d %H:%M}")
+
+        if options['dry_run']:
+            self.stdout.write(self.style.HTTP_INFO(f"  (dry run - {len(result['stale'])} leads would be escalated)"))
+        elif result['sent']:
+            self.stdout.write(self.style.SUCCESS(f"📧 Escalated {len(result['stale'])} stale leads in one alert"))
+        elif result['error']:
+            self.stdout.write(self.style.ERROR(f"❌ {len(result['stale'])} stale leads not escalated: {result['error']}"))
+        else:
+            self.stdout.write(self.style.HTTP_INFO('⏭️  No newly overdue leads'))
+
+        self.stdout.write(self.style.SUCCESS('=' * 60))
+        self.stdout.write(self.style.SUCCESS(
+            f"📊 Read {result['scanned']} events, watermark at {get_watermark(STALE_LEADS_CONSUMER)} "
+            f"({time.perf_counter() - started:.2f}s)"
+        ))
+        self.stdout.write(self.style.SUCCESS('=' * 60))
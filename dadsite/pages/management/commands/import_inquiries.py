@@ -0,0 +1,309 @@
+"""
+Management command to bulk import historical leads and clients into ClientInquiry
+"""
+import csv
+import json
+import sys
+import time
+from datetime import datetime, time as dt_time
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from pages.forms import ClientInquiryForm
+from pages.models import ClientInquiry
+
+
+# Optional tracking columns that are not part of the public contact form
+STATUS_FIELDS = ['group', 'lead_status', 'client_status', 'notes', 'reviewed_by']
+
+# Form fields with few distinct values; each value is validated once per import
+REPEATED_FIELDS = {'age', 'fitness_level', 'fitness_goals', 'current_frequency', 'referral_source'}
+
+# Every column but the primary key, in INSERT order
+INQUIRY_FIELDS = [field for field in ClientInquiry._meta.concrete_fields if not field.primary_key]
+
+
+class Command(BaseCommand):
+    help = 'Bulk import client inquiries from a CSV or JSON file (no alert emails are sent)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help="File to import ('-' reads from stdin). CSV needs a header row; JSON may be an array or one object per line.",
+        )
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'json'],
+            help='Input format (default: guessed from the file extension, CSV otherwise)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Rows inserted per transaction (default: 10000)',
+        )
+        parser.add_argument(
+            '--rejects',
+            help='Write rejected rows with their errors to this CSV file',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate every row but do not write anything to the database',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        path = options['path']
+        input_format = options['format'] or ('json' if path.endswith(('.json', '.jsonl', '.ndjson')) else 'csv')
+
+        self.stdout.write(self.style.SUCCESS(f'📥 Importing client inquiries from {path} ({input_format})...'))
+
+        self.imported_at = timezone.now()
+        self.build_validators()
+        self.insert_sql = self.build_insert()
+
+        imported_count = 0
+        rejected = []
+        batch = []
+        started = time.perf_counter()
+
+        stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8-sig')
+        try:
+            rows = self.read_json(stream) if input_format == 'json' else csv.DictReader(stream)
+            for line_number, row in enumerate(rows, start=1):
+                if not isinstance(row, dict):
+                    rejected.append((line_number, {'row': json.dumps(row)}, 'Expected a JSON object with the inquiry fields'))
+                    continue
+                try:
+                    batch.append(self.build_inquiry(row))
+                except ValidationError as e:
+                    rejected.append((line_number, row, self.format_errors(e)))
+                    continue
+
+                if len(batch) >= batch_size:
+                    imported_count += self.flush(batch, options['dry_run'])
+                    batch = []
+
+            if batch:
+                imported_count += self.flush(batch, options['dry_run'])
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Could not read {path}: {e}')
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        elapsed = time.perf_counter() - started
+
+        for line_number, row, errors in rejected[:20]:
+            self.stdout.write(self.style.WARNING(f'  ❌ Row {line_number}: {errors}'))
+        if len(rejected) > 20:
+            self.stdout.write(self.style.WARNING(f'  ... and {len(rejected) - 20} more rejected rows'))
+
+        if options['rejects'] and rejected:
+            self.write_rejects(options['rejects'], rejected)
+
+        # Summary
+        rate = imported_count / elapsed if elapsed else 0
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS('=' * 60))
+        self.stdout.write(self.style.SUCCESS(f'📊 Summary{" (dry run)" if options["dry_run"] else ""}:'))
+        self.stdout.write(self.style.SUCCESS(f'  ✅ Imported: {imported_count}'))
+        self.stdout.write(self.style.SUCCESS(f'  ❌ Rejected: {len(rejected)}'))
+        self.stdout.write(self.style.SUCCESS(f'  ⏱️  Time: {elapsed:.2f}s ({rate:,.0f} rows/s)'))
+        self.stdout.write(self.style.SUCCESS('=' * 60))
+
+    def build_validators(self):
+        """
+        Build the validation rules once from ClientInquiryForm instead of
+        constructing a form (and its widgets) for every row
+        """
+        form = ClientInquiryForm()
+        self.form_fields = form.fields
+        self.cleaned_values = {}
+
+        # Accept both goal keys ('weight_loss') and labels ('Weight Loss')
+        self.goal_lookup = {}
+        for key, label in ClientInquiry.GOAL_CHOICES:
+            self.goal_lookup[key.lower()] = key
+            self.goal_lookup[label.lower()] = key
+
+        self.status_choices = {
+            'group': {key for key, _ in ClientInquiry.GROUP_CHOICES},
+            'lead_status': {key for key, _ in ClientInquiry.LEAD_STATUS_CHOICES},
+            'client_status': {key for key, _ in ClientInquiry.CLIENT_STATUS_CHOICES},
+        }
+
+        # Column values for anything a row doesn't set; the raw INSERT skips
+        # auto_now/auto_now_add, so both timestamps default to the import time
+        self.adapt_datetime = connection.ops.adapt_datetimefield_value
+        self.defaults = {field.name: field.get_default() for field in INQUIRY_FIELDS}
+        self.defaults['submitted_at'] = self.defaults['updated_at'] = self.adapt_datetime(self.imported_at)
+
+    def build_insert(self):
+        """Parameterised INSERT for one ClientInquiry row, column order as INQUIRY_FIELDS"""
+        table = connection.ops.quote_name(ClientInquiry._meta.db_table)
+        columns = ', '.join(connection.ops.quote_name(field.column) for field in INQUIRY_FIELDS)
+        placeholders = ', '.join(['%s'] * len(INQUIRY_FIELDS))
+        return f'INSERT INTO {table} ({columns}) VALUES ({placeholders})'
+
+    def build_inquiry(self, row):
+        """
+        Validate a single input row and return its column values, in
+        INQUIRY_FIELDS order, ready for the INSERT.
+        Raises ValidationError with a dict of field errors.
+        """
+        errors = {}
+        cleaned = {}
+
+        for name, field in self.form_fields.items():
+            value = row.get(name)
+            if name == 'fitness_goals':
+                value = self.split_goals(value)
+            elif isinstance(value, str):
+                value = value.strip()
+            try:
+                cleaned[name] = self.clean_value(name, field, value)
+            except ValidationError as e:
+                errors[name] = e.messages
+
+        if errors:
+            raise ValidationError(errors)
+
+        # Same normalisation as ClientInquiryForm.clean_fitness_goals() / save()
+        cleaned['fitness_goals'] = ','.join(cleaned['fitness_goals'])
+        for name in ['phone', 'additional_goals', 'injuries_limitations', 'message', 'referral_source']:
+            cleaned[name] = (cleaned[name] or '').strip()
+        cleaned['age'] = cleaned['age'] or None
+
+        inquiry = {**self.defaults, **cleaned}
+
+        for name in STATUS_FIELDS:
+            value = str(row.get(name) or '').strip()
+            if not value:
+                continue
+            if name in self.status_choices and value not in self.status_choices[name]:
+                errors[name] = [f"'{value}' is not a valid choice."]
+                continue
+            inquiry[name] = value
+
+        if inquiry['group'] == 'client' and not inquiry['client_status']:
+            inquiry['client_status'] = 'contacted'
+        if inquiry['group'] == 'client' and inquiry['lead_status'] == 'pending':
+            inquiry['lead_status'] = 'approved'
+
+        submitted_at = row.get('submitted_at')
+        if submitted_at:
+            inquiry['submitted_at'] = self.parse_timestamp(submitted_at)
+            if inquiry['submitted_at'] is None:
+                errors['submitted_at'] = [f"'{submitted_at}' is not a valid date/time."]
+            else:
+                inquiry['submitted_at'] = self.adapt_datetime(inquiry['submitted_at'])
+
+        if errors:
+            raise ValidationError(errors)
+
+        return tuple(inquiry[field.name] for field in INQUIRY_FIELDS)
+
+    def clean_value(self, name, field, value):
+        """field.clean(value), remembered for REPEATED_FIELDS (valid values only)"""
+        if name not in REPEATED_FIELDS:
+            return field.clean(value)
+        key = (name, tuple(value) if isinstance(value, list) else value)
+        try:
+            return self.cleaned_values[key]
+        except KeyError:
+            self.cleaned_values[key] = field.clean(value)
+            return self.cleaned_values[key]
+        except TypeError:
+            # Unhashable JSON value (e.g. an object): validate it every time
+            return field.clean(value)
+
+    def split_goals(self, value):
+        """Convert 'Weight Loss; strength' or a JSON list into goal keys"""
+        if not value:
+            return []
+        if isinstance(value, str):
+            value = value.replace(';', ',').replace('|', ',').split(',')
+        return [self.goal_lookup.get(str(goal).strip().lower(), str(goal).strip()) for goal in value if str(goal).strip()]
+
+    def parse_timestamp(self, value):
+        """Parse an ISO date or datetime, assuming the current timezone when naive"""
+        value = str(value).strip()
+        try:
+            parsed = parse_datetime(value)
+            if parsed is None:
+                day = parse_date(value)
+                if day is None:
+                    return None
+                parsed = datetime.combine(day, dt_time.min)
+        except ValueError:
+            # Well-formed but impossible, e.g. 2021-13-45
+            return None
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
+
+    def flush(self, batch, dry_run):
+        """
+        Insert one batch with executemany in a single transaction.
+
+        Rows are validated already, so the per-field work bulk_create does for
+        every row is skipped; the raw INSERT also keeps the historical
+        submitted_at values that auto_now_add would overwrite.
+        """
+        if dry_run:
+            return len(batch)
+
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.executemany(self.insert_sql, batch)
+
+        return len(batch)
+
+    def read_json(self, stream):
+        """
+        Yield objects from a JSON array or from newline-delimited JSON.
+        Newline-delimited input is streamed; arrays are loaded in one go.
+        """
+        first_line = stream.readline()
+        while first_line and not first_line.strip():
+            first_line = stream.readline()
+
+        if first_line.lstrip().startswith('['):
+            yield from json.loads(first_line + stream.read())
+            return
+
+        if first_line:
+            yield json.loads(first_line)
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+
+    def format_errors(self, error):
+        """Flatten a ValidationError dict into a single readable line"""
+        if hasattr(error, 'message_dict'):
+            return '; '.join(f"{field}: {' '.join(messages)}" for field, messages in error.message_dict.items())
+        return ' '.join(error.messages)
+
+    def write_rejects(self, path, rejected):
+        """Write rejected rows (original columns plus line number and errors) to a CSV file"""
+        fieldnames = ['line', 'errors']
+        for _, row, _ in rejected:
+            for key in row:
+                if key not in fieldnames:
+                    fieldnames.append(key)
+
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            for line_number, row, errors in rejected:
+                writer.writerow({**row, 'line': line_number, 'errors': errors})
+
+        self.stdout.write(self.style.WARNING(f'  📝 Rejected rows written to {path}'))
@@ -0,0 +1,523 @@
+"""
+Management command to load test every route in pages.urls
+
+In-process runs (the default) work on a scratch copy of the database, taken
+with SQLite's online backup API, so contact POSTs and status transitions
+never reach the real event log or dashboard stats. Against a server (--url)
+only read-only routes are requested unless --allow-writes is given.
+"""
+import http.cookiejar
+import json
+import random
+import re
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing, contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import URLPattern, reverse
+from django.utils import timezone
+from pages import urls as pages_urls
+from pages.models import APIToken, ClientInquiry
+from pages.profiling import stored_profiles
+from pages.snapshots import SnapshotError, copy_online, database_path
+from pages.warmup import local_host
+
+# Routes that need a logged-in staff user besides everything under /manage/
+STAFF_ROUTES = {'health_status'}
+
+# Inquiries created by the load test use this domain so they are easy to tell apart
+LOADTEST_EMAIL_DOMAIN = 'loadtest.invalid'
+
+
+def newest_profile():
+    """URL args for the newest stored profile's folded stacks, or None if there is none"""
+    profiles = stored_profiles()
+    return [profiles[0].with_suffix('.collapsed').name] if profiles else None
+
+
+# How to fill in routes with URL parameters: inquiry ids from a pool (pending
+# leads are used once, clients are reused), or `args` returning the reverse()
+# arguments or None to skip. A parameterised route missing here is skipped
+# with a warning instead of guessed at.
+PARAMETERISED_ROUTES = {
+    'approve_inquiry': {'method': 'POST', 'pool': 'pending'},
+    'deny_inquiry': {'method': 'POST', 'pool': 'pending'},
+    'update_client_status': {'method': 'POST', 'pool': 'client'},
+    'onboard_client': {'method': 'POST', 'pool': 'client'},
+    'pending_inquiry_card': {'method': 'GET', 'pool': 'pending'},
+    'api_inquiry_detail': {'method': 'GET', 'pool': 'client'},
+    'profile_download': {'args': newest_profile, 'skip_reason': f'no stored profile in {settings.PROFILE_DIR}'},
+}
+
+CONTACT_FORM = {
+    'email': f'visitor@{LOADTEST_EMAIL_DOMAIN}',
+    'phone': '(555) 123-4567',
+    'age': '52',
+    'fitness_level': 'beginner',
+    'fitness_goals': ['strength', 'flexibility'],
+    'current_frequency': '1-2',
+    'message': 'Looking to get stronger and stay mobile.',
+    'referral_source': 'Load test',
+}
+
+
+class NoRedirectHandler(urllib.request.HTTPRedirectHandler):
+    """Report redirects (e.g. after a POST) instead of following them, like the test client"""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+class Command(BaseCommand):
+    help = 'Drive every route in pages.urls concurrently and report latency percentiles, throughput and queries per request'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url',
+            help='Base URL of a running server (e.g. http://localhost:8000). Default: in-process through the test client',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=4,
+            help='Concurrent workers (default: 4)',
+        )
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=10,
+            help='Seconds to run (default: 10)',
+        )
+        parser.add_argument(
+            '--routes',
+            help='Comma-separated route names to include (default: all)',
+        )
+        parser.add_argument(
+            '--username',
+            help='Staff username for /manage/ routes (--url mode; in-process mode uses a temporary staff user)',
+        )
+        parser.add_argument(
+            '--password',
+            help='Password for --username',
+        )
+        parser.add_argument(
+            '--json',
+            dest='json_path',
+            help='Write results to this JSON file',
+        )
+        parser.add_argument(
+            '--compare',
+            help='Compare against a previous --json result file',
+        )
+        parser.add_argument(
+            '--allow-writes',
+            action='store_true',
+            help=(
+                '--url mode: also send contact POSTs and status transitions. Their inquiries, events and '
+                'dashboard stats stay in the server\'s database, so only use it against a staging server'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1 or options['duration'] <= 0:
+            raise CommandError('--concurrency and --duration must be positive')
+        if options['url'] and not (options['username'] and options['password']):
+            self.stdout.write(self.style.WARNING('⚠️  No --username/--password given: /manage/ routes are skipped in --url mode'))
+
+        routes, skipped = self.discover_routes(options['routes'])
+        for name, reason in skipped:
+            self.stdout.write(self.style.WARNING(f'⏭️  Skipping {name}: {reason}'))
+        if options['url'] and not options['username']:
+            routes = [route for route in routes if not route['staff']]
+        if options['url'] and not options['allow_writes']:
+            self.stdout.write(self.style.WARNING('⚠️  POST routes skipped in --url mode (pass --allow-writes on a staging server)'))
+            routes = [route for route in routes if route['method'] != 'POST']
+        if options['url'] and self.url_api_user(options) is None:
+            self.stdout.write(self.style.WARNING(
+                '⚠️  /api/v1/ routes skipped: --url mode needs a --username that is staff in this database'
+            ))
+            routes = [route for route in routes if not route['api']]
+        if not routes:
+            raise CommandError('No routes to test')
+
+        self.stdout.write(self.style.SUCCESS(
+            f"🚀 Load testing {len(routes)} routes for {options['duration']:g}s with {options['concurrency']} workers "
+            f"({'against ' + options['url'] if options['url'] else 'in-process'})..."
+        ))
+        for route in routes:
+            self.stdout.write(f"  {route['method']:<4} {route['name']:<26} {route['example_path']}")
+
+        if options['url']:
+            results = self.prepare_and_run(routes, options)
+        else:
+            # Keep alert emails in memory instead of sending them
+            with self.scratch_database(), override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'):
+                results = self.prepare_and_run(routes, options)
+
+        report = self.build_report(results, options)
+        self.print_report(report)
+
+        if options['compare']:
+            self.print_comparison(report, options['compare'])
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"📝 Results written to {options['json_path']}"))
+
+    def discover_routes(self, only=None):
+        """
+        Build a request scenario for every named route in pages.urls
+
+        Returns:
+            tuple: (routes, [(name, reason)] for the routes that were skipped)
+        """
+        wanted = set(only.split(',')) if only else None
+        routes = []
+        skipped = []
+
+        for pattern in pages_urls.urlpatterns:
+            if not isinstance(pattern, URLPattern) or not pattern.name:
+                continue
+            name = pattern.name
+            if wanted and name not in wanted:
+                continue
+
+            staff = str(pattern.pattern).startswith('manage/') or name in STAFF_ROUTES
+            api = str(pattern.pattern).startswith('api/')
+            route = {'name': name, 'method': 'GET', 'staff': staff, 'api': api, 'pool': None}
+
+            if pattern.pattern.converters:
+                spec = PARAMETERISED_ROUTES.get(name)
+                if spec is None:
+                    skipped.append((name, f'URL parameters not covered by PARAMETERISED_ROUTES in {__file__}'))
+                    continue
+                route['method'] = spec.get('method', 'GET')
+                if 'pool' in spec:
+                    route['pool'] = spec['pool']
+                    route['example_path'] = reverse(name, args=[0]).replace('/0/', '/<id>/')
+                    routes.append(route)
+                    continue
+                args = spec['args']()
+                if args is None:
+                    skipped.append((name, spec['skip_reason']))
+                    continue
+                path = reverse(name, args=args)
+            else:
+                path = reverse(name)
+
+            routes.append({**route, 'path': path, 'example_path': path})
+            if name == 'contact':
+                routes.append({'name': 'contact (POST)', 'method': 'POST', 'staff': False, 'api': False, 'pool': None, 'path': path, 'example_path': path})
+
+        return routes, skipped
+
+    @contextmanager
+    def scratch_database(self):
+        """Point every connection at a temporary copy of the database, discarded afterwards"""
+        try:
+            source = database_path()
+        except SnapshotError as e:
+            raise CommandError(f'{e}: in-process load tests run on a copy, use --url instead')
+        with tempfile.TemporaryDirectory() as directory:
+            copy_path = Path(directory) / 'loadtest.sqlite3'
+            with closing(sqlite3.connect(copy_path)) as target:
+                copy_online(source, target, settings.SNAPSHOT_PAGES_PER_STEP, settings.SNAPSHOT_STEP_SLEEP)
+            self.stdout.write(self.style.HTTP_INFO(f'📋 Running on a scratch copy of {source.name}'))
+
+            # Worker threads open their own connections from this same settings dict
+            old_name = connection.settings_dict['NAME']
+            connections.close_all()
+            connection.settings_dict['NAME'] = str(copy_path)
+            try:
+                yield
+            finally:
+                connections.close_all()
+                connection.settings_dict['NAME'] = old_name
+
+    def prepare_and_run(self, routes, options):
+        """Create the inquiry pools, staff user and API token, then run"""
+        self.created_ids = []
+        self.pending_ids = []
+        self.pool_lock = threading.Lock()
+        self.client_ids = self.create_inquiries(50, group='client')
+        staff_user = self.get_staff_user(options)
+        api_token, self.api_key = self.create_api_token(options, staff_user)
+
+        try:
+            return self.run(routes, options, staff_user)
+        finally:
+            if options['url']:
+                if api_token:
+                    api_token.delete()
+                if not options['allow_writes']:
+                    # Only read by the server, so no events were recorded for them
+                    ClientInquiry.objects.filter(id__in=self.created_ids).delete()
+
+    def get_staff_user(self, options):
+        """A temporary staff user for in-process runs (in the scratch database), None with --url"""
+        if options['url']:
+            return None
+        return get_user_model().objects.create_user(f'loadtest-{uuid.uuid4().hex[:8]}', is_staff=True)
+
+    def url_api_user(self, options):
+        """The local staff user matching --username, who owns the API token in --url mode"""
+        if not options['username']:
+            return None
+        return get_user_model().objects.filter(username=options['username'], is_staff=True).first()
+
+    def create_api_token(self, options, staff_user):
+        """
+        Return (token, key) - a temporary API token for the /api/v1/ routes,
+        for the temporary staff user or the --username user in --url mode
+        (the server must use this database), or (None, None) without one
+        """
+        user = self.url_api_user(options) if options['url'] else staff_user
+        if user is None:
+            return None, None
+        token = APIToken(name=f'Load test {uuid.uuid4().hex[:8]}', user=user)
+        key = token.generate_key()
+        token.save()
+        return token, key
+
+    def create_inquiries(self, count, group):
+        """Create inquiries for status transitions to act on"""
+        batch = ClientInquiry.objects.bulk_create([
+            ClientInquiry(
+                name=f'Load Test {uuid.uuid4().hex[:6]}',
+                email=f'{uuid.uuid4().hex[:12]}@{LOADTEST_EMAIL_DOMAIN}',
+                fitness_level='beginner',
+                fitness_goals='strength',
+                current_frequency='1-2',
+                group=group,
+                lead_status='approved' if group == 'client' else 'pending',
+                client_status='contacted' if group == 'client' else None,
+            )
+            for _ in range(count)
+        ])
+        ids = [obj.pk for obj in batch]
+        if None in ids:
+            # Backends without RETURNING support: look the rows up again
+            ids = list(ClientInquiry.objects.filter(email__endswith=LOADTEST_EMAIL_DOMAIN, group=group).values_list('id', flat=True))
+        self.created_ids.extend(ids)
+        return ids
+
+    def next_inquiry_id(self, pool):
+        """Take a pending lead (used once) or pick a random client"""
+        with self.pool_lock:
+            if pool == 'client':
+                return random.choice(self.client_ids)
+            if not self.pending_ids:
+                self.pending_ids = self.create_inquiries(200, group='lead')
+            return self.pending_ids.pop()
+
+    def build_request(self, route):
+        """Return (path, data) for one request of a route"""
+        if route['pool']:
+            inquiry_id = self.next_inquiry_id(route['pool'])
+            path = reverse(route['name'], args=[inquiry_id])
+            if route['method'] == 'GET':
+                return path, None
+            data = {'client_status': random.choice(['contacted', 'active', 'inactive'])} if route['pool'] == 'client' else {}
+            return path, data
+        if route['method'] == 'POST':
+            return route['path'], {**CONTACT_FORM, 'name': f'Load Test {uuid.uuid4().hex[:6]}'}
+        return route['path'], None
+
+    def run(self, routes, options, staff_user):
+        """Run workers until the duration elapses; returns {route name: [samples]}"""
+        deadline = time.perf_counter() + options['duration']
+        results = {route['name']: [] for route in routes}
+        results_lock = threading.Lock()
+        self.started = time.perf_counter()
+
+        def worker(worker_number):
+            session = self.make_session(options, staff_user)
+            local = {route['name']: [] for route in routes}
+            index = worker_number
+            try:
+                while time.perf_counter() < deadline:
+                    route = routes[index % len(routes)]
+                    index += 1
+                    if route['staff'] and session is None:
+                        continue
+                    local[route['name']].append(self.request(session, route, options))
+            finally:
+                if not options['url']:
+                    connections.close_all()
+            with results_lock:
+                for name, samples in local.items():
+                    results[name].extend(samples)
+
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            list(executor.map(worker, range(options['concurrency'])))
+
+        self.elapsed = time.perf_counter() - self.started
+        return results
+
+    def make_session(self, options, staff_user):
+        """A test client (in-process) or a cookie-aware opener (--url), logged in as staff"""
+        if not options['url']:
+            client = Client(HTTP_HOST=local_host())
+            client.force_login(staff_user)
+            return client
+
+        opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()),
+            NoRedirectHandler(),
+        )
+        opener.base_url = options['url'].rstrip('/')
+        if options['username']:
+            login_url = opener.base_url + '/admin/login/'
+            page = opener.open(login_url).read().decode()
+            token = re.search(r'name="csrfmiddlewaretoken" value="([^"]+)"', page).group(1)
+            data = urllib.parse.urlencode({
+                'csrfmiddlewaretoken': token,
+                'username': options['username'],
+                'password': options['password'],
+                'next': '/manage/',
+            }).encode()
+            try:
+                opener.open(urllib.request.Request(login_url, data=data, headers={'Referer': login_url}))
+            except urllib.error.HTTPError as e:
+                # A successful login redirects to ?next=
+                if e.code == 302:
+                    return opener
+                raise CommandError(f'Login as {options["username"]} failed: HTTP {e.code}')
+            raise CommandError(f'Login as {options["username"]} failed: check the username and password')
+        return opener
+
+    def request(self, session, route, options):
+        """Send one request; returns (seconds, status, queries or None)"""
+        path, data = self.build_request(route)
+        auth = {'Authorization': f'Bearer {self.api_key}'} if route['api'] else {}
+
+        if not options['url']:
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                if route['method'] == 'POST':
+                    response = session.post(path, data, headers=auth)
+                else:
+                    response = session.get(path, headers=auth)
+                duration = time.perf_counter() - started
+            return (duration, response.status_code, len(queries))
+
+        url = session.base_url + path
+        headers = {'Referer': url, **auth}
+        body = None
+        if route['method'] == 'POST':
+            headers['X-CSRFToken'] = self.csrf_token(session)
+            body = urllib.parse.urlencode(data, doseq=True).encode()
+
+        started = time.perf_counter()
+        try:
+            with session.open(urllib.request.Request(url, data=body, headers=headers)) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            status = e.code
+        except urllib.error.URLError:
+            status = 0
+        return (time.perf_counter() - started, status, None)
+
+    def csrf_token(self, session):
+        """Get a CSRF cookie for POSTs in --url mode (fetching a page that sets one if needed)"""
+        jar = next(handler.cookiejar for handler in session.handlers if isinstance(handler, urllib.request.HTTPCookieProcessor))
+        token = next((cookie.value for cookie in jar if cookie.name == 'csrftoken'), None)
+        if token is None:
+            session.open(session.base_url + reverse('contact')).read()
+            token = next((cookie.value for cookie in jar if cookie.name == 'csrftoken'), '')
+        return token
+
+    def build_report(self, results, options):
+        """Summarise samples per route"""
+        routes = {}
+        for name, samples in results.items():
+            if not samples:
+                continue
+            durations = sorted(sample[0] * 1000 for sample in samples)
+            queries = [sample[2] for sample in samples if sample[2] is not None]
+            # Every scenario is built to succeed, so a 4xx means the route wasn't exercised
+            errors = sum(1 for sample in samples if sample[1] == 0 or sample[1] >= 400)
+            routes[name] = {
+                'requests': len(samples),
+                'errors': errors,
+                'rps': round(len(samples) / self.elapsed, 2),
+                'p50_ms': round(self.percentile(durations, 50), 2),
+                'p95_ms': round(self.percentile(durations, 95), 2),
+                'p99_ms': round(self.percentile(durations, 99), 2),
+                'queries_per_request': round(statistics.fmean(queries), 2) if queries else None,
+                'statuses': sorted({sample[1] for sample in samples}),
+            }
+
+        total = sum(route['requests'] for route in routes.values())
+        return {
+            'run_at': timezone.now().isoformat(),
+            'target': options['url'] or 'in-process',
+            'concurrency': options['concurrency'],
+            'duration_s': round(self.elapsed, 2),
+            'total_requests': total,
+            'total_rps': round(total / self.elapsed, 2),
+            'routes': routes,
+        }
+
+    def percentile(self, sorted_values, p):
+        index = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+        return sorted_values[index]
+
+    def print_report(self, report):
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS('=' * 96))
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Route':<26}{'Reqs':>7}{'Err':>6}{'RPS':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'Queries':>9}  Status"
+        ))
+        for name, route in report['routes'].items():
+            queries = f"{route['queries_per_request']:.1f}" if route['queries_per_request'] is not None else '-'
+            style = self.style.ERROR if route['errors'] else self.style.SUCCESS
+            self.stdout.write(style(
+                f"{name:<26}{route['requests']:>7}{route['errors']:>6}{route['rps']:>9.1f}"
+                f"{route['p50_ms']:>10.1f}{route['p95_ms']:>10.1f}{route['p99_ms']:>10.1f}{queries:>9}  "
+                f"{','.join(str(status) for status in route['statuses'])}"
+            ))
+        self.stdout.write(self.style.SUCCESS('=' * 96))
+        self.stdout.write(self.style.SUCCESS(
+            f"📊 {report['total_requests']} requests in {report['duration_s']}s ({report['total_rps']} req/s)"
+        ))
+        errors = sum(route['errors'] for route in report['routes'].values())
+        if errors:
+            self.stdout.write(self.style.ERROR(f'❌ {errors} requests failed (status 0 or 4xx/5xx)'))
+
+    def print_comparison(self, report, path):
+        """Print p95 and throughput changes per route against an earlier run"""
+        try:
+            with open(path) as f:
+                previous = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Could not read {path}: {e}')
+
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(f"📈 Compared with {previous.get('run_at', path)}:"))
+        for name, route in report['routes'].items():
+            before = previous.get('routes', {}).get(name)
+            if not before:
+                self.stdout.write(f'  {name:<26} (new route)')
+                continue
+            p95_change = (route['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100 if before['p95_ms'] else 0
+            rps_change = (route['rps'] - before['rps']) / before['rps'] * 100 if before['rps'] else 0
+            style = self.style.ERROR if p95_change > 10 else self.style.SUCCESS
+            self.stdout.write(style(f'  {name:<26} p95 {p95_change:+6.1f}%   rps {rps_change:+6.1f}%'))
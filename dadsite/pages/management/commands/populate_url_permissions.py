@@ -1,14 +1,17 @@
 """
 Management command to auto-discover URLs and populate URLPermission table
 """
+from django.core.cache import cache
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from django.urls import get_resolver
+from django.utils import timezone
 from pages.models import URLPermission
 import re
 
 
 class Command(BaseCommand):
-    help = 'Auto-discover all URLs in the project and create URLPermission entries'
+    help = 'Auto-discover all URLs in the project and sync URLPermission entries (cheap enough to run on every deploy)'
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -16,6 +19,16 @@ class Command(BaseCommand):
             action='store_true',
             help='Update descriptions for existing permissions',
         )
+        parser.add_argument(
+            '--prune',
+            action='store_true',
+            help='Delete public rules for URLs that no longer exist (admin-only and hidden rules are always kept)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show what would change without writing to the database',
+        )
 
     def handle(self, *args, **options):
         self.stdout.write(self.style.SUCCESS('🔍 Discovering URLs in project...'))
@@ -23,51 +36,71 @@ class Command(BaseCommand):
         # Get all URL patterns
         url_patterns = self.get_all_urls()
 
-        created_count = 0
-        updated_count = 0
-        skipped_count = 0
-
-        for url_info in url_patterns:
-            url_pattern = url_info['pattern']
-            description = url_info['description']
-
-            # Check if permission already exists
-            permission, created = URLPermission.objects.get_or_create(
-                url_pattern=url_pattern,
-                defaults={
-                    'visibility': 'public',
-                    'description': description,
-                    'is_active': True,
-                    'order': 100,  # Default to low priority
-                }
+        # One query for every existing rule, then a set-based diff
+        existing = {perm.url_pattern: perm for perm in URLPermission.objects.all()}
+        discovered = set(url_patterns)
+
+        to_create = [
+            URLPermission(
+                url_pattern=pattern,
+                visibility='public',
+                description=description,
+                is_active=True,
+                order=100,  # Default to low priority
             )
+            for pattern, description in url_patterns.items()
+            if pattern not in existing
+        ]
 
-            if created:
-                created_count += 1
-                self.stdout.write(
-                    self.style.SUCCESS(f'  ✅ Created: {url_pattern} - {description}')
-                )
-            elif options['update'] and permission.description != description:
-                permission.description = description
-                permission.save()
-                updated_count += 1
-                self.stdout.write(
-                    self.style.WARNING(f'  📝 Updated: {url_pattern} - {description}')
-                )
-            else:
-                skipped_count += 1
-                self.stdout.write(
-                    self.style.HTTP_INFO(f'  ⏭️  Skipped: {url_pattern} (already exists)')
-                )
+        to_update = []
+        if options['update']:
+            for pattern in discovered & existing.keys():
+                permission = existing[pattern]
+                if permission.description != url_patterns[pattern]:
+                    permission.description = url_patterns[pattern]
+                    permission.updated_at = timezone.now()
+                    to_update.append(permission)
+
+        to_prune = []
+        if options['prune']:
+            to_prune = [
+                existing[pattern]
+                for pattern in sorted(existing.keys() - discovered)
+                if existing[pattern].visibility == 'public'
+            ]
+
+        for permission in to_create:
+            self.stdout.write(self.style.SUCCESS(f'  ✅ Create: {permission.url_pattern} - {permission.description}'))
+        for permission in to_update:
+            self.stdout.write(self.style.WARNING(f'  📝 Update: {permission.url_pattern} - {permission.description}'))
+        for permission in to_prune:
+            self.stdout.write(self.style.ERROR(f'  🗑️  Prune: {permission.url_pattern} (URL no longer exists)'))
+
+        if options['dry_run']:
+            self.stdout.write(self.style.HTTP_INFO('  (dry run - no changes written)'))
+        elif to_create or to_update or to_prune:
+            # Apply the whole diff atomically; bulk operations skip save(), so
+            # the permission cache is cleared once, after the commit
+            with transaction.atomic():
+                URLPermission.objects.bulk_create(to_create)
+                if to_update:
+                    URLPermission.objects.bulk_update(to_update, ['description', 'updated_at'])
+                if to_prune:
+                    URLPermission.objects.filter(id__in=[permission.id for permission in to_prune]).delete()
+                transaction.on_commit(lambda: cache.delete('url_permissions_cache'))
+
+        unchanged_count = len(discovered) - len(to_create) - len(to_update)
 
         # Summary
         self.stdout.write('')
         self.stdout.write(self.style.SUCCESS('=' * 60))
-        self.stdout.write(self.style.SUCCESS(f'📊 Summary:'))
-        self.stdout.write(self.style.SUCCESS(f'  ✅ Created: {created_count}'))
+        self.stdout.write(self.style.SUCCESS(f'📊 Summary{" (dry run)" if options["dry_run"] else ""}:'))
+        self.stdout.write(self.style.SUCCESS(f'  ✅ Created: {len(to_create)}'))
         if options['update']:
-            self.stdout.write(self.style.SUCCESS(f'  📝 Updated: {updated_count}'))
-        self.stdout.write(self.style.SUCCESS(f'  ⏭️  Skipped: {skipped_count}'))
+            self.stdout.write(self.style.SUCCESS(f'  📝 Updated: {len(to_update)}'))
+        if options['prune']:
+            self.stdout.write(self.style.SUCCESS(f'  🗑️  Pruned: {len(to_prune)}'))
+        self.stdout.write(self.style.SUCCESS(f'  ⏭️  Unchanged: {unchanged_count}'))
         self.stdout.write(self.style.SUCCESS(f'  📋 Total URLs: {len(url_patterns)}'))
         self.stdout.write(self.style.SUCCESS('=' * 60))
         self.stdout.write('')
@@ -78,8 +111,11 @@ class Command(BaseCommand):
     def get_all_urls(self):
         """
         Get all URL patterns from the URLconf, excluding parameter-based URLs
+
+        Returns:
+            dict: {url_pattern: description}, in URLconf order
         """
-        url_patterns = []
+        url_patterns = {}
         resolver = get_resolver()
 
         # Get patterns from the resolver
@@ -91,18 +127,12 @@ class Command(BaseCommand):
             if self.has_url_parameters(pattern):
                 # Create base pattern without parameters
                 base_pattern = self.get_base_pattern(pattern)
-                if base_pattern and base_pattern not in [p['pattern'] for p in url_patterns]:
-                    url_patterns.append({
-                        'pattern': base_pattern,
-                        'description': f'Base URL for {name or "unnamed"}',
-                    })
+                if base_pattern and base_pattern not in url_patterns:
+                    url_patterns[base_pattern] = f'Base URL for {name or "unnamed"}'
             else:
                 # Add clean pattern
-                if pattern not in [p['pattern'] for p in url_patterns]:
-                    url_patterns.append({
-                        'pattern': pattern,
-                        'description': self.get_description(name, pattern),
-                    })
+                if pattern not in url_patterns:
+                    url_patterns[pattern] = self.get_description(name, pattern)
 
         return url_patterns
 
@@ -0,0 +1,72 @@
+"""
+Management command to delete expired sessions in small batches (run from cron)
+"""
+import time
+
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = 'Delete expired django_session rows in batches, keeping each write transaction short'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows deleted per transaction (default: 1000)',
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0.05,
+            help='Seconds to sleep between batches so requests can take the write lock (default: 0.05)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only count expired sessions',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        # Fixed cutoff so sessions expiring mid-run are left for the next run
+        cutoff = timezone.now()
+        expired = Session.objects.filter(expire_date__lt=cutoff)
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(
+                f'🔍 DRY RUN: {expired.count()} of {Session.objects.count()} sessions have expired'
+            ))
+            return
+
+        started = time.perf_counter()
+        deleted = batches = 0
+        while True:
+            # Indexed range scan on expire_date, then delete by primary key
+            with transaction.atomic():
+                keys = list(expired.values_list('session_key', flat=True)[:batch_size])
+                if not keys:
+                    break
+                deleted += Session.objects.filter(session_key__in=keys).delete()[0]
+            batches += 1
+            if len(keys) < batch_size:
+                break
+            if options['pause']:
+                time.sleep(options['pause'])
+
+        self.stdout.write(self.style.SUCCESS('=' * 60))
+        if deleted:
+            self.stdout.write(self.style.SUCCESS(
+                f'🗑️  Deleted {deleted} expired sessions in {batches} batches ({time.perf_counter() - started:.1f}s)'
+            ))
+        else:
+            self.stdout.write(self.style.HTTP_INFO('⏭️  No expired sessions'))
+        self.stdout.write(self.style.SUCCESS(f'📊 Sessions remaining: {Session.objects.count()}'))
+        self.stdout.write(self.style.SUCCESS('=' * 60))
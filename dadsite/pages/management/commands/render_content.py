@@ -0,0 +1,87 @@
+"""
+Management command to render content block and announcement Markdown into their stored HTML columns
+"""
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from pages.announcements import HOME_PAGE_CACHE_KEY
+from pages.models import Announcement, ContentBlock
+
+MODELS = [
+    ('Content blocks', ContentBlock, ['content_html']),
+    ('Announcements', Announcement, ['content_html', 'excerpt_html']),
+]
+
+
+class Command(BaseCommand):
+    help = 'Fill content_html (and announcement excerpts) for rows saved before Markdown rendering, in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Re-render every row, e.g. after changing the Markdown rules in pages/markup.py',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Rows rendered and written per transaction (default: 500)',
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0.05,
+            help='Seconds to sleep between batches so requests can take the write lock (default: 0.05)',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        verbosity = options['verbosity']
+        started = time.perf_counter()
+        total = 0
+        for label, model, fields in MODELS:
+            rows = model.objects.all() if options['all'] else model.objects.filter(content_html='').exclude(content='')
+            rendered = self.render_in_batches(model, rows, fields, batch_size, options['pause'])
+            total += rendered
+            if rendered or verbosity >= 2:
+                self.stdout.write(self.style.SUCCESS(f'📝 {label}: rendered {rendered}'))
+
+        if total:
+            # bulk_update skips save(), which normally clears the home page cache
+            cache.delete(HOME_PAGE_CACHE_KEY)
+
+        if verbosity >= 1:
+            self.stdout.write(self.style.SUCCESS('=' * 60))
+            if total:
+                self.stdout.write(self.style.SUCCESS(
+                    f'✨ Rendered {total} rows ({time.perf_counter() - started:.1f}s)'
+                ))
+            else:
+                self.stdout.write(self.style.HTTP_INFO('⏭️  All content already rendered'))
+            self.stdout.write(self.style.SUCCESS('=' * 60))
+
+    def render_in_batches(self, model, rows, fields, batch_size, pause):
+        """Walk `rows` by primary key, rendering and bulk-updating one batch per transaction"""
+        rendered = 0
+        last_id = 0
+        while True:
+            batch = list(rows.filter(id__gt=last_id).order_by('id').only('id', 'content')[:batch_size])
+            if not batch:
+                break
+            for row in batch:
+                row.render_content()
+            with transaction.atomic():
+                model.objects.bulk_update(batch, fields)
+            rendered += len(batch)
+            last_id = batch[-1].id
+            if len(batch) < batch_size:
+                break
+            if pause:
+                time.sleep(pause)
+        return rendered
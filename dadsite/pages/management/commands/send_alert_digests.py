@@ -0,0 +1,29 @@
+"""
+Management command to send hourly/daily alert digest emails (run from cron)
+"""
+from django.core.management.base import BaseCommand
+from pages.email_alerts import send_alert_digests
+
+
+class Command(BaseCommand):
+    help = 'Send one combined email per recipient for alerts queued in digest mode'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--mode',
+            choices=['hourly', 'daily', 'all'],
+            default='hourly',
+            help="Which digests to send (schedule 'hourly' every hour and 'daily' once a day)",
+        )
+
+    def handle(self, *args, **options):
+        modes = ['hourly', 'daily'] if options['mode'] == 'all' else [options['mode']]
+
+        for mode in modes:
+            digests_sent, alerts_sent, errors = send_alert_digests(mode)
+            if digests_sent:
+                self.stdout.write(self.style.SUCCESS(f'📧 Sent {digests_sent} {mode} digests covering {alerts_sent} alerts'))
+            elif not errors:
+                self.stdout.write(self.style.HTTP_INFO(f'⏭️  No pending {mode} alerts'))
+            for email, error in errors:
+                self.stdout.write(self.style.ERROR(f'❌ {mode.capitalize()} digest to {email} not sent (kept for the next run): {error}'))
@@ -0,0 +1,41 @@
+"""
+Management command to bring the dashboard's daily rollups up to date (run from cron)
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from pages.models import DailyInquiryStats
+from pages.stats import rebuild_daily_stats, update_daily_stats
+
+
+class Command(BaseCommand):
+    help = 'Apply new inquiry events to the daily stats rollups, or rebuild them from scratch'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Recompute every day from the inquiry table and event log (e.g. after a bulk import)',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        verbosity = options['verbosity']
+
+        if options['rebuild']:
+            days = rebuild_daily_stats()
+            if verbosity >= 1:
+                self.stdout.write(self.style.SUCCESS(f'🔄 Rebuilt {days} days of stats'))
+        else:
+            applied = update_daily_stats()
+            if verbosity >= 1 and applied:
+                self.stdout.write(self.style.SUCCESS(f'✅ Applied {applied} new events'))
+            elif verbosity >= 1:
+                self.stdout.write(self.style.HTTP_INFO('⏭️  Stats already up to date'))
+
+        if verbosity >= 1:
+            self.stdout.write(self.style.SUCCESS('=' * 60))
+            self.stdout.write(self.style.SUCCESS(
+                f'📊 {DailyInquiryStats.objects.count()} daily rows ({time.perf_counter() - started:.2f}s)'
+            ))
+            self.stdout.write(self.style.SUCCESS('=' * 60))
@@ -0,0 +1,20 @@
+"""
+Management command to warm caches and report how long each step takes
+"""
+from django.core.management.base import BaseCommand
+from pages.warmup import warm_caches
+
+
+class Command(BaseCommand):
+    help = 'Load permission rules, compile templates and prime caches (also run by wsgi.py when WARMUP_ON_START is set)'
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('🔥 Warming caches...'))
+
+        total = 0
+        for name, seconds, result in warm_caches():
+            total += seconds
+            style = self.style.ERROR if result.startswith('failed') else self.style.SUCCESS
+            self.stdout.write(style(f'  {name:<18} {seconds * 1000:8.1f}ms  {result}'))
+
+        self.stdout.write(self.style.SUCCESS(f'✨ Done in {total * 1000:.1f}ms'))
@@ -0,0 +1,43 @@
+"""
+Markdown for content blocks and announcements
+
+Trainers write `content` in Markdown. It is rendered and sanitized once when
+the row is saved (see ContentBlock.save() / Announcement.save()) into
+`content_html`, plus a short `excerpt_html` for announcement cards, so
+templates output stored HTML instead of running text filters on every
+request. After changing the rules below, re-render existing rows with
+`python manage.py render_content --all`.
+"""
+import markdown
+import nh3
+from django.utils.text import Truncator
+
+# Single line breaks become <br> like the old |linebreaks filter did
+MARKDOWN_EXTENSIONS = ['nl2br', 'sane_lists']
+
+ALLOWED_TAGS = {
+    'p', 'br', 'hr', 'strong', 'em', 'b', 'i', 'a', 'ul', 'ol', 'li',
+    'blockquote', 'code', 'pre', 'h2', 'h3', 'h4',
+}
+ALLOWED_ATTRIBUTES = {'a': {'href', 'title'}}
+ALLOWED_URL_SCHEMES = {'http', 'https', 'mailto', 'tel'}
+
+EXCERPT_WORDS = 30
+
+
+def render_markdown(text):
+    """Markdown -> HTML with everything outside the allowed tags stripped"""
+    if not text:
+        return ''
+    html = markdown.markdown(text, extensions=MARKDOWN_EXTENSIONS)
+    return nh3.clean(
+        html,
+        tags=ALLOWED_TAGS,
+        attributes=ALLOWED_ATTRIBUTES,
+        url_schemes=ALLOWED_URL_SCHEMES,
+    )
+
+
+def make_excerpt(html, words=EXCERPT_WORDS):
+    """The first `words` words of rendered HTML, with open tags closed"""
+    return Truncator(html).words(words, truncate=' …', html=True)
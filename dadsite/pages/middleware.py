@@ -1,10 +1,251 @@
 """
-Middleware to enforce URL-based permissions
+Middleware to enforce URL-based permissions, record request timings, profile requests on demand and compress responses
 """
+import logging
+import re
+import time
+import uuid
+import zlib
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
 from django.http import Http404
 from django.core.cache import cache
 from django.shortcuts import redirect
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:  # Optional: fall back to gzip
+    brotli = None
+from .health import record_request_duration
+from .logging_handlers import request_id_var
 from .models import URLPermission
+from .profiling import TOKEN_HEADER, TOKEN_PARAM, RequestProfile, read_token
+
+request_logger = logging.getLogger('pages.requests')
+
+# Accept upstream request IDs (e.g. from Caddy) only if they look sane
+REQUEST_ID_RE = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+
+class RequestTimingMiddleware:
+    """
+    Tag each request with a request ID (used in structured logs and returned
+    as X-Request-ID) and record its duration for the latency figures in the
+    detailed health status. Static files and health probes are not timed so
+    they don't drown out real page timings.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_id = request.headers.get('X-Request-ID', '')
+        if not REQUEST_ID_RE.match(request_id):
+            request_id = uuid.uuid4().hex
+        request.request_id = request_id
+        token = request_id_var.set(request_id)
+
+        try:
+            if request.path.startswith(('/static/', '/media/', '/health/')):
+                response = self.get_response(request)
+            else:
+                started = time.perf_counter()
+                response = self.get_response(request)
+                duration = time.perf_counter() - started
+                record_request_duration(duration)
+
+                if settings.LOG_REQUESTS:
+                    request_logger.info(
+                        '%s %s %s %.1fms', request.method, request.path, response.status_code, duration * 1000,
+                        extra={
+                            'method': request.method,
+                            'path': request.path,
+                            'status': response.status_code,
+                            'duration_ms': round(duration * 1000, 2),
+                        },
+                    )
+        finally:
+            request_id_var.reset(token)
+
+        response['X-Request-ID'] = request_id
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Run a request under the profiler when it carries a staff profiling token
+    (?_profile=<token> or an X-Profile-Token header, see pages/profiling.py)
+    and link the result in an X-Profile response header. Placed near the top
+    so sessions, auth and permission checks are included. Requests without a
+    token only pay for a substring check.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if TOKEN_HEADER not in request.META and TOKEN_PARAM not in request.META.get('QUERY_STRING', ''):
+            return self.get_response(request)
+
+        token = request.META.get(TOKEN_HEADER) or request.GET.get(TOKEN_PARAM)
+        user_id = read_token(token) if token else None
+        if user_id is None:
+            return self.get_response(request)
+
+        with RequestProfile() as profile:
+            response = self.get_response(request)
+
+        # The token only proves who it was issued to; the session must match
+        user = getattr(request, 'user', None)
+        if user is None or user.pk != user_id or not (user.is_staff or user.is_superuser):
+            return response
+
+        try:
+            stem = profile.save(request)
+        except OSError as e:
+            request_logger.warning("Could not save profile for %s: %s", request.path, e)
+            return response
+        response['X-Profile'] = f'/manage/profiles/{stem}.prof'
+        response['X-Profile-Collapsed'] = f'/manage/profiles/{stem}.collapsed'
+        return response
+
+
+# Types worth compressing; images, fonts and archives are already compressed
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/json', 'application/javascript', 'application/xml', 'application/xhtml+xml', 'image/svg+xml',
+)
+
+
+def accepted_encodings(accept_encoding):
+    """Content codings named in an Accept-Encoding header, ignoring ones refused with q=0"""
+    accepted = set()
+    for part in accept_encoding.lower().split(','):
+        coding, _, params = part.strip().partition(';')
+        if re.search(r'q=0(\.0*)?\s*$', params.strip()):
+            continue
+        accepted.add(coding.strip())
+    return accepted
+
+
+def stream_compressor(encoding, quality):
+    """
+    (compress, finish) callables for one streamed body. compress() flushes
+    after every chunk so streamed output is never held back in a buffer.
+    """
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=quality)
+        return (lambda chunk: compressor.process(chunk) + compressor.flush()), compressor.finish
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: gzip container
+    return (lambda chunk: compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)), compressor.flush
+
+
+def compress_stream(chunks, encoding, quality):
+    compress, finish = stream_compressor(encoding, quality)
+    for chunk in chunks:
+        data = compress(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+async def acompress_stream(chunks, encoding, quality):
+    compress, finish = stream_compressor(encoding, quality)
+    async for chunk in chunks:
+        data = compress(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+class CompressionMiddleware:
+    """
+    Compress dynamic responses (Brotli when installed and accepted, gzip
+    otherwise) above COMPRESS_MIN_BYTES. Static files are already served
+    precompressed by WhiteNoise, which sits above this middleware.
+
+    BREACH: responses that set the CSRF cookie carry a secret next to user
+    input. Django masks the token differently on every response; on top of
+    that these pages are never compressed for cross-site requests (the only
+    ones an attacker can trigger and observe) and otherwise use gzip with
+    Django's random-length header padding ("Heal the Breach") so compressed
+    sizes don't leak the secret.
+    """
+
+    max_random_bytes = 100
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not settings.COMPRESS_RESPONSES:
+            return response
+
+        if response.has_header('Content-Encoding') or response.status_code in (204, 304):
+            return response
+        if not response.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES):
+            return response
+        if not response.streaming and len(response.content) < settings.COMPRESS_MIN_BYTES:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        accepted = accepted_encodings(request.headers.get('Accept-Encoding', ''))
+        carries_csrf_token = settings.CSRF_COOKIE_NAME in response.cookies
+        if carries_csrf_token:
+            if request.headers.get('Sec-Fetch-Site') == 'cross-site':
+                return response
+            encoding = 'gzip' if 'gzip' in accepted else None
+        elif brotli is not None and 'br' in accepted:
+            encoding = 'br'
+        elif 'gzip' in accepted:
+            encoding = 'gzip'
+        else:
+            encoding = None
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            stream = acompress_stream if response.is_async else compress_stream
+            response.streaming_content = stream(response.streaming_content, encoding, settings.COMPRESS_BROTLI_QUALITY)
+            # The compressed length isn't known until the stream ends
+            del response.headers['Content-Length']
+        else:
+            if encoding == 'br':
+                compressed = brotli.compress(response.content, quality=settings.COMPRESS_BROTLI_QUALITY)
+            else:
+                compressed = compress_string(
+                    response.content, max_random_bytes=self.max_random_bytes if carries_csrf_token else None,
+                )
+            # Keep the original if compressing didn't help
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # A strong ETag would now describe different bytes; weaken it (RFC 9110 8.8.1)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+
+def get_url_permissions():
+    """Get active permission rules, from the cache or the database"""
+    permissions = cache.get('url_permissions_cache')
+    if permissions is None:
+        permissions = list(
+            URLPermission.objects.filter(is_active=True)
+            .values('url_pattern', 'visibility', 'order')
+            .order_by('order', 'url_pattern')
+        )
+        cache.set('url_permissions_cache', permissions, 60 * 15)  # Cache for 15 minutes
+    return permissions
 
 
 class URLPermissionMiddleware:
@@ -29,8 +270,8 @@ class URLPermissionMiddleware:
         if request.path.startswith('/static/') or request.path.startswith('/media/'):
             return self.get_response(request)
 
-        # Skip permission check for health check
-        if request.path == '/health/':
+        # Skip permission check for health checks
+        if request.path.startswith('/health/'):
             return self.get_response(request)
 
         # Check URL permissions
@@ -60,15 +301,7 @@ class URLPermissionMiddleware:
             'hidden': URL should return 404 for everyone
             'admin_required': URL requires admin access, deny for non-admins
         """
-        # Get cached permissions or fetch from database
-        permissions = cache.get('url_permissions_cache')
-        if permissions is None:
-            permissions = list(
-                URLPermission.objects.filter(is_active=True)
-                .values('url_pattern', 'visibility', 'order')
-                .order_by('order', 'url_pattern')
-            )
-            cache.set('url_permissions_cache', permissions, 60 * 15)  # Cache for 15 minutes
+        permissions = get_url_permissions()
 
         # Check each permission rule in order
         for perm in permissions:
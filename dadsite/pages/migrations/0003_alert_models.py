@@ -0,0 +1,67 @@
+# Generated by Django 5.0.6 on 2026-10-18 23:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0002_urlpermission'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlertType',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('alert_type', models.CharField(choices=[('new_inquiry', 'New Client Inquiry Submitted'), ('inquiry_approved', 'Lead Approved to Client'), ('inquiry_denied', 'Lead Denied/Marked as Spam'), ('client_status_changed', 'Client Status Changed'), ('client_activated', 'Client Activated (Started Paying)'), ('client_deactivated', 'Client Deactivated (Stopped Paying)')], max_length=50, unique=True)),
+                ('name', models.CharField(help_text='Display name for this alert', max_length=200)),
+                ('description', models.TextField(help_text='What triggers this alert?')),
+                ('is_active', models.BooleanField(default=True, help_text='Enable/disable this alert globally')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Alert Type',
+                'verbose_name_plural': 'Alert Types',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='EmailRecipient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Recipient name (e.g., John Doe)', max_length=200)),
+                ('email', models.EmailField(help_text='Email address', max_length=254, unique=True)),
+                ('is_active', models.BooleanField(default=True, help_text='Receive emails?')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Email Recipient',
+                'verbose_name_plural': 'Email Recipients',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='AlertSubscription',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_subscribed', models.BooleanField(default=True, help_text='Receive this specific alert?')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('alert_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='pages.alerttype')),
+                ('recipient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='pages.emailrecipient')),
+            ],
+            options={
+                'verbose_name': 'Alert Subscription',
+                'verbose_name_plural': 'Alert Subscriptions',
+                'unique_together': {('alert_type', 'recipient')},
+            },
+        ),
+        migrations.AddField(
+            model_name='alerttype',
+            name='recipients',
+            field=models.ManyToManyField(related_name='alert_types', through='pages.AlertSubscription', to='pages.emailrecipient'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.0.6 on 2026-10-18 23:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0003_alert_models'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alertsubscription',
+            name='delivery_mode',
+            field=models.CharField(choices=[('immediate', 'Immediately (one email per alert)'), ('hourly', 'Hourly Digest'), ('daily', 'Daily Digest')], default='immediate', help_text='Send each alert right away, or combine them into one digest email per hour/day', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='PendingAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('delivery_mode', models.CharField(choices=[('immediate', 'Immediately (one email per alert)'), ('hourly', 'Hourly Digest'), ('daily', 'Daily Digest')], max_length=20)),
+                ('subject', models.CharField(max_length=255)),
+                ('message', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('alert_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='pages.alerttype')),
+                ('recipient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pending_alerts', to='pages.emailrecipient')),
+            ],
+            options={
+                'verbose_name': 'Pending Alert',
+                'verbose_name_plural': 'Pending Alerts',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['delivery_mode', 'recipient', 'created_at'], name='pages_pendi_deliver_0b88cc_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.6 on 2026-10-19 00:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0004_alert_digests'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='clientinquiry',
+            index=models.Index(fields=['submitted_at'], name='pages_inquiry_submitted_idx'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.0.6 on 2026-10-19 00:12
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0005_inquiry_submitted_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text="Consumer name (e.g. 'daily_stats')", max_length=50, unique=True)),
+                ('last_event_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Event Watermark',
+                'verbose_name_plural': 'Event Watermarks',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='InquiryEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(choices=[('submitted', 'Inquiry Submitted'), ('approved', 'Lead Approved'), ('denied', 'Lead Denied'), ('status_changed', 'Client Status Changed'), ('edited', 'Status Edited in Admin')], max_length=20)),
+                ('from_state', models.CharField(blank=True, help_text='State before the change (blank for new inquiries)', max_length=30)),
+                ('to_state', models.CharField(help_text='State after the change', max_length=30)),
+                ('actor', models.CharField(blank=True, help_text='Staff username (blank for website submissions)', max_length=100)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('inquiry', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='events', to='pages.clientinquiry')),
+            ],
+            options={
+                'verbose_name': 'Inquiry Event',
+                'verbose_name_plural': 'Inquiry Events',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['inquiry', 'id'], name='pages_inqui_inquiry_64ff33_idx'), models.Index(fields=['event_type', 'created_at'], name='pages_inqui_event_t_2c93db_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.6 on 2026-10-19 00:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0006_inquiry_events'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyInquiryStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('submitted', models.PositiveIntegerField(default=0, help_text='New inquiries')),
+                ('approved', models.PositiveIntegerField(default=0, help_text='Leads converted to clients')),
+                ('denied', models.PositiveIntegerField(default=0, help_text='Leads denied/marked as spam')),
+                ('activated', models.PositiveIntegerField(default=0, help_text='Clients who became active (paying)')),
+                ('deactivated', models.PositiveIntegerField(default=0, help_text='Active clients who stopped paying')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Daily Inquiry Stats',
+                'verbose_name_plural': 'Daily Inquiry Stats',
+                'ordering': ['-date'],
+            },
+        ),
+    ]
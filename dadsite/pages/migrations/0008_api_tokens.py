@@ -0,0 +1,42 @@
+# Generated by Django 5.0.6 on 2026-10-19 00:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0007_daily_inquiry_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='APIToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text="What uses this token (e.g. 'CRM sync')", max_length=100)),
+                ('key_hash', models.CharField(editable=False, max_length=64, unique=True)),
+                ('prefix', models.CharField(editable=False, help_text='First characters of the key, to tell tokens apart', max_length=8)),
+                ('is_active', models.BooleanField(default=True, help_text='Uncheck to revoke')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'API Token',
+                'verbose_name_plural': 'API Tokens',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='clientinquiry',
+            index=models.Index(fields=['updated_at', 'id'], name='pages_inquiry_updated_idx'),
+        ),
+        migrations.AddField(
+            model_name='apitoken',
+            name='user',
+            field=models.ForeignKey(help_text='Staff account the token acts for; the token stops working if it loses staff status', limit_choices_to={'is_staff': True}, on_delete=django.db.models.deletion.CASCADE, related_name='api_tokens', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
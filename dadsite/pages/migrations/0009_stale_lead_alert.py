@@ -0,0 +1,31 @@
+# Generated by Django 5.0.6 on 2026-10-19 00:33
+
+from django.db import migrations, models
+
+
+def create_alert_type(apps, schema_editor):
+    AlertType = apps.get_model('pages', 'AlertType')
+    AlertType.objects.get_or_create(
+        alert_type='stale_lead',
+        defaults={
+            'name': 'Lead Not Reviewed in Time',
+            'description': 'Pending leads still unreviewed STALE_LEAD_HOURS (24) after submission, '
+                           'sent as one list per run of escalate_stale_leads',
+        },
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0008_api_tokens'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='alerttype',
+            name='alert_type',
+            field=models.CharField(choices=[('new_inquiry', 'New Client Inquiry Submitted'), ('inquiry_approved', 'Lead Approved to Client'), ('inquiry_denied', 'Lead Denied/Marked as Spam'), ('client_status_changed', 'Client Status Changed'), ('client_activated', 'Client Activated (Started Paying)'), ('client_deactivated', 'Client Deactivated (Stopped Paying)'), ('stale_lead', 'Lead Not Reviewed in Time (Escalation)')], max_length=50, unique=True),
+        ),
+        migrations.RunPython(create_alert_type, migrations.RunPython.noop),
+    ]
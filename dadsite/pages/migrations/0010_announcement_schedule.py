@@ -0,0 +1,28 @@
+# Generated by Django 5.0.6 on 2026-10-19 00:36
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0009_stale_lead_alert'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='announcement',
+            name='expires_at',
+            field=models.DateTimeField(blank=True, help_text='Hidden from the website after this time; leave empty to keep showing it', null=True),
+        ),
+        migrations.AlterField(
+            model_name='announcement',
+            name='published_date',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='Shown on the website from this time; set a future date to schedule it'),
+        ),
+        migrations.AddIndex(
+            model_name='announcement',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['published_date'], name='pages_announcement_live_idx'),
+        ),
+    ]
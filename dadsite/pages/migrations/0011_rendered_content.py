@@ -0,0 +1,38 @@
+# Generated by Django 5.0.6 on 2026-10-19 00:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0010_announcement_schedule'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='announcement',
+            name='content_html',
+            field=models.TextField(blank=True, editable=False, help_text='Rendered from content on save'),
+        ),
+        migrations.AddField(
+            model_name='announcement',
+            name='excerpt_html',
+            field=models.TextField(blank=True, editable=False, help_text='Start of content_html shown on the home page'),
+        ),
+        migrations.AddField(
+            model_name='contentblock',
+            name='content_html',
+            field=models.TextField(blank=True, editable=False, help_text='Rendered from content on save'),
+        ),
+        migrations.AlterField(
+            model_name='announcement',
+            name='content',
+            field=models.TextField(help_text='Markdown: **bold**, *italic*, [link](https://…), - lists, ## headings'),
+        ),
+        migrations.AlterField(
+            model_name='contentblock',
+            name='content',
+            field=models.TextField(help_text='Markdown: **bold**, *italic*, [link](https://…), - lists, ## headings'),
+        ),
+    ]
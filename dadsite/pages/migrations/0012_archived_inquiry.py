@@ -0,0 +1,40 @@
+# Generated by Django 5.0.6 on 2026-10-19 00:47
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0011_rendered_content'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedInquiry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_id', models.IntegerField(help_text='ClientInquiry id; inquiry events still refer to it', unique=True)),
+                ('name', models.CharField(max_length=200)),
+                ('email', models.EmailField(max_length=254)),
+                ('phone', models.CharField(blank=True, max_length=20)),
+                ('group', models.CharField(choices=[('lead', 'Lead'), ('client', 'Client')], max_length=10)),
+                ('lead_status', models.CharField(choices=[('pending', 'Pending Review'), ('approved', 'Approved'), ('denied', 'Denied/Spam')], max_length=20)),
+                ('client_status', models.CharField(blank=True, choices=[('contacted', 'Contacted - Agreed but Not Paid'), ('active', 'Active - Currently Paying'), ('inactive', 'Inactive - Previously Paid')], max_length=20, null=True)),
+                ('submitted_at', models.DateTimeField()),
+                ('reviewed_at', models.DateTimeField(blank=True, null=True)),
+                ('approved_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(help_text='Last change before archiving')),
+                ('reason', models.CharField(choices=[('denied', 'Denied lead'), ('inactive', 'Inactive client')], max_length=20)),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('data', models.BinaryField(help_text='Complete original row as zlib-compressed JSON')),
+            ],
+            options={
+                'verbose_name': 'Archived Inquiry',
+                'verbose_name_plural': 'Archived Inquiries',
+                'ordering': ['-submitted_at'],
+                'indexes': [models.Index(fields=['submitted_at'], name='pages_archived_submitted_idx')],
+            },
+        ),
+    ]
@@ -1,7 +1,31 @@
+import hashlib
+import json
+import secrets
+import zlib
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils import timezone
 from django.core.cache import cache
 
+from .markup import make_excerpt, render_markdown
+
+def clear_home_page_cache():
+    # pages.announcements imports these models
+    from .announcements import clear_home_page_cache
+    clear_home_page_cache()
+
+
+MARKDOWN_HELP = "Markdown: **bold**, *italic*, [link](https://…), - lists, ## headings"
+
+
+def with_rendered_fields(update_fields, rendered):
+    """save(update_fields=...) that touches content also writes its rendered columns"""
+    if update_fields is None or 'content' not in update_fields:
+        return update_fields
+    return list(update_fields) + rendered
+
 
 class ContentBlock(models.Model):
     """Editable content blocks for pages"""
@@ -15,7 +39,8 @@ class ContentBlock(models.Model):
     page = models.CharField(max_length=50, choices=PAGE_CHOICES)
     identifier = models.SlugField(max_length=100, help_text="Unique identifier for this content block")
     title = models.CharField(max_length=200, blank=True)
-    content = models.TextField()
+    content = models.TextField(help_text=MARKDOWN_HELP)
+    content_html = models.TextField(blank=True, editable=False, help_text="Rendered from content on save")
     image = models.ImageField(upload_to='content/', blank=True, null=True)
     order = models.IntegerField(default=0, help_text="Display order on the page")
     is_active = models.BooleanField(default=True)
@@ -31,13 +56,35 @@ class ContentBlock(models.Model):
     def __str__(self):
         return f"{self.get_page_display()} - {self.identifier}"
 
+    def render_content(self):
+        self.content_html = render_markdown(self.content)
+
+    def save(self, *args, **kwargs):
+        self.render_content()
+        kwargs['update_fields'] = with_rendered_fields(kwargs.get('update_fields'), ['content_html'])
+        super().save(*args, **kwargs)
+        clear_home_page_cache()
+
+    def delete(self, *args, **kwargs):
+        super().delete(*args, **kwargs)
+        clear_home_page_cache()
+
 
 class Announcement(models.Model):
     """News/updates/announcements section"""
 
     title = models.CharField(max_length=200)
-    content = models.TextField()
-    published_date = models.DateTimeField(default=timezone.now)
+    content = models.TextField(help_text=MARKDOWN_HELP)
+    content_html = models.TextField(blank=True, editable=False, help_text="Rendered from content on save")
+    excerpt_html = models.TextField(blank=True, editable=False, help_text="Start of content_html shown on the home page")
+    published_date = models.DateTimeField(
+        default=timezone.now,
+        help_text="Shown on the website from this time; set a future date to schedule it",
+    )
+    expires_at = models.DateTimeField(
+        null=True, blank=True,
+        help_text="Hidden from the website after this time; leave empty to keep showing it",
+    )
     is_active = models.BooleanField(default=True, help_text="Show on website")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -46,10 +93,50 @@ class Announcement(models.Model):
         ordering = ['-published_date']
         verbose_name = 'Announcement'
         verbose_name_plural = 'Announcements'
+        indexes = [
+            # Home page: live announcements newest first, and the next scheduled one.
+            # Partial on is_active because Django writes is_active=True as a bare
+            # `WHERE "is_active"`, which SQLite can't range-scan an (is_active,
+            # published_date) index with; this one it walks in published_date order.
+            models.Index(
+                fields=['published_date'], condition=models.Q(is_active=True), name='pages_announcement_live_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
+    def clean(self):
+        if self.expires_at and self.published_date and self.expires_at <= self.published_date:
+            raise ValidationError({'expires_at': "Must be later than the published date."})
+
+    @property
+    def status(self):
+        """'Scheduled', 'Live', 'Expired' or 'Hidden'"""
+        now = timezone.now()
+        if not self.is_active:
+            return 'Hidden'
+        if self.published_date > now:
+            return 'Scheduled'
+        if self.expires_at and self.expires_at <= now:
+            return 'Expired'
+        return 'Live'
+
+    def render_content(self):
+        self.content_html = render_markdown(self.content)
+        self.excerpt_html = make_excerpt(self.content_html)
+
+    def save(self, *args, **kwargs):
+        self.render_content()
+        kwargs['update_fields'] = with_rendered_fields(kwargs.get('update_fields'), ['content_html', 'excerpt_html'])
+        super().save(*args, **kwargs)
+        # The home page caches its announcements until the next publish/expiry
+        clear_home_page_cache()
+
+    def delete(self, *args, **kwargs):
+        super().delete(*args, **kwargs)
+        clear_home_page_cache()
+
 
 class ClientInquiry(models.Model):
     """Client onboarding inquiries and information"""
@@ -132,6 +219,12 @@ class ClientInquiry(models.Model):
 
     class Meta:
         ordering = ['-submitted_at']
+        indexes = [
+            # Default ordering, admin date_hierarchy and date range filters
+            models.Index(fields=['submitted_at'], name='pages_inquiry_submitted_idx'),
+            # Incremental sync through the JSON API (?since= and cursors walk updated_at, id)
+            models.Index(fields=['updated_at', 'id'], name='pages_inquiry_updated_idx'),
+        ]
         verbose_name = 'Client Inquiry'
         verbose_name_plural = 'Client Inquiries'
 
@@ -139,11 +232,150 @@ class ClientInquiry(models.Model):
         goals = self.fitness_goals.split(',')[0] if self.fitness_goals else 'No goals specified'
         return f"{self.name} - {goals}"
 
+    @staticmethod
+    def format_state(group, lead_status, client_status):
+        """Combined group/status label as stored in InquiryEvent (e.g. 'lead:pending', 'client:active')"""
+        status = lead_status if group == 'lead' else client_status
+        return f"{group}:{status or ''}"
+
+    @property
+    def state(self):
+        return self.format_state(self.group, self.lead_status, self.client_status)
+
     def get_fitness_goals_list(self):
         """Return fitness goals as a list"""
         return [goal.strip() for goal in self.fitness_goals.split(',') if goal.strip()]
 
 
+class ArchivedInquiry(models.Model):
+    """
+    A ClientInquiry moved out of the live table by archive_inquiries. The
+    columns needed to find it and to rebuild the dashboard history stay
+    searchable; the complete original row is kept zlib-compressed in `data`.
+    """
+
+    REASON_CHOICES = [
+        ('denied', 'Denied lead'),
+        ('inactive', 'Inactive client'),
+    ]
+
+    original_id = models.IntegerField(unique=True, help_text="ClientInquiry id; inquiry events still refer to it")
+    name = models.CharField(max_length=200)
+    email = models.EmailField()
+    phone = models.CharField(max_length=20, blank=True)
+    group = models.CharField(max_length=10, choices=ClientInquiry.GROUP_CHOICES)
+    lead_status = models.CharField(max_length=20, choices=ClientInquiry.LEAD_STATUS_CHOICES)
+    client_status = models.CharField(max_length=20, choices=ClientInquiry.CLIENT_STATUS_CHOICES, blank=True, null=True)
+    submitted_at = models.DateTimeField()
+    reviewed_at = models.DateTimeField(null=True, blank=True)
+    approved_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(help_text="Last change before archiving")
+    reason = models.CharField(max_length=20, choices=REASON_CHOICES)
+    archived_at = models.DateTimeField(default=timezone.now)
+    data = models.BinaryField(help_text="Complete original row as zlib-compressed JSON")
+
+    class Meta:
+        ordering = ['-submitted_at']
+        indexes = [
+            models.Index(fields=['submitted_at'], name='pages_archived_submitted_idx'),
+        ]
+        verbose_name = 'Archived Inquiry'
+        verbose_name_plural = 'Archived Inquiries'
+
+    def __str__(self):
+        return f"{self.name} <{self.email}> (archived {self.archived_at:%Y-%m-%d})"
+
+    @property
+    def record(self):
+        """The original ClientInquiry row as a dict"""
+        return json.loads(zlib.decompress(self.data))
+
+
+class InquiryEvent(models.Model):
+    """
+    Append-only log of inquiry state transitions, written in the same
+    transaction as the change it records. The auto-incrementing id is the
+    watermark incremental consumers tail from (see pages.events).
+    """
+
+    EVENT_CHOICES = [
+        ('submitted', 'Inquiry Submitted'),
+        ('approved', 'Lead Approved'),
+        ('denied', 'Lead Denied'),
+        ('status_changed', 'Client Status Changed'),
+        ('edited', 'Status Edited in Admin'),
+    ]
+
+    # No database constraint: events outlive deleted or archived inquiries
+    inquiry = models.ForeignKey(
+        ClientInquiry, on_delete=models.DO_NOTHING, db_constraint=False, related_name='events'
+    )
+    event_type = models.CharField(max_length=20, choices=EVENT_CHOICES)
+    from_state = models.CharField(max_length=30, blank=True, help_text="State before the change (blank for new inquiries)")
+    to_state = models.CharField(max_length=30, help_text="State after the change")
+    actor = models.CharField(max_length=100, blank=True, help_text="Staff username (blank for website submissions)")
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['inquiry', 'id']),
+            models.Index(fields=['event_type', 'created_at']),
+        ]
+        verbose_name = 'Inquiry Event'
+        verbose_name_plural = 'Inquiry Events'
+
+    def __str__(self):
+        return f"#{self.inquiry_id} {self.get_event_type_display()}: {self.from_state or '-'} → {self.to_state}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Inquiry events are append-only and can't be changed")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError("Inquiry events are append-only and can't be deleted")
+
+
+class EventWatermark(models.Model):
+    """Last InquiryEvent id processed by a named consumer"""
+
+    name = models.CharField(max_length=50, unique=True, help_text="Consumer name (e.g. 'daily_stats')")
+    last_event_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['name']
+        verbose_name = 'Event Watermark'
+        verbose_name_plural = 'Event Watermarks'
+
+    def __str__(self):
+        return f"{self.name} @ {self.last_event_id}"
+
+
+class DailyInquiryStats(models.Model):
+    """
+    Per-day inquiry and conversion counts for the dashboard charts, kept up to
+    date from the event log (see pages.stats) so charts never scan ClientInquiry
+    """
+
+    date = models.DateField(unique=True)
+    submitted = models.PositiveIntegerField(default=0, help_text="New inquiries")
+    approved = models.PositiveIntegerField(default=0, help_text="Leads converted to clients")
+    denied = models.PositiveIntegerField(default=0, help_text="Leads denied/marked as spam")
+    activated = models.PositiveIntegerField(default=0, help_text="Clients who became active (paying)")
+    deactivated = models.PositiveIntegerField(default=0, help_text="Active clients who stopped paying")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-date']
+        verbose_name = 'Daily Inquiry Stats'
+        verbose_name_plural = 'Daily Inquiry Stats'
+
+    def __str__(self):
+        return f"{self.date}: {self.submitted} submitted, {self.approved} approved, {self.activated} activated"
+
+
 class EmailRecipient(models.Model):
     """Email recipient for alert notifications"""
 
@@ -172,6 +404,7 @@ class AlertType(models.Model):
         ('client_status_changed', 'Client Status Changed'),
         ('client_activated', 'Client Activated (Started Paying)'),
         ('client_deactivated', 'Client Deactivated (Stopped Paying)'),
+        ('stale_lead', 'Lead Not Reviewed in Time (Escalation)'),
     ]
 
     alert_type = models.CharField(max_length=50, choices=ALERT_TYPE_CHOICES, unique=True)
@@ -193,21 +426,34 @@ class AlertType(models.Model):
 
     def get_active_recipients(self):
         """Get list of active email addresses for this alert"""
-        return [
-            sub.recipient.email
-            for sub in self.alertsubscription_set.filter(
-                is_subscribed=True,
-                recipient__is_active=True
-            )
-        ]
+        return [sub.recipient.email for sub in self.get_active_subscriptions()]
+
+    def get_active_subscriptions(self):
+        """Get active subscriptions (with their recipients) for this alert"""
+        return self.alertsubscription_set.filter(
+            is_subscribed=True,
+            recipient__is_active=True
+        ).select_related('recipient')
 
 
 class AlertSubscription(models.Model):
     """Many-to-many relationship between AlertType and EmailRecipient"""
 
+    DELIVERY_CHOICES = [
+        ('immediate', 'Immediately (one email per alert)'),
+        ('hourly', 'Hourly Digest'),
+        ('daily', 'Daily Digest'),
+    ]
+
     alert_type = models.ForeignKey(AlertType, on_delete=models.CASCADE)
     recipient = models.ForeignKey(EmailRecipient, on_delete=models.CASCADE)
     is_subscribed = models.BooleanField(default=True, help_text="Receive this specific alert?")
+    delivery_mode = models.CharField(
+        max_length=20,
+        choices=DELIVERY_CHOICES,
+        default='immediate',
+        help_text="Send each alert right away, or combine them into one digest email per hour/day"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -220,6 +466,65 @@ class AlertSubscription(models.Model):
         return f"{status} {self.recipient.name} → {self.alert_type.name}"
 
 
+class PendingAlert(models.Model):
+    """Alert buffered for a digest email, sent and removed by send_alert_digests"""
+
+    recipient = models.ForeignKey(EmailRecipient, on_delete=models.CASCADE, related_name='pending_alerts')
+    alert_type = models.ForeignKey(AlertType, on_delete=models.CASCADE)
+    delivery_mode = models.CharField(max_length=20, choices=AlertSubscription.DELIVERY_CHOICES)
+    subject = models.CharField(max_length=255)
+    message = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['delivery_mode', 'recipient', 'created_at']),
+        ]
+        verbose_name = 'Pending Alert'
+        verbose_name_plural = 'Pending Alerts'
+
+    def __str__(self):
+        return f"{self.recipient.email} ({self.get_delivery_mode_display()}): {self.subject}"
+
+
+class APIToken(models.Model):
+    """Bearer token for the read-only JSON API; only a SHA-256 hash of the key is stored"""
+
+    name = models.CharField(max_length=100, help_text="What uses this token (e.g. 'CRM sync')")
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='api_tokens',
+        limit_choices_to={'is_staff': True},
+        help_text="Staff account the token acts for; the token stops working if it loses staff status",
+    )
+    key_hash = models.CharField(max_length=64, unique=True, editable=False)
+    prefix = models.CharField(max_length=8, editable=False, help_text="First characters of the key, to tell tokens apart")
+    is_active = models.BooleanField(default=True, help_text="Uncheck to revoke")
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['name']
+        verbose_name = 'API Token'
+        verbose_name_plural = 'API Tokens'
+
+    def __str__(self):
+        return f"{self.name} ({self.prefix}…)"
+
+    @staticmethod
+    def hash_key(key):
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def generate_key(self):
+        """Give the token a new random key and return it; the key itself is never stored"""
+        key = secrets.token_urlsafe(32)
+        self.key_hash = self.hash_key(key)
+        self.prefix = key[:8]
+        return key
+
+
 class URLPermission(models.Model):
     """Control visibility and access to URLs based on user authentication status"""
 
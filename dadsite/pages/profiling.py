@@ -0,0 +1,142 @@
+"""
+On-demand profiling of single requests, for staff
+
+A staff member asks /manage/profiles/?path=/manage/clients/active/ for a
+signed link; opening it (or sending the token as an X-Profile-Token header)
+runs that one request under cProfile while a sampling thread records its
+call stacks. Two files land in PROFILE_DIR:
+
+- <name>.prof: cProfile stats, for `python -m pstats`, snakeviz, etc.
+- <name>.collapsed: sampled stacks in the folded format read by
+  flamegraph.pl, speedscope and inferno
+
+The response carries an X-Profile header with the download link. Only the
+newest PROFILE_MAX_COUNT profiles are kept. Tokens are signed with
+SECRET_KEY, expire after PROFILE_TOKEN_MAX_AGE seconds and are bound to the
+staff user they were issued to; the profile is discarded if the request
+turns out to belong to anyone else.
+"""
+import cProfile
+import logging
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.core import signing
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PARAM = '_profile'
+TOKEN_HEADER = 'HTTP_X_PROFILE_TOKEN'
+TOKEN_SALT = 'pages.profiling'
+
+PROFILE_NAME_RE = re.compile(r'^[\w-]+\.(prof|collapsed)$')
+
+# Frames from these directories are shortened to their path inside them
+SOURCE_ROOTS = sorted({str(Path(path)) for path in sys.path if path} | {str(settings.BASE_DIR)}, key=len, reverse=True)
+
+
+def make_token(user):
+    return signing.dumps(user.pk, salt=TOKEN_SALT, compress=True)
+
+
+def read_token(token):
+    """The user id a token was issued to, or None if it is forged or expired"""
+    try:
+        return signing.loads(token, salt=TOKEN_SALT, max_age=settings.PROFILE_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return None
+
+
+def frame_label(code):
+    filename = code.co_filename
+    for root in SOURCE_ROOTS:
+        if filename.startswith(root + '/'):
+            filename = filename[len(root) + 1:]
+            break
+    return f'{filename}:{code.co_name}'
+
+
+class StackSampler(threading.Thread):
+    """Samples the call stack of one thread every PROFILE_SAMPLE_INTERVAL seconds"""
+
+    def __init__(self, thread_id):
+        super().__init__(name='profile-sampler', daemon=True)
+        self.thread_id = thread_id
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+
+    def run(self):
+        interval = settings.PROFILE_SAMPLE_INTERVAL
+        while not self.stopped.wait(interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame_label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+class RequestProfile:
+    """cProfile plus stack sampling around one request"""
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+        self.sampler = StackSampler(threading.get_ident())
+        self.started = None
+        self.duration = None
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        self.sampler.start()
+        self.profiler.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.disable()
+        self.sampler.stop()
+        self.duration = time.perf_counter() - self.started
+
+    def save(self, request):
+        """Write the .prof and .collapsed files and rotate old ones; returns the file name stem"""
+        directory = Path(settings.PROFILE_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        slug = re.sub(r'[^\w]+', '-', request.path).strip('-')[:60] or 'root'
+        stem = f"{timezone.now():%Y%m%d-%H%M%S}-{slug}-{getattr(request, 'request_id', '')[:12]}".rstrip('-')
+
+        self.profiler.dump_stats(directory / f'{stem}.prof')
+        with open(directory / f'{stem}.collapsed', 'w') as f:
+            for stack, count in self.sampler.stacks.most_common():
+                f.write(f'{stack} {count}\n')
+
+        rotate(directory)
+        logger.info(
+            "Profiled %s %s in %.1fms (%d samples): %s",
+            request.method, request.path, self.duration * 1000, sum(self.sampler.stacks.values()), stem,
+        )
+        return stem
+
+
+def stored_profiles(directory=None):
+    """Stored .prof files, newest first"""
+    directory = Path(directory or settings.PROFILE_DIR)
+    if not directory.is_dir():
+        return []
+    return sorted(directory.glob('*.prof'), key=lambda path: path.name, reverse=True)
+
+
+def rotate(directory):
+    """Delete all but the newest PROFILE_MAX_COUNT profiles"""
+    for path in stored_profiles(directory)[settings.PROFILE_MAX_COUNT:]:
+        path.unlink(missing_ok=True)
+        path.with_suffix('.collapsed').unlink(missing_ok=True)
@@ -0,0 +1,25 @@
+"""
+Session-free message storage for anonymous visitors
+
+Django's default FallbackStorage keeps messages in a cookie and overflows into
+the session, so public pages touch django_session. With SESSION_MODE=split,
+anonymous visitors only ever get the signed messages cookie and staff keep the
+cookie + session fallback.
+"""
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.contrib.messages.storage.fallback import FallbackStorage
+
+
+class AnonymousCookieMessageStorage(FallbackStorage):
+    """
+    Signed-cookie only storage for anonymous requests, cookie then session
+    for authenticated users. Messages that don't fit in the cookie are
+    dropped (oldest first) for anonymous visitors instead of creating a
+    session row.
+    """
+
+    def __init__(self, request, *args, **kwargs):
+        user = getattr(request, 'user', None)
+        if user is None or not user.is_authenticated:
+            self.storage_classes = (CookieStorage,)
+        super().__init__(request, *args, **kwargs)
@@ -0,0 +1,293 @@
+"""
+Online snapshots of the SQLite database
+
+take_snapshot() copies the live database with SQLite's backup API a few
+pages at a time. Each step holds a shared lock only while it copies its
+pages, and the copy sleeps between steps. A writer's commit, which needs the
+lock to itself under the rollback journal, therefore waits at most one step.
+The longest step is reported as the lock time added to writers. A commit
+from another process between steps makes SQLite restart the copy. After
+MAX_RESTARTS restarts, the rest is copied in one step.
+
+The copy is integrity-checked, gzipped and described by a JSON manifest.
+The manifest holds SHA-256 checksums of the .gz file and of the database
+inside it. Only the newest SNAPSHOT_KEEP snapshots are kept.
+
+restore_snapshot() verifies both checksums and the integrity check, saves a
+snapshot of the current database, and then copies the verified file into the
+live database with the backup API. Processes with the database open see the
+restored contents on their next query, so nothing has to be stopped first.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+SUFFIX = '.sqlite3.gz'
+MAX_RESTARTS = 3
+CHUNK_BYTES = 1024 * 1024
+
+
+class SnapshotError(Exception):
+    """A snapshot could not be taken, verified or restored"""
+
+
+class Restarted(Exception):
+    """Raised from the backup progress callback to abandon a restarted copy"""
+
+
+def database_path():
+    if connection.vendor != 'sqlite':
+        raise SnapshotError(f'Snapshots need SQLite, not {connection.vendor}')
+    return Path(settings.DATABASES['default']['NAME'])
+
+
+def snapshot_dir():
+    directory = Path(settings.SNAPSHOT_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory
+
+
+def manifest_path(path):
+    return path.with_name(path.name[:-len(SUFFIX)] + '.json')
+
+
+def stored_snapshots(directory=None):
+    """Stored snapshot files, newest first"""
+    directory = Path(directory or settings.SNAPSHOT_DIR)
+    if not directory.is_dir():
+        return []
+    return sorted(directory.glob(f'*{SUFFIX}'), key=lambda path: path.name, reverse=True)
+
+
+def find_snapshot(name):
+    """A snapshot by path, file name, name without suffix, or 'latest'"""
+    if name == 'latest':
+        snapshots = stored_snapshots()
+        if not snapshots:
+            raise SnapshotError(f'No snapshots in {settings.SNAPSHOT_DIR}')
+        return snapshots[0]
+    for candidate in (Path(name), Path(settings.SNAPSHOT_DIR) / name, Path(settings.SNAPSHOT_DIR) / f'{name}{SUFFIX}'):
+        if candidate.is_file() and candidate.name.endswith(SUFFIX):
+            return candidate
+    raise SnapshotError(f'No snapshot named {name}')
+
+
+def read_manifest(path):
+    try:
+        with open(manifest_path(path)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        raise SnapshotError(f'{path.name} has no manifest ({manifest_path(path).name})')
+    except ValueError as e:
+        raise SnapshotError(f'Unreadable manifest for {path.name}: {e}')
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def integrity_check(path):
+    """PRAGMA integrity_check on a database file; returns 'ok' or SQLite's first complaint"""
+    with closing(sqlite3.connect(f'file:{path}?mode=ro', uri=True)) as db:
+        return db.execute('PRAGMA integrity_check').fetchone()[0]
+
+
+def copy_online(source, target, pages, sleep):
+    """
+    Back up `source` into the connection `target` in steps of `pages`,
+    sleeping `sleep` seconds between steps.
+
+    Returns:
+        dict: 'steps', 'restarts', 'max_step_ms' and 'total_step_ms' (time the
+        source was share-locked), 'pages' (copied in the final pass)
+    """
+    stats = {'steps': 0, 'restarts': 0, 'max_step_ms': 0.0, 'total_step_ms': 0.0, 'pages': 0}
+    step_pages = pages
+    while True:
+        remaining_before = None
+        step_started = time.perf_counter()
+
+        def progress(status, remaining, total):
+            nonlocal remaining_before, step_started
+            step_ms = (time.perf_counter() - step_started) * 1000
+            stats['steps'] += 1
+            stats['max_step_ms'] = max(stats['max_step_ms'], step_ms)
+            stats['total_step_ms'] += step_ms
+            stats['pages'] = total
+            if remaining_before is not None and remaining >= remaining_before:
+                # Another connection wrote to the source, so SQLite started over
+                raise Restarted
+            remaining_before = remaining
+            if remaining and sleep:
+                time.sleep(sleep)
+            step_started = time.perf_counter()
+
+        with closing(sqlite3.connect(f'file:{source}?mode=ro', uri=True, timeout=30)) as db:
+            try:
+                db.backup(target, pages=step_pages, progress=progress)
+                return stats
+            except Restarted:
+                stats['restarts'] += 1
+                if stats['restarts'] >= MAX_RESTARTS:
+                    # Too busy to copy in steps: take the rest in one (longer) step
+                    step_pages = -1
+                logger.info("Snapshot restarted after a concurrent write (%d)", stats['restarts'])
+
+
+def take_snapshot(pages=None, sleep=None, keep=None, label=''):
+    """
+    Copy the live database into a new compressed, checksummed snapshot and
+    delete the oldest beyond `keep`.
+
+    Returns:
+        dict: the manifest, plus 'path'
+    """
+    source = database_path()
+    pages = pages or settings.SNAPSHOT_PAGES_PER_STEP
+    sleep = settings.SNAPSHOT_STEP_SLEEP if sleep is None else sleep
+    directory = snapshot_dir()
+
+    created_at = timezone.now()
+    stem = f"db-{created_at:%Y%m%d-%H%M%S}{f'-{label}' if label else ''}"
+    path = directory / f'{stem}{SUFFIX}'
+    raw_path = directory / f'.{stem}.sqlite3.tmp'
+    partial_path = directory / f'.{stem}{SUFFIX}.tmp'
+
+    try:
+        started = time.perf_counter()
+        with closing(sqlite3.connect(raw_path)) as target:
+            copy = copy_online(source, target, pages, sleep)
+        copy_seconds = time.perf_counter() - started
+
+        integrity = integrity_check(raw_path)
+        if integrity != 'ok':
+            raise SnapshotError(f'Integrity check failed on the copy: {integrity}')
+        db_sha256 = file_sha256(raw_path)
+
+        with open(raw_path, 'rb') as raw, gzip.open(partial_path, 'wb', compresslevel=6) as compressed:
+            shutil.copyfileobj(raw, compressed, CHUNK_BYTES)
+
+        manifest = {
+            'created_at': created_at.isoformat(),
+            'source': str(source),
+            'size': raw_path.stat().st_size,
+            'compressed_size': partial_path.stat().st_size,
+            'sha256': file_sha256(partial_path),
+            'db_sha256': db_sha256,
+            'integrity': integrity,
+            'page_count': copy['pages'],
+            'pages_per_step': pages,
+            'step_sleep': sleep,
+            'steps': copy['steps'],
+            'restarts': copy['restarts'],
+            'max_step_ms': round(copy['max_step_ms'], 2),
+            'total_step_ms': round(copy['total_step_ms'], 2),
+            'copy_seconds': round(copy_seconds, 2),
+        }
+        with open(manifest_path(path), 'w') as f:
+            json.dump(manifest, f, indent=2)
+            f.write('\n')
+        os.replace(partial_path, path)
+    finally:
+        raw_path.unlink(missing_ok=True)
+        partial_path.unlink(missing_ok=True)
+
+    rotate(directory, settings.SNAPSHOT_KEEP if keep is None else keep)
+    logger.info(
+        "Snapshot %s: %d pages in %d steps, longest lock %.1fms, %d restarts",
+        path.name, copy['pages'], copy['steps'], copy['max_step_ms'], copy['restarts'],
+    )
+    return {**manifest, 'path': path}
+
+
+def rotate(directory, keep):
+    """Delete all but the newest `keep` snapshots"""
+    for path in stored_snapshots(directory)[keep:]:
+        path.unlink(missing_ok=True)
+        manifest_path(path).unlink(missing_ok=True)
+
+
+def unpack_verified(path, destination):
+    """
+    Check the snapshot's checksums and decompress it to `destination`,
+    then integrity-check the result.
+
+    Returns:
+        dict: the manifest
+    """
+    manifest = read_manifest(path)
+    if file_sha256(path) != manifest['sha256']:
+        raise SnapshotError(f'{path.name} does not match its checksum (file damaged or altered)')
+
+    digest = hashlib.sha256()
+    try:
+        with gzip.open(path, 'rb') as compressed, open(destination, 'wb') as raw:
+            while chunk := compressed.read(CHUNK_BYTES):
+                digest.update(chunk)
+                raw.write(chunk)
+    except (OSError, EOFError) as e:
+        raise SnapshotError(f'Could not decompress {path.name}: {e}')
+    if digest.hexdigest() != manifest['db_sha256']:
+        raise SnapshotError(f'The database inside {path.name} does not match its checksum')
+
+    integrity = integrity_check(destination)
+    if integrity != 'ok':
+        raise SnapshotError(f'Integrity check failed on {path.name}: {integrity}')
+    return manifest
+
+
+def verify_snapshot(path):
+    """Run every restore check without touching the live database; returns the manifest"""
+    scratch = snapshot_dir() / f'.verify-{path.name}.tmp'
+    try:
+        return unpack_verified(path, scratch)
+    finally:
+        scratch.unlink(missing_ok=True)
+
+
+def restore_snapshot(path, backup_first=True):
+    """
+    Replace the live database's contents with a verified snapshot.
+
+    Returns:
+        dict: 'manifest', 'backup' (the snapshot of the replaced database or
+        None), 'seconds' the live database was locked for the copy
+    """
+    live = database_path()
+    scratch = live.with_name(f'.restore-{path.name}.tmp')
+    try:
+        manifest = unpack_verified(path, scratch)
+        # Not rotated here, so the snapshot being restored is never the one deleted
+        backup = take_snapshot(label='pre-restore', keep=len(stored_snapshots()) + 1) if backup_first else None
+
+        # Django's connection would otherwise keep reading the old schema cache
+        connection.close()
+        started = time.perf_counter()
+        with closing(sqlite3.connect(scratch)) as restored, closing(sqlite3.connect(live, timeout=30)) as target:
+            restored.backup(target)
+        seconds = time.perf_counter() - started
+    finally:
+        scratch.unlink(missing_ok=True)
+
+    integrity = integrity_check(live)
+    if integrity != 'ok':
+        raise SnapshotError(f'Integrity check failed on the restored database: {integrity}')
+    logger.warning("Restored database from %s (created %s)", path.name, manifest['created_at'])
+    return {'manifest': manifest, 'backup': backup, 'seconds': seconds}
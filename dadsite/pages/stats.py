@@ -0,0 +1,249 @@
+"""
+Daily inquiry rollups for the management dashboard
+
+DailyInquiryStats holds one row per day with counts of submissions, approvals,
+denials, activations and deactivations. Rows are updated incrementally from the
+inquiry event log (after every transition, and by the update_stats command),
+so the dashboard reads at most a few hundred small rows for a year of history
+no matter how many inquiries exist.
+"""
+import logging
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Max
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from .events import consume_events
+from .models import ArchivedInquiry, ClientInquiry, DailyInquiryStats, EventWatermark, InquiryEvent
+
+logger = logging.getLogger(__name__)
+
+STATS_CONSUMER = 'daily_stats'
+COUNTERS = ['submitted', 'approved', 'denied', 'activated', 'deactivated']
+ACTIVE_STATE = 'client:active'
+DENIED_STATE = 'lead:denied'
+
+# Current lead/client totals shown on the management pages
+INQUIRY_COUNTERS = [
+    'total_pending_leads', 'total_approved_leads', 'total_denied_leads',
+    'total_clients', 'total_active', 'total_contacted', 'total_inactive',
+]
+
+
+def event_counters(event):
+    """Which daily counters an event increments (based on the state change, so admin edits count too)"""
+    if event.event_type == 'submitted':
+        yield 'submitted'
+    if event.from_state.startswith('lead:') and event.to_state.startswith('client:'):
+        yield 'approved'
+    if event.to_state == DENIED_STATE and event.from_state != DENIED_STATE:
+        yield 'denied'
+    if event.to_state == ACTIVE_STATE and event.from_state != ACTIVE_STATE:
+        yield 'activated'
+    if event.from_state == ACTIVE_STATE and event.to_state != ACTIVE_STATE:
+        yield 'deactivated'
+
+
+def apply_events(events):
+    """Add a batch of events to the daily rows (one UPDATE per affected day)"""
+    totals = defaultdict(Counter)
+    for event in events:
+        day = timezone.localdate(event.created_at)
+        for counter in event_counters(event):
+            totals[day][counter] += 1
+
+    existing = set(DailyInquiryStats.objects.filter(date__in=totals).values_list('date', flat=True))
+    new_rows = []
+    for day, counts in totals.items():
+        if not counts:
+            continue
+        if day in existing:
+            DailyInquiryStats.objects.filter(date=day).update(
+                updated_at=timezone.now(),
+                **{counter: F(counter) + count for counter, count in counts.items()},
+            )
+        else:
+            new_rows.append(DailyInquiryStats(date=day, **counts))
+    DailyInquiryStats.objects.bulk_create(new_rows)
+
+
+def update_daily_stats(build=True):
+    """
+    Apply events recorded since the last run. Builds the table from scratch
+    the first time (history from before the event log existed included),
+    unless `build` is False.
+
+    Returns:
+        int: Number of events applied, or None if the table was never built
+        and `build` is False
+    """
+    if not EventWatermark.objects.filter(name=STATS_CONSUMER).exists():
+        if not build:
+            return None
+        rebuild_daily_stats()
+        return 0
+    return consume_events(STATS_CONSUMER, apply_events)
+
+
+def count_by_day(queryset, field):
+    return {row['day']: row['n'] for row in queryset.annotate(day=TruncDate(field)).values('day').annotate(n=Count('id'))}
+
+
+def inquiry_history_by_day(inquiries, id_field, activations, deactivations):
+    """
+    Per-day counts taken from inquiry rows rather than events, for one table
+    of inquiries (live or archived; `id_field` is what events refer to).
+    """
+    clients = inquiries.filter(client_status__in=['active', 'inactive'])
+    return {
+        'submitted': count_by_day(inquiries, 'submitted_at'),
+        'approved': count_by_day(inquiries.filter(approved_at__isnull=False), 'approved_at'),
+        'denied': count_by_day(inquiries.filter(lead_status='denied', reviewed_at__isnull=False), 'reviewed_at'),
+        'activated_before_log': count_by_day(
+            clients.exclude(**{f'{id_field}__in': activations.values('inquiry_id')}).annotate(
+                activated_at=Coalesce('approved_at', 'submitted_at'),
+            ),
+            'activated_at',
+        ),
+        'deactivated_before_log': count_by_day(
+            clients.filter(client_status='inactive').exclude(**{f'{id_field}__in': deactivations.values('inquiry_id')}),
+            'updated_at',
+        ),
+    }
+
+
+def rebuild_daily_stats():
+    """
+    Recompute every row from the inquiry tables and the event log.
+
+    Submissions, approvals and denials come from submitted_at, approved_at and
+    reviewed_at. Activations and deactivations come from events; clients that
+    predate the event log are counted as activated on their approval date and,
+    if now inactive, deactivated on their last update. Archived inquiries
+    count the same as live ones, so archiving never changes the history.
+
+    Returns:
+        int: Number of daily rows written
+    """
+    with transaction.atomic():
+        watermark, _ = EventWatermark.objects.get_or_create(name=STATS_CONSUMER)
+        # Take the write lock first so transitions wait instead of being missed
+        EventWatermark.objects.filter(pk=watermark.pk).update(updated_at=timezone.now())
+        last_event_id = InquiryEvent.objects.aggregate(last=Max('id'))['last'] or 0
+
+        activations = InquiryEvent.objects.filter(to_state=ACTIVE_STATE).exclude(from_state=ACTIVE_STATE)
+        deactivations = InquiryEvent.objects.filter(from_state=ACTIVE_STATE).exclude(to_state=ACTIVE_STATE)
+
+        sources = [
+            {
+                'activated': count_by_day(activations, 'created_at'),
+                'deactivated': count_by_day(deactivations, 'created_at'),
+            },
+            inquiry_history_by_day(ClientInquiry.objects.all(), 'id', activations, deactivations),
+            inquiry_history_by_day(ArchivedInquiry.objects.all(), 'original_id', activations, deactivations),
+        ]
+
+        rows = defaultdict(Counter)
+        for days in sources:
+            for key, counts in days.items():
+                counter = key.replace('_before_log', '')
+                for day, n in counts.items():
+                    rows[day][counter] += n
+
+        DailyInquiryStats.objects.all().delete()
+        DailyInquiryStats.objects.bulk_create(
+            [DailyInquiryStats(date=day, **counts) for day, counts in sorted(rows.items())],
+            batch_size=500,
+        )
+        EventWatermark.objects.filter(pk=watermark.pk).update(last_event_id=last_event_id)
+
+    logger.info("Rebuilt daily stats: %d days up to event %d", len(rows), last_event_id)
+    return len(rows)
+
+
+def refresh_daily_stats():
+    """
+    on_commit hook after each transition; failures are logged, never raised
+    to the request. The first full build scans every inquiry and event, so it
+    is left to `manage.py update_stats` (run when the container starts).
+    """
+    try:
+        if update_daily_stats(build=False) is None:
+            logger.warning("Daily stats not built yet, skipped; run python manage.py update_stats")
+    except Exception:
+        logger.exception("Failed to update daily stats")
+
+
+def get_dashboard_stats(days=365, daily_days=30):
+    """
+    Chart data for the management dashboard, read only from DailyInquiryStats.
+
+    Returns:
+        dict: 'funnel' (totals and conversion rates over `days`), 'weekly' and
+        'daily' series of {'start', 'count', 'pct'} dicts for bar charts
+    """
+    today = timezone.localdate()
+    start = today - timedelta(days=days - 1)
+    rows = {row.date: row for row in DailyInquiryStats.objects.filter(date__gte=start, date__lte=today)}
+
+    totals = {counter: sum(getattr(row, counter) for row in rows.values()) for counter in COUNTERS}
+    funnel = {
+        **totals,
+        'approval_rate': round(100 * totals['approved'] / totals['submitted'], 1) if totals['submitted'] else 0,
+        'activation_rate': round(100 * totals['activated'] / totals['approved'], 1) if totals['approved'] else 0,
+    }
+
+    # Weeks start on Monday; the first one may begin before `start`
+    weekly = []
+    week_start = start - timedelta(days=start.weekday())
+    while week_start <= today:
+        count = sum(
+            rows[day].submitted
+            for day in (week_start + timedelta(days=i) for i in range(7))
+            if day in rows
+        )
+        weekly.append({'start': week_start, 'count': count})
+        week_start += timedelta(days=7)
+
+    daily = []
+    for i in range(daily_days - 1, -1, -1):
+        day = today - timedelta(days=i)
+        daily.append({'start': day, 'count': rows[day].submitted if day in rows else 0})
+
+    for series in (weekly, daily):
+        peak = max((point['count'] for point in series), default=0) or 1
+        for point in series:
+            point['pct'] = round(100 * point['count'] / peak)
+
+    return {'funnel': funnel, 'weekly': weekly, 'daily': daily}
+
+
+def get_inquiry_counters():
+    """
+    Current lead and client totals for the management pages, from one grouped
+    query (one table scan) instead of a COUNT per figure.
+
+    Returns:
+        dict: INQUIRY_COUNTERS -> int
+    """
+    counters = dict.fromkeys(INQUIRY_COUNTERS, 0)
+    rows = (
+        ClientInquiry.objects
+        .values_list('group', 'lead_status', 'client_status')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    for group, lead_status, client_status, count in rows:
+        if group == 'lead':
+            key = f'total_{lead_status}_leads'
+        elif group == 'client':
+            counters['total_clients'] += count
+            key = f'total_{client_status}'
+        else:
+            continue
+        if key in counters:
+            counters[key] += count
+    return counters
@@ -0,0 +1,50 @@
+"""
+Template loaders that strip indentation and comments from HTML templates
+
+Minifying happens once, when the cached loader first reads a template, so it
+adds nothing to render time. Whitespace runs containing a line break become a
+single line break, which the browser renders exactly like the original
+indentation. <pre>, <textarea> and <script> contents are left untouched, and
+HTML comments are only removed when they contain no template syntax.
+"""
+import re
+
+from django.template.loaders import app_directories, filesystem
+
+# Whitespace-sensitive elements, copied through unchanged
+RAW_BLOCK_RE = re.compile(r'(<(pre|textarea|script)\b.*?</\2\s*>)', re.S | re.I)
+# Any whitespace run that spans a line break, including trailing spaces
+LINE_BREAK_RE = re.compile(r'[ \t]*\n\s*')
+# Plain comments; conditional comments (<!--[if ...]>) and ones holding template tags are kept
+COMMENT_RE = re.compile(r'<!--(?!\[)[^{]*?-->')
+
+
+def minify_html(source):
+    """Collapse indentation and drop comments outside whitespace-sensitive blocks"""
+    parts = RAW_BLOCK_RE.split(source)
+    # re.split yields [text, raw block, tag name, text, raw block, tag name, ..., text]
+    minified = []
+    for i in range(0, len(parts), 3):
+        text = COMMENT_RE.sub('', parts[i])
+        minified.append(LINE_BREAK_RE.sub('\n', text))
+        if i + 1 < len(parts):
+            minified.append(parts[i + 1])
+    return ''.join(minified)
+
+
+class MinifyingLoaderMixin:
+    """Minify the source of .html templates as it is read from disk"""
+
+    def get_contents(self, origin):
+        contents = super().get_contents(origin)
+        if origin.name.endswith('.html'):
+            return minify_html(contents)
+        return contents
+
+
+class MinifyingFilesystemLoader(MinifyingLoaderMixin, filesystem.Loader):
+    pass
+
+
+class MinifyingAppDirectoriesLoader(MinifyingLoaderMixin, app_directories.Loader):
+    pass
@@ -0,0 +1,49 @@
+"""
+{% font_faces %}: @font-face rules and preload hints for the self-hosted fonts
+"""
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
+from pages.fonts import FONT_FAMILY, LATIN_UNICODE_RANGE, load_font_manifest, used_weights
+
+register = template.Library()
+
+FONT_FACE = """@font-face {{
+    font-family: '{family}';
+    font-style: normal;
+    font-weight: {weight};
+    font-display: swap;
+    src: url('{url}') format('woff2');
+    unicode-range: {unicode_range};
+}}"""
+
+
+@register.simple_tag
+def font_faces():
+    """
+    Preload links for the key weights plus one @font-face per built weight,
+    all pointing at hashed static URLs. Falls back to Google Fonts (only the
+    weights in use) until `python manage.py build_fonts` has been run.
+    """
+    manifest = load_font_manifest()
+    if manifest is None:
+        weights = ';'.join(str(weight) for weight in used_weights())
+        return format_html(
+            '<link rel="preconnect" href="https://fonts.googleapis.com">\n'
+            '    <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>\n'
+            '    <link href="https://fonts.googleapis.com/css2?family={}:wght@{}&display=swap" rel="stylesheet">',
+            FONT_FAMILY, weights,
+        )
+
+    files = {int(weight): static(path) for weight, path in manifest['files'].items()}
+    preloads = format_html_join(
+        '\n    ',
+        '<link rel="preload" href="{}" as="font" type="font/woff2" crossorigin>',
+        ((files[weight],) for weight in manifest['preload'] if weight in files),
+    )
+    faces = '\n'.join(
+        FONT_FACE.format(family=manifest['family'], weight=weight, url=url, unicode_range=LATIN_UNICODE_RANGE)
+        for weight, url in sorted(files.items())
+    )
+    return format_html('{}\n    <style>\n{}\n    </style>', preloads, mark_safe(faces))
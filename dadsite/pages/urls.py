@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 urlpatterns = [
     # Public pages
@@ -9,6 +9,9 @@ urlpatterns = [
     path('contact/', views.contact, name='contact'),
     path('client-portal/', views.client_portal, name='client_portal'),
     path('health/', views.health_check, name='health_check'),
+    path('health/live/', views.health_live, name='health_live'),
+    path('health/ready/', views.health_ready, name='health_ready'),
+    path('health/status/', views.health_status, name='health_status'),
 
     # Management dashboard
     path('manage/', views.manage_dashboard, name='manage_dashboard'),
@@ -22,4 +25,20 @@ urlpatterns = [
     path('manage/inquiries/<int:inquiry_id>/deny/', views.deny_inquiry, name='deny_inquiry'),
     path('manage/clients/<int:inquiry_id>/update-status/', views.update_client_status, name='update_client_status'),
     path('manage/inquiries/<int:inquiry_id>/onboard/', views.onboard_client, name='onboard_client'),  # Legacy
+    path('manage/inquiries/<int:inquiry_id>/card/', views.pending_inquiry_card, name='pending_inquiry_card'),
+
+    # Live updates for the management pages (Server-Sent Events, served over ASGI)
+    path('manage/live/', views.live_updates, name='live_updates'),
+
+    # Incremental inquiry event feed (?after=<watermark>)
+    path('manage/events/', views.inquiry_events, name='inquiry_events'),
+
+    # Staff request profiles (?path= returns a signed link that profiles one request)
+    path('manage/profiles/', views.profiles, name='profiles'),
+    path('manage/profiles/<str:name>', views.profile_download, name='profile_download'),
+
+    # Read-only JSON API for sync scripts (Authorization: Bearer <API token>)
+    path('api/v1/inquiries/', api.inquiry_list, name='api_inquiry_list'),
+    path('api/v1/inquiries/<int:inquiry_id>/', api.inquiry_detail, name='api_inquiry_detail'),
+    path('api/v1/stats/', api.stats, name='api_stats'),
 ]
@@ -4,15 +4,26 @@ from django.contrib import messages
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.core.mail import send_mail
 from django.conf import settings
-from django.http import JsonResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseForbidden, JsonResponse, StreamingHttpResponse
 from django.views.decorators.http import require_http_methods, require_POST
+from django.db import transaction
 from django.utils import timezone
-from .models import ContentBlock, Announcement, ClientInquiry
+from .models import ContentBlock, ClientInquiry
 from .forms import ClientInquiryForm
 from .email_alerts import send_alert_email
+from . import live, profiling
+from .events import events_after, latest_event_id, record_event
+from .announcements import get_home_page_data
+from .stats import get_dashboard_stats, get_inquiry_counters
+from .health import cached_probe, check_database, detailed_status
 
 logger = logging.getLogger(__name__)
 
+# PT Distinction account identifiers for the client portal embed
+PTD_PORTAL_APK = '53EG5EWBXT1823115'
+PTD_PORTAL_SCRIPT_ID = 'de9dd06362de656c46b67fdf38dd3a24'
+
 
 def is_staff_user(user):
     """Check if user is staff/admin"""
@@ -21,14 +32,7 @@ def is_staff_user(user):
 
 def home(request):
     """Home page view"""
-    content_blocks = ContentBlock.objects.filter(page='home', is_active=True)
-    announcements = Announcement.objects.filter(is_active=True)[:3]
-
-    context = {
-        'content_blocks': content_blocks,
-        'announcements': announcements,
-    }
-    return render(request, 'home.html', context)
+    return render(request, 'home.html', get_home_page_data())
 
 
 def about(request):
@@ -53,7 +57,16 @@ def services(request):
 
 def client_portal(request):
     """Client portal page with PT Distinction integration"""
-    return render(request, 'client_portal.html')
+    context = {
+        'portal': {
+            'mode': settings.PTD_PORTAL_LOAD,
+            'origin': settings.PTD_PORTAL_ORIGIN,
+            'apk': PTD_PORTAL_APK,
+            'script_url': f"{settings.PTD_PORTAL_ORIGIN}/v3/inside/integration/v1/portal.js?id={PTD_PORTAL_SCRIPT_ID}",
+            'timeout': settings.PTD_PORTAL_TIMEOUT_SECONDS,
+        },
+    }
+    return render(request, 'client_portal.html', context)
 
 
 def contact(request):
@@ -62,7 +75,9 @@ def contact(request):
         form = ClientInquiryForm(request.POST)
         if form.is_valid():
             # Save the client inquiry to database
-            inquiry = form.save()
+            with transaction.atomic():
+                inquiry = form.save()
+                record_event(inquiry, 'submitted')
 
             # Construct email notification
             email_subject = f"New Client Inquiry: {inquiry.name}"
@@ -103,10 +118,10 @@ View in admin panel to update status and add notes.
 
             if success:
                 messages.success(request, 'Thank you for your interest! We will contact you within 24 hours to begin your transformation.')
-                logger.info(f"Client inquiry submitted by {inquiry.email} (ID: {inquiry.id}) - Email sent to {len(recipients)} recipients")
+                logger.info("Client inquiry submitted by %s (ID: %s) - Email sent to %d recipients", inquiry.email, inquiry.id, len(recipients))
             else:
                 messages.success(request, 'Thank you for your interest! We will contact you within 24 hours to begin your transformation.')
-                logger.warning(f"Client inquiry submitted by {inquiry.email} (ID: {inquiry.id}) - Email not sent: {error}")
+                logger.warning("Client inquiry submitted by %s (ID: %s) - Email not sent: %s", inquiry.email, inquiry.id, error)
 
             return redirect('contact')
     else:
@@ -119,22 +134,117 @@ View in admin panel to update status and add notes.
 
 
 @require_http_methods(["GET"])
-def health_check(request):
-    """Health check endpoint for monitoring"""
-    try:
-        # Check database connectivity
-        ContentBlock.objects.count()
+def health_live(request):
+    """Liveness probe - the process is up and serving requests (no I/O)"""
+    return JsonResponse({'status': 'alive'})
+
+
+@require_http_methods(["GET"])
+def health_ready(request):
+    """Readiness probe - the database accepts queries and writes (cached for a short TTL)"""
+    database = cached_probe('health_ready_cache', check_database)
 
+    if database['ok']:
         return JsonResponse({
             'status': 'healthy',
             'database': 'ok',
         })
-    except Exception as e:
-        logger.error(f"Health check failed: {str(e)}")
-        return JsonResponse({
-            'status': 'unhealthy',
-            'error': str(e),
-        }, status=503)
+
+    logger.error("Health check failed: %s", database.get('error', 'database unavailable'))
+    return JsonResponse({
+        'status': 'unhealthy',
+        'error': database.get('error', 'database unavailable'),
+    }, status=503)
+
+
+# Kept for existing monitors (Caddy, docker-compose) that poll /health/
+health_check = health_ready
+
+
+@login_required
+@user_passes_test(is_staff_user)
+@require_http_methods(["GET"])
+def health_status(request):
+    """Detailed staff-only status: database, cache, disk, email and latency"""
+    status = cached_probe('health_status_cache', detailed_status)
+    return JsonResponse(status, status=200 if status['status'] == 'healthy' else 503)
+
+
+@login_required
+@user_passes_test(is_staff_user)
+@require_http_methods(["GET"])
+def inquiry_events(request):
+    """
+    Staff-only feed of inquiry events after a watermark, for external consumers.
+    GET ?after=<last seen id>&limit=<n>&type=<event_type> (type may repeat)
+    """
+    try:
+        after = max(int(request.GET.get('after', 0)), 0)
+        limit = min(max(int(request.GET.get('limit', 500)), 1), 1000)
+    except ValueError:
+        return JsonResponse({'error': "'after' and 'limit' must be integers"}, status=400)
+
+    events = events_after(after, limit, request.GET.getlist('type'))
+    return JsonResponse({
+        'events': [
+            {
+                'id': event.id,
+                'inquiry_id': event.inquiry_id,
+                'event_type': event.event_type,
+                'from_state': event.from_state,
+                'to_state': event.to_state,
+                'actor': event.actor,
+                'created_at': event.created_at.isoformat(),
+            }
+            for event in events
+        ],
+        # Pass back as ?after= to continue; unchanged when there is nothing new
+        'watermark': events[-1].id if events else after,
+    })
+
+
+@login_required
+@user_passes_test(is_staff_user)
+@require_http_methods(["GET"])
+def profiles(request):
+    """
+    Stored request profiles, newest first. With ?path=/manage/..., also a
+    signed link that profiles one request to that page.
+    """
+    data = {
+        'profiles': [
+            {
+                'name': path.stem,
+                'size': path.stat().st_size,
+                'prof': f'/manage/profiles/{path.name}',
+                'collapsed': f'/manage/profiles/{path.stem}.collapsed',
+            }
+            for path in profiling.stored_profiles()
+        ],
+    }
+    target = request.GET.get('path')
+    if target:
+        if not target.startswith('/') or target.startswith('//'):
+            return JsonResponse({'error': "'path' must be a path on this site, e.g. /manage/"}, status=400)
+        separator = '&' if '?' in target else '?'
+        data['link'] = f'{target}{separator}{profiling.TOKEN_PARAM}={profiling.make_token(request.user)}'
+        data['expires_in'] = settings.PROFILE_TOKEN_MAX_AGE
+    return JsonResponse(data)
+
+
+@login_required
+@user_passes_test(is_staff_user)
+@require_http_methods(["GET"])
+def profile_download(request, name):
+    """A stored .prof (binary pstats) or .collapsed (folded stacks, text) file"""
+    if not profiling.PROFILE_NAME_RE.match(name):
+        raise Http404
+    path = settings.PROFILE_DIR / name
+    if not path.is_file():
+        raise Http404
+    if name.endswith('.collapsed'):
+        return FileResponse(open(path, 'rb'), content_type='text/plain; charset=utf-8')
+    return FileResponse(open(path, 'rb'), as_attachment=True, content_type='application/octet-stream')
 
 
 # Admin Views
@@ -143,25 +253,13 @@ def health_check(request):
 @user_passes_test(is_staff_user)
 def manage_dashboard(request):
     """Main management dashboard with links to all admin pages"""
-    # Get summary statistics
-    total_pending_leads = ClientInquiry.objects.filter(group='lead', lead_status='pending').count()
-    total_approved_leads = ClientInquiry.objects.filter(group='lead', lead_status='approved').count()
-    total_denied_leads = ClientInquiry.objects.filter(group='lead', lead_status='denied').count()
-
-    all_clients = ClientInquiry.objects.filter(group='client')
-    total_clients = all_clients.count()
-    total_active = all_clients.filter(client_status='active').count()
-    total_contacted = all_clients.filter(client_status='contacted').count()
-    total_inactive = all_clients.filter(client_status='inactive').count()
-
     context = {
-        'total_pending_leads': total_pending_leads,
-        'total_approved_leads': total_approved_leads,
-        'total_denied_leads': total_denied_leads,
-        'total_clients': total_clients,
-        'total_active': total_active,
-        'total_contacted': total_contacted,
-        'total_inactive': total_inactive,
+        # Live updates (SSE) resume from here, so read it before the counters
+        'live_after': latest_event_id(),
+        # Lead and client totals from one grouped query
+        **get_inquiry_counters(),
+        # Charts read only the daily rollups, never ClientInquiry
+        'stats': get_dashboard_stats(),
     }
     return render(request, 'admin/dashboard.html', context)
 
@@ -173,32 +271,60 @@ def admin_pending_inquiries(request):
     pending_leads = ClientInquiry.objects.filter(group='lead', lead_status='pending').order_by('-submitted_at')
 
     context = {
+        'live_after': latest_event_id(),
         'inquiries': pending_leads,
         'total_pending': pending_leads.count(),
     }
     return render(request, 'admin/pending_inquiries.html', context)
 
 
+@login_required
+@user_passes_test(is_staff_user)
+@require_http_methods(["GET"])
+def pending_inquiry_card(request, inquiry_id):
+    """One pending inquiry's card, inserted by the pending page when a live update announces it"""
+    inquiry = get_object_or_404(ClientInquiry, id=inquiry_id, group='lead', lead_status='pending')
+    return render(request, 'components/pending_inquiry.html', {'inquiry': inquiry})
+
+
+@require_http_methods(["GET"])
+async def live_updates(request):
+    """
+    Staff-only Server-Sent Events stream of inquiry events and counters for
+    the management pages. Resumes after Last-Event-ID (sent by the browser on
+    reconnect) or ?after=<event id> (rendered into the page).
+    """
+    # login_required/user_passes_test don't wrap async views before Django 5.1;
+    # an EventSource can't follow a login redirect anyway, so refuse outright
+    user = await request.auser()
+    if not (user.is_authenticated and is_staff_user(user)):
+        return HttpResponseForbidden()
+
+    try:
+        after = max(int(request.headers.get('Last-Event-ID') or request.GET.get('after', 0)), 0)
+    except ValueError:
+        return JsonResponse({'error': "'after' must be an integer"}, status=400)
+
+    if not isinstance(request, ASGIRequest):
+        # WSGI can't hold the connection open without a worker: answer once, the browser polls
+        response = HttpResponse(await live.poll_once(after), content_type='text/event-stream')
+    else:
+        response = StreamingHttpResponse(live.stream(after), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 @login_required
 @user_passes_test(is_staff_user)
 def admin_active_clients(request):
     """Admin page to view all clients"""
     all_clients = ClientInquiry.objects.filter(group='client').order_by('-submitted_at')
 
-    # Get counts for dashboard
-    total_clients = all_clients.count()
-    total_active = all_clients.filter(client_status='active').count()
-    total_inactive = all_clients.filter(client_status='inactive').count()
-    total_contacted = all_clients.filter(client_status='contacted').count()
-    total_pending_leads = ClientInquiry.objects.filter(group='lead', lead_status='pending').count()
-
     context = {
         'clients': all_clients,
-        'total_clients': total_clients,
-        'total_active': total_active,
-        'total_inactive': total_inactive,
-        'total_contacted': total_contacted,
-        'total_pending_leads': total_pending_leads,
+        # Lead and client totals from one grouped query
+        **get_inquiry_counters(),
     }
     return render(request, 'admin/active_clients.html', context)
 
@@ -209,6 +335,7 @@ def admin_active_clients(request):
 def approve_inquiry(request, inquiry_id):
     """Approve a lead and convert to client"""
     inquiry = get_object_or_404(ClientInquiry, id=inquiry_id)
+    old_state = inquiry.state
 
     # Move from lead to client group
     inquiry.group = 'client'
@@ -217,7 +344,9 @@ def approve_inquiry(request, inquiry_id):
     inquiry.reviewed_at = timezone.now()
     inquiry.approved_at = timezone.now()
     inquiry.reviewed_by = request.user.username if request.user.is_authenticated else 'admin'
-    inquiry.save()
+    with transaction.atomic():
+        inquiry.save()
+        record_event(inquiry, 'approved', old_state, inquiry.reviewed_by)
 
     # Send email alert
     send_alert_email(
@@ -228,7 +357,7 @@ def approve_inquiry(request, inquiry_id):
     )
 
     messages.success(request, f'Approved {inquiry.name} and moved to Clients group with status "Contacted".')
-    logger.info(f"Lead {inquiry.id} approved and converted to client by {request.user.username}")
+    logger.info("Lead %s approved and converted to client by %s", inquiry.id, request.user.username)
 
     return redirect('admin_pending_inquiries')
 
@@ -239,11 +368,14 @@ def approve_inquiry(request, inquiry_id):
 def deny_inquiry(request, inquiry_id):
     """Deny a lead inquiry (mark as spam)"""
     inquiry = get_object_or_404(ClientInquiry, id=inquiry_id)
+    old_state = inquiry.state
 
     inquiry.lead_status = 'denied'
     inquiry.reviewed_at = timezone.now()
     inquiry.reviewed_by = request.user.username if request.user.is_authenticated else 'admin'
-    inquiry.save()
+    with transaction.atomic():
+        inquiry.save()
+        record_event(inquiry, 'denied', old_state, inquiry.reviewed_by)
 
     # Send email alert
     send_alert_email(
@@ -254,7 +386,7 @@ def deny_inquiry(request, inquiry_id):
     )
 
     messages.warning(request, f'Denied lead from {inquiry.name}. Marked as spam.')
-    logger.info(f"Lead {inquiry.id} denied by {request.user.username}")
+    logger.info("Lead %s denied by %s", inquiry.id, request.user.username)
 
     return redirect('admin_pending_inquiries')
 
@@ -266,6 +398,7 @@ def update_client_status(request, inquiry_id):
     """Update client activation status"""
     inquiry = get_object_or_404(ClientInquiry, id=inquiry_id)
     old_status = inquiry.client_status
+    old_state = inquiry.state
     new_status = request.POST.get('client_status')
 
     if inquiry.group != 'client':
@@ -274,7 +407,9 @@ def update_client_status(request, inquiry_id):
 
     if new_status in ['contacted', 'active', 'inactive']:
         inquiry.client_status = new_status
-        inquiry.save()
+        with transaction.atomic():
+            inquiry.save()
+            record_event(inquiry, 'status_changed', old_state, request.user.username)
 
         # Send different alerts based on status change
         if new_status == 'active' and old_status != 'active':
@@ -303,7 +438,7 @@ def update_client_status(request, inquiry_id):
             )
 
         messages.success(request, f'Updated {inquiry.name} status to {inquiry.get_client_status_display()}.')
-        logger.info(f"Client {inquiry.id} status updated to {new_status} by {request.user.username}")
+        logger.info("Client %s status updated to %s by %s", inquiry.id, new_status, request.user.username)
     else:
         messages.error(request, 'Invalid status.')
 
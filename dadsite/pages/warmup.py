@@ -0,0 +1,93 @@
+"""
+Cache warm-up, run once per deploy before gunicorn forks its workers
+
+With `gunicorn --preload`, wsgi.py runs in the master process, so everything
+loaded here (permission rules, compiled templates, the static
+files manifest) is inherited copy-on-write by every worker instead of being
+rebuilt by each worker's first requests.
+"""
+import logging
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.db import connections
+from django.template.loader import get_template
+from django.test import Client
+
+from .middleware import get_url_permissions
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = Path(__file__).resolve().parent / 'templates'
+
+# Public pages requested once so URL resolving, middleware and view code
+# paths are exercised before the first real visitor arrives
+WARMUP_PATHS = ['/', '/about/', '/services/', '/contact/', '/client-portal/']
+
+
+def warm_url_permissions():
+    """Load the URLPermission table into the cache"""
+    return f"{len(get_url_permissions())} rules"
+
+
+def compile_templates():
+    """Compile every template in pages/templates into the cached template loader"""
+    count = 0
+    for path in sorted(TEMPLATE_DIR.rglob('*.html')):
+        get_template(path.relative_to(TEMPLATE_DIR).as_posix())
+        count += 1
+    return f"{count} templates"
+
+
+def warm_static_manifest():
+    """Load the static files manifest (WhiteNoise indexes files when the WSGI app is created)"""
+    return f"{len(getattr(staticfiles_storage, 'hashed_files', {}))} manifest entries"
+
+
+def local_host():
+    """A host name from ALLOWED_HOSTS usable for in-process requests"""
+    for host in settings.ALLOWED_HOSTS:
+        if host and host != '*' and not host.startswith('.'):
+            return host
+    return 'localhost'
+
+
+def warm_public_pages():
+    """Request each public page once in-process"""
+    client = Client(HTTP_HOST=local_host())
+    statuses = [client.get(path).status_code for path in WARMUP_PATHS]
+    return f"{len(statuses)} pages ({', '.join(str(status) for status in statuses)})"
+
+
+WARMUP_STEPS = [
+    ('URL permissions', warm_url_permissions),
+    ('Templates', compile_templates),
+    ('Static manifest', warm_static_manifest),
+    ('Public pages', warm_public_pages),
+]
+
+
+def warm_caches():
+    """
+    Run every warm-up step. A failing step is logged and skipped so a
+    warm-up problem (e.g. migrations not applied yet) never stops the site
+    from starting.
+
+    Returns:
+        list: (step name, seconds, result or error) tuples
+    """
+    results = []
+    for name, step in WARMUP_STEPS:
+        started = time.perf_counter()
+        try:
+            result = step()
+        except Exception as e:
+            logger.warning("Warm-up step '%s' failed: %s", name, e)
+            result = f"failed: {e}"
+        results.append((name, time.perf_counter() - started, result))
+
+    # Database connections must not be shared with forked workers
+    connections.close_all()
+    return results
@@ -0,0 +1,89 @@
+/*
+ * Live updates for the management pages (Server-Sent Events, see pages/live.py).
+ *
+ * The element with data-live-stream holds the stream URL and shows the
+ * connection state. "counters" messages refresh every [data-live-counter]
+ * element. On the pending inquiries page ([data-live-list]) new submissions
+ * are fetched as rendered cards and inserted at the top, and cards leave the
+ * list once their inquiry has been approved or denied elsewhere.
+ */
+(function () {
+    var status = document.querySelector('[data-live-stream]');
+    if (!status || !window.EventSource) {
+        return;
+    }
+    var list = document.querySelector('[data-live-list]');
+    var empty = document.querySelector('[data-live-empty]');
+    var source = new EventSource(status.getAttribute('data-live-stream'));
+
+    function setStatus(text) {
+        status.textContent = text;
+    }
+
+    function updateEmptyState() {
+        if (list && empty) {
+            empty.hidden = list.querySelector('[data-inquiry-id]') !== null;
+        }
+    }
+
+    function findCard(inquiryId) {
+        return list.querySelector('[data-inquiry-id="' + inquiryId + '"]');
+    }
+
+    function insertCard(inquiryId) {
+        var url = list.getAttribute('data-live-card-url').replace('/0/', '/' + inquiryId + '/');
+        fetch(url, {credentials: 'same-origin'})
+            .then(function (response) {
+                return response.ok ? response.text() : null;
+            })
+            .then(function (html) {
+                if (!html || findCard(inquiryId)) {
+                    return;
+                }
+                list.insertAdjacentHTML('afterbegin', html);
+                updateEmptyState();
+            });
+    }
+
+    source.addEventListener('open', function () {
+        setStatus('● Live');
+    });
+
+    source.addEventListener('error', function () {
+        // The browser retries on its own unless the server refused the stream
+        setStatus(source.readyState === EventSource.CLOSED ? 'Live updates stopped, reload the page' : '');
+    });
+
+    source.addEventListener('counters', function (message) {
+        var counters = JSON.parse(message.data);
+        Object.keys(counters).forEach(function (name) {
+            document.querySelectorAll('[data-live-counter="' + name + '"]').forEach(function (element) {
+                element.textContent = counters[name];
+            });
+        });
+    });
+
+    source.addEventListener('inquiry', function (message) {
+        if (!list) {
+            return;
+        }
+        var event = JSON.parse(message.data);
+        if (event.to_state === 'lead:pending') {
+            if (event.event_type === 'submitted' && !findCard(event.inquiry_id)) {
+                insertCard(event.inquiry_id);
+            }
+        } else if (event.from_state === 'lead:pending') {
+            var card = findCard(event.inquiry_id);
+            if (card) {
+                card.remove();
+                updateEmptyState();
+            }
+        }
+    });
+
+    // Too far behind to patch in place (long sleep, very busy period)
+    source.addEventListener('reload', function () {
+        source.close();
+        window.location.reload();
+    });
+})();
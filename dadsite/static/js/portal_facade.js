@@ -0,0 +1,73 @@
+/*
+ * Facade for the PT Distinction client portal embed.
+ *
+ * The placeholder in components/portal_facade.html is plain HTML. portal.js is
+ * only requested when the visitor clicks "Open portal" or the placeholder
+ * scrolls near the viewport, so the remote service never delays the page load.
+ * If no portal iframe appears within the timeout, a direct link is shown.
+ */
+(function () {
+    var facade = document.getElementById('ptd_facade');
+    if (!facade) {
+        return;
+    }
+    var portal = document.getElementById('ptd_portal');
+    var placeholder = facade.querySelector('[data-ptd-placeholder]');
+    var status = facade.querySelector('[data-ptd-status]');
+    var fallback = facade.querySelector('[data-ptd-fallback]');
+    var button = facade.querySelector('[data-ptd-load]');
+    var started = false;
+    var observer = null;
+
+    function showFallback() {
+        status.hidden = true;
+        fallback.hidden = false;
+    }
+
+    function load() {
+        if (started) {
+            return;
+        }
+        started = true;
+        if (observer) {
+            observer.disconnect();
+        }
+        button.disabled = true;
+        status.hidden = false;
+
+        // portal.js reads its configuration from this global
+        window.ptd_param = {apk: facade.dataset.apk, domain: facade.dataset.origin};
+
+        var timer = window.setTimeout(showFallback, parseInt(facade.dataset.timeout, 10) * 1000);
+        var watcher = new MutationObserver(function () {
+            if (portal.querySelector('iframe')) {
+                window.clearTimeout(timer);
+                watcher.disconnect();
+                placeholder.hidden = true;
+            }
+        });
+        watcher.observe(portal, {childList: true, subtree: true});
+
+        var script = document.createElement('script');
+        script.src = facade.dataset.src;
+        script.async = true;
+        script.onerror = function () {
+            window.clearTimeout(timer);
+            watcher.disconnect();
+            showFallback();
+        };
+        document.body.appendChild(script);
+    }
+
+    button.addEventListener('click', load);
+
+    // Start loading shortly before the portal scrolls into view
+    if ('IntersectionObserver' in window) {
+        observer = new IntersectionObserver(function (entries) {
+            if (entries.some(function (entry) { return entry.isIntersecting; })) {
+                load();
+            }
+        }, {rootMargin: '200px'});
+        observer.observe(facade);
+    }
+})();